@@ -3,6 +3,7 @@ from snowflake.snowpark.context import get_active_session
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+import json
 
 st.set_page_config(page_title="Data Profiling", page_icon="🔍", layout="wide")
 
@@ -33,26 +34,91 @@ with col1:
                 selected_table = st.selectbox("Select Table", table_list, key="profile_table")
                 
                 sample_size = st.slider("Sample Size for Examples", 10, 500, 100, 10)
+                profile_mode = st.selectbox(
+                    "Profile Mode",
+                    ["EXACT", "APPROXIMATE", "SAMPLED", "INCREMENTAL"],
+                    help="APPROXIMATE uses HyperLogLog distinct counts, t-digest percentiles and space-saving top-k sketches. SAMPLED profiles a table sample and extrapolates to the full table. INCREMENTAL only reads rows past the last watermark and merges them into stored partial aggregates"
+                )
+                sample_percent = 10.0
+                sample_rows = None
+                sample_method = "SYSTEM"
+                watermark_column = None
+                if profile_mode == "INCREMENTAL":
+                    columns = session.sql(f"SHOW COLUMNS IN TABLE {selected_db}.{selected_schema}.{selected_table}").collect()
+                    watermark_column = st.selectbox("Watermark Column", [row['column_name'] for row in columns], help="A monotonically increasing column such as a load timestamp or sequence id")
+                if profile_mode == "SAMPLED":
+                    sampling = st.radio("Sampling", ["Block sample (%)", "Row sample (%)", "Fixed row budget"], horizontal=True)
+                    if sampling == "Fixed row budget":
+                        sample_rows = st.number_input("Rows to Sample", min_value=1000, value=1000000, step=100000)
+                    else:
+                        sample_method = "SYSTEM" if sampling == "Block sample (%)" else "BERNOULLI"
+                        sample_percent = st.slider("Sample Percent", 0.1, 100.0, 10.0, 0.1)
                 
                 if st.button("🔍 Profile Table", type="primary", use_container_width=True):
                     with st.spinner("Profiling table... This may take a moment"):
                         try:
                             full_table_name = f"{selected_db}.{selected_schema}.{selected_table}"
-                            result = session.call("app_schema.profile_table", full_table_name, sample_size)
+                            result = session.call("app_schema.profile_table", full_table_name, sample_size, profile_mode, sample_percent, sample_rows, sample_method, watermark_column)
                             st.success(result)
                             st.balloons()
                             st.rerun()
                         except Exception as e:
                             st.error(f"Error profiling table: {str(e)}")
+
+                with st.expander("🗂️ Profile Entire Schema"):
+                    st.caption("Profiles every table in the schema as concurrent background jobs, largest tables first")
+                    schema_mode = st.selectbox("Schema Profile Mode", ["EXACT", "APPROXIMATE"], key="schema_profile_mode")
+                    max_concurrency = st.slider("Max Concurrent Tables", 1, 32, 8)
+                    if st.button("🗂️ Profile Schema", use_container_width=True):
+                        try:
+                            session.sql(f"CALL app_schema.profile_schema('{selected_db}', '{selected_schema}', {max_concurrency}, {sample_size}, '{schema_mode}')").collect_nowait()
+                            st.success(f"Started profiling {selected_db}.{selected_schema} in the background")
+                        except Exception as e:
+                            st.error(f"Error starting schema profile: {str(e)}")
+                    progress_df = session.sql("""
+                        SELECT
+                            object_name,
+                            status,
+                            estimated_rows,
+                            started_at,
+                            completed_at,
+                            message
+                        FROM app_schema.batch_run_progress
+                        WHERE batch_id = (
+                            SELECT batch_id FROM app_schema.batch_run_progress
+                            WHERE batch_type = 'PROFILE_SCHEMA'
+                            ORDER BY queued_at DESC
+                            LIMIT 1
+                        )
+                        ORDER BY estimated_rows DESC NULLS LAST
+                    """).to_pandas()
+                    if not progress_df.empty:
+                        done = len(progress_df[progress_df['STATUS'].isin(['COMPLETED', 'FAILED'])])
+                        st.progress(done / len(progress_df), text=f"{done} of {len(progress_df)} tables finished")
+                        st.dataframe(
+                            progress_df,
+                            use_container_width=True,
+                            hide_index=True,
+                            column_config={
+                                "OBJECT_NAME": "Table",
+                                "STATUS": "Status",
+                                "ESTIMATED_ROWS": st.column_config.NumberColumn("Rows", format="%d"),
+                                "STARTED_AT": st.column_config.DatetimeColumn("Started", format="HH:mm:ss"),
+                                "COMPLETED_AT": st.column_config.DatetimeColumn("Completed", format="HH:mm:ss"),
+                                "MESSAGE": "Message"
+                            }
+                        )
+                        if st.button("🔄 Refresh Progress", use_container_width=True):
+                            st.rerun()
     except Exception as e:
         st.error(f"Error loading database objects: {str(e)}")
 
 with col2:
     st.markdown("### 📊 Quick Stats")
     try:
-        total_profiles = session.sql("SELECT COUNT(DISTINCT table_name) as count FROM app_schema.data_profile_results").collect()[0]['COUNT']
-        total_columns = session.sql("SELECT COUNT(*) as count FROM app_schema.data_profile_results").collect()[0]['COUNT']
-        avg_null_pct = session.sql("SELECT ROUND(AVG(null_percentage), 2) as avg_pct FROM app_schema.data_profile_results").collect()[0]['AVG_PCT'] or 0
+        total_profiles = session.sql("SELECT COUNT(*) as count FROM app_schema.profile_runs WHERE is_latest").collect()[0]['COUNT']
+        total_columns = session.sql("SELECT COUNT(*) as count FROM app_schema.latest_profile_results").collect()[0]['COUNT']
+        avg_null_pct = session.sql("SELECT ROUND(AVG(null_percentage), 2) as avg_pct FROM app_schema.latest_profile_results").collect()[0]['AVG_PCT'] or 0
         
         st.metric("Tables Profiled", total_profiles)
         st.metric("Total Columns Analyzed", total_columns)
@@ -64,7 +130,7 @@ st.markdown("---")
 st.markdown("### 📋 Profiled Tables")
 
 try:
-    profiled_tables = session.sql("SELECT DISTINCT table_name FROM app_schema.data_profile_results ORDER BY table_name").to_pandas()
+    profiled_tables = session.sql("SELECT table_name FROM app_schema.profile_runs WHERE is_latest ORDER BY table_name").to_pandas()
     
     if not profiled_tables.empty:
         selected_profiled_table = st.selectbox(
@@ -85,13 +151,30 @@ try:
                     min_value,
                     max_value,
                     avg_value,
+                    median_value,
+                    percentiles,
+                    top_values,
+                    profile_mode,
+                    error_bounds:distinct_count:relative_error::FLOAT * 100 as distinct_error_pct,
+                    error_bounds:scanned_rows::NUMBER as scanned_rows,
+                    error_bounds:delta_rows::NUMBER as delta_rows,
+                    error_bounds:null_percentage:low::FLOAT as null_pct_low,
+                    error_bounds:null_percentage:high::FLOAT as null_pct_high,
+                    error_bounds,
+                    histogram,
                     profiled_at
-                FROM app_schema.data_profile_results
+                FROM app_schema.latest_profile_results
                 WHERE table_name = '{selected_profiled_table}'
                 ORDER BY column_name
             """).to_pandas()
             
             st.markdown(f"#### Summary for `{selected_profiled_table}`")
+            if profile_df['PROFILE_MODE'].iloc[0] == 'APPROXIMATE':
+                st.info(f"ℹ️ Approximate profile: distinct counts are HyperLogLog estimates (±{profile_df['DISTINCT_ERROR_PCT'].iloc[0]:.2f}%), percentiles and top values come from sketches")
+            elif profile_df['PROFILE_MODE'].iloc[0] == 'INCREMENTAL':
+                st.info(f"ℹ️ Incremental profile: merged from stored partial aggregates, last run added {profile_df['DELTA_ROWS'].iloc[0]:,} rows. Distinct counts are HyperLogLog estimates (±{profile_df['DISTINCT_ERROR_PCT'].iloc[0]:.2f}%)")
+            elif profile_df['PROFILE_MODE'].iloc[0] == 'SAMPLED':
+                st.warning(f"⚠️ Sampled profile: statistics are extrapolated from {profile_df['SCANNED_ROWS'].iloc[0]:,} of {profile_df['ROW_COUNT'].iloc[0]:,} rows. 95% confidence intervals are shown in the Details tab")
             
             col1, col2, col3, col4 = st.columns(4)
             with col1:
@@ -107,10 +190,10 @@ try:
             
             st.markdown("---")
             
-            tab1, tab2, tab3, tab4 = st.tabs(["📊 Overview", "📈 Null Analysis", "🎯 Cardinality", "📋 Details"])
+            tab1, tab2, tab3, tab4, tab5 = st.tabs(["📊 Overview", "📈 Null Analysis", "🎯 Cardinality", "📋 Details", "🕒 History"])
             
             with tab1:
-                display_df = profile_df[['COLUMN_NAME', 'DATA_TYPE', 'NULL_PERCENTAGE', 'DISTINCT_COUNT', 'DISTINCT_PERCENTAGE']].copy()
+                display_df = profile_df[['COLUMN_NAME', 'DATA_TYPE', 'NULL_PERCENTAGE', 'DISTINCT_COUNT', 'DISTINCT_PERCENTAGE', 'DISTINCT_ERROR_PCT']].copy()
                 st.dataframe(
                     display_df,
                     use_container_width=True,
@@ -120,9 +203,40 @@ try:
                         "DATA_TYPE": "Type",
                         "NULL_PERCENTAGE": st.column_config.NumberColumn("Null %", format="%.2f%%"),
                         "DISTINCT_COUNT": "Distinct Values",
-                        "DISTINCT_PERCENTAGE": st.column_config.NumberColumn("Distinct %", format="%.2f%%")
+                        "DISTINCT_PERCENTAGE": st.column_config.NumberColumn("Distinct %", format="%.2f%%"),
+                        "DISTINCT_ERROR_PCT": st.column_config.NumberColumn("Distinct Error ±", format="%.2f%%")
                     }
                 )
+
+                histogram_df = profile_df[profile_df['HISTOGRAM'].notna()]
+                if not histogram_df.empty:
+                    st.markdown("##### Value Distribution")
+                    hist_col1, hist_col2 = st.columns([2, 1])
+                    with hist_col1:
+                        histogram_column = st.selectbox("Column", histogram_df['COLUMN_NAME'].tolist(), key="histogram_column")
+                    with hist_col2:
+                        histogram_kind = st.radio("Bins", ["Equi-width", "Equi-depth"], horizontal=True)
+                    histogram = json.loads(histogram_df[histogram_df['COLUMN_NAME'] == histogram_column]['HISTOGRAM'].iloc[0])
+                    if histogram_kind == "Equi-width":
+                        edges = histogram['equi_width']['edges']
+                        heights = histogram['equi_width']['counts']
+                        y_label = "Rows"
+                    else:
+                        edges = histogram['equi_depth']['edges']
+                        per_bin = histogram['count'] / histogram['bins']
+                        heights = [per_bin / (high - low) if high > low else per_bin for low, high in zip(edges[:-1], edges[1:])]
+                        y_label = "Rows per unit"
+                    if histogram['value_type'] == 'EPOCH_SECOND':
+                        edges = pd.to_datetime(edges, unit='s')
+                    lows, highs = edges[:-1], edges[1:]
+                    fig = go.Figure(go.Bar(
+                        x=[low + (high - low) / 2 for low, high in zip(lows, highs)],
+                        y=heights,
+                        width=[(high - low) / pd.Timedelta(milliseconds=1) if histogram['value_type'] == 'EPOCH_SECOND' else high - low for low, high in zip(lows, highs)],
+                        marker_color='#1f77b4'
+                    ))
+                    fig.update_layout(title=f"{histogram_kind} histogram of {histogram_column}", xaxis_title=histogram_column, yaxis_title=y_label, bargap=0.05)
+                    st.plotly_chart(fig, use_container_width=True)
             
             with tab2:
                 null_chart_df = profile_df[['COLUMN_NAME', 'NULL_PERCENTAGE']].sort_values('NULL_PERCENTAGE', ascending=False)
@@ -191,6 +305,17 @@ try:
                         "MIN_VALUE": "Min",
                         "MAX_VALUE": "Max",
                         "AVG_VALUE": st.column_config.NumberColumn("Average", format="%.2f"),
+                        "MEDIAN_VALUE": st.column_config.NumberColumn("Median", format="%.2f"),
+                        "PERCENTILES": "Percentiles",
+                        "TOP_VALUES": "Top Values",
+                        "PROFILE_MODE": "Mode",
+                        "DISTINCT_ERROR_PCT": st.column_config.NumberColumn("Distinct Error ±", format="%.2f%%"),
+                        "SCANNED_ROWS": st.column_config.NumberColumn("Sampled Rows", format="%d"),
+                        "DELTA_ROWS": st.column_config.NumberColumn("New Rows", format="%d"),
+                        "NULL_PCT_LOW": st.column_config.NumberColumn("Null % Low (95%)", format="%.2f%%"),
+                        "NULL_PCT_HIGH": st.column_config.NumberColumn("Null % High (95%)", format="%.2f%%"),
+                        "ERROR_BOUNDS": "Error Bounds",
+                        "HISTOGRAM": None,
                         "PROFILED_AT": st.column_config.DatetimeColumn("Profiled", format="MMM DD, YYYY HH:mm")
                     }
                 )
@@ -203,6 +328,57 @@ try:
                         file_name=f"{selected_profiled_table}_profile.csv",
                         mime="text/csv"
                     )
+
+            with tab5:
+                st.markdown("#### Profile Snapshots")
+                runs_df = session.sql(f"""
+                    SELECT
+                        profile_run_id,
+                        profile_mode,
+                        column_count,
+                        started_at,
+                        completed_at,
+                        is_latest
+                    FROM app_schema.profile_runs
+                    WHERE table_name = '{selected_profiled_table}'
+                    ORDER BY started_at DESC
+                """).to_pandas()
+                st.dataframe(
+                    runs_df,
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={
+                        "PROFILE_RUN_ID": "Run ID",
+                        "PROFILE_MODE": "Mode",
+                        "COLUMN_COUNT": "Columns",
+                        "STARTED_AT": st.column_config.DatetimeColumn("Started", format="MMM DD, YYYY HH:mm"),
+                        "COMPLETED_AT": st.column_config.DatetimeColumn("Completed", format="MMM DD, YYYY HH:mm"),
+                        "IS_LATEST": st.column_config.CheckboxColumn("Latest")
+                    }
+                )
+                if len(runs_df) > 1:
+                    trend_df = session.sql(f"""
+                        SELECT
+                            p.started_at,
+                            r.column_name,
+                            r.null_percentage,
+                            r.distinct_count
+                        FROM app_schema.data_profile_results r
+                        JOIN app_schema.profile_runs p ON r.profile_run_id = p.profile_run_id
+                        WHERE p.table_name = '{selected_profiled_table}'
+                        AND r.table_name = '{selected_profiled_table}'
+                        ORDER BY p.started_at
+                    """).to_pandas()
+                    fig = px.line(
+                        trend_df,
+                        x='STARTED_AT',
+                        y='NULL_PERCENTAGE',
+                        color='COLUMN_NAME',
+                        title="Null Percentage Across Snapshots",
+                        labels={'STARTED_AT': 'Snapshot', 'NULL_PERCENTAGE': 'Null %', 'COLUMN_NAME': 'Column'}
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
+                st.caption("Snapshots are kept daily for 30 days and weekly after that")
     else:
         st.info("No tables have been profiled yet. Use the form above to profile your first table!")
         
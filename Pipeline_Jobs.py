@@ -43,7 +43,7 @@ with tab1:
             st.info(f"Target: `{target_full}`")
         else:
             target_full = ""
-        transformation_type = st.selectbox("Transformation Type", ["DEDUPLICATE", "CLEAN_NULLS", "STANDARDIZE"])
+        transformation_type = st.selectbox("Transformation Type", ["DEDUPLICATE", "CLEAN_NULLS", "STANDARDIZE", "PIPELINE"])
         is_active = st.checkbox("Active Job", value=True)
     st.markdown("---")
     st.markdown("### Transformation Configuration")
@@ -54,10 +54,17 @@ with tab1:
             column_list = [row['column_name'] for row in columns]
             key_columns = st.multiselect("Key Columns for Deduplication", column_list)
             transformation_config = {"key_columns": key_columns}
+            tiebreak_column = st.selectbox("Keep Row With", ["(any)"] + column_list, help="When keys collide, the row with the highest (or lowest) value in this column is kept")
+            if tiebreak_column != "(any)":
+                transformation_config["tiebreak_column"] = tiebreak_column
+                transformation_config["tiebreak_descending"] = st.radio("Winning Value", ["Latest / highest", "Earliest / lowest"], horizontal=True) == "Latest / highest"
+            if st.checkbox("Incremental (merge only new rows)", value=False, help="Rebuilds once, then merges rows past the watermark into the existing target; a change of key columns triggers a full rebuild"):
+                transformation_config["mode"] = "INCREMENTAL"
+                transformation_config["watermark_column"] = st.selectbox("Watermark Column", column_list)
         except:
             st.warning("Unable to load columns from source table")
     elif transformation_type == "CLEAN_NULLS" and source_full:
-        strategy = st.selectbox("Null Handling Strategy", ["DROP", "FILL_ZERO", "FILL_MEAN"])
+        strategy = st.selectbox("Null Handling Strategy", ["DROP", "FILL_ZERO", "FILL_MEAN", "FILL_MODE"])
         try:
             columns = session.sql(f"SHOW COLUMNS IN TABLE {source_full}").collect()
             column_list = [row['column_name'] for row in columns]
@@ -74,13 +81,66 @@ with tab1:
             columns = session.sql(f"SHOW COLUMNS IN TABLE {source_full}").collect()
             text_columns = [row['column_name'] for row in columns if 'VARCHAR' in row['type'] or 'TEXT' in row['type'] or 'STRING' in row['type']]
             if text_columns:
-                column_name = st.selectbox("Column to Standardize", text_columns)
-                operation = st.selectbox("Operation", ["UPPERCASE", "LOWERCASE", "TRIM", "REMOVE_SPECIAL_CHARS"])
-                transformation_config = {"column_name": column_name, "operation": operation}
+                columns_to_standardize = st.multiselect("Columns to Standardize", text_columns)
+                column_operations = {}
+                for column_name in columns_to_standardize:
+                    operations = st.multiselect(f"Operations for {column_name} (in order)", ["UPPERCASE", "LOWERCASE", "TRIM", "REMOVE_SPECIAL_CHARS"], key=f"job_operations_{column_name}")
+                    if operations:
+                        column_operations[column_name] = operations
+                if column_operations:
+                    transformation_config = {"column_operations": column_operations}
             else:
                 st.warning("No text columns found")
         except:
             st.warning("Unable to load columns from source table")
+    elif transformation_type == "PIPELINE" and source_full:
+        st.caption("Steps run in order and are compiled into a single query, so the target is written once")
+        try:
+            columns = session.sql(f"SHOW COLUMNS IN TABLE {source_full}").collect()
+            column_list = [row['column_name'] for row in columns]
+            step_count = st.number_input("Number of Steps", min_value=1, max_value=10, value=2)
+            steps = []
+            for i in range(int(step_count)):
+                step_col1, step_col2 = st.columns([1, 3])
+                with step_col1:
+                    step_type = st.selectbox(f"Step {i + 1}", ["DEDUPLICATE", "CLEAN_NULLS", "STANDARDIZE", "FILTER"], key=f"step_type_{i}")
+                with step_col2:
+                    if step_type == "DEDUPLICATE":
+                        steps.append({"type": step_type, "key_columns": st.multiselect("Key Columns", column_list, key=f"step_keys_{i}")})
+                    elif step_type == "CLEAN_NULLS":
+                        step_strategy = st.selectbox("Strategy", ["DROP", "FILL_ZERO", "FILL_MEAN", "FILL_MODE"], key=f"step_strategy_{i}")
+                        step_columns = st.multiselect("Columns (empty for all)", column_list, key=f"step_columns_{i}")
+                        steps.append({"type": step_type, "strategy": step_strategy, "columns": step_columns or None})
+                    elif step_type == "STANDARDIZE":
+                        step_column = st.selectbox("Column", column_list, key=f"step_column_{i}")
+                        step_operation = st.selectbox("Operation", ["UPPERCASE", "LOWERCASE", "TRIM", "REMOVE_SPECIAL_CHARS"], key=f"step_operation_{i}")
+                        steps.append({"type": step_type, "column_name": step_column, "operation": step_operation})
+                    elif step_type == "FILTER":
+                        filter_col1, filter_col2, filter_col3 = st.columns(3)
+                        with filter_col1:
+                            filter_column = st.selectbox("Column", column_list, key=f"step_filter_column_{i}")
+                        with filter_col2:
+                            filter_operator = st.selectbox("Operator", ["=", "<>", "<", "<=", ">", ">=", "LIKE", "NOT LIKE", "IN", "NOT IN", "IS NULL", "IS NOT NULL"], key=f"step_filter_operator_{i}")
+                        with filter_col3:
+                            if filter_operator in ("IS NULL", "IS NOT NULL"):
+                                filter_value = None
+                            elif filter_operator in ("IN", "NOT IN"):
+                                filter_value = [value.strip() for value in st.text_input("Values (comma separated)", key=f"step_filter_value_{i}").split(",") if value.strip()]
+                            else:
+                                filter_value = st.text_input("Value", key=f"step_filter_value_{i}")
+                        steps.append({"type": step_type, "column": filter_column, "operator": filter_operator, "value": filter_value})
+            transformation_config = {"steps": steps}
+        except:
+            st.warning("Unable to load columns from source table")
+    st.markdown("---")
+    st.markdown("### Dependencies (Optional)")
+    st.caption("Jobs that write this job's source table are upstream automatically. Add any other jobs that must finish first.")
+    try:
+        existing_jobs = session.sql("SELECT job_id, job_name FROM app_schema.transformation_jobs ORDER BY job_name").collect()
+        job_names = {row['JOB_ID']: row['JOB_NAME'] for row in existing_jobs}
+    except Exception:
+        job_names = {}
+    depends_on = st.multiselect("Depends On", list(job_names.keys()), format_func=lambda job_id: job_names[job_id])
     st.markdown("---")
     st.markdown("### Schedule (Optional)")
     schedule_enabled = st.checkbox("Enable Scheduled Execution")
@@ -103,7 +163,7 @@ with tab1:
                 day_of_month = st.slider("Day of Month", 1, 28, 1)
                 hour = st.slider("Hour (24h)", 0, 23, 0)
                 schedule = f"0 {hour} {day_of_month} * *"
-        st.info(f"CRON Schedule: `{schedule}`")
+        st.info(f"CRON Schedule: `{schedule}` (UTC)")
     else:
         schedule = None
     st.markdown("---")
@@ -111,18 +171,19 @@ with tab1:
         if job_name and source_full and target_full and transformation_config:
             try:
                 config_json = json.dumps(transformation_config)
+                config_json = config_json.replace("\\", "\\\\").replace("'", "\\'")
                 session.sql(f"""
                     INSERT INTO app_schema.transformation_jobs 
-                    (job_name, source_table, target_table, transformation_type, transformation_config, schedule, is_active)
-                    VALUES (
+                    (job_name, source_table, target_table, transformation_type, transformation_config, schedule, is_active, depends_on)
+                    SELECT
                         '{job_name}',
                         '{source_full}',
                         '{target_full}',
                         '{transformation_type}',
                         PARSE_JSON('{config_json}'),
                         {'NULL' if not schedule else f"'{schedule}'"},
-                        {is_active}
-                    )
+                        {is_active},
+                        PARSE_JSON('{json.dumps(depends_on)}')::ARRAY
                 """).collect()
                 st.success(f"✅ Pipeline job '{job_name}' created successfully!")
                 st.balloons()
@@ -133,6 +194,98 @@ with tab1:
 
 with tab2:
     st.markdown("### Manage Pipeline Jobs")
+    with st.expander("⏰ Scheduler"):
+        try:
+            dispatcher = session.sql("SHOW TASKS LIKE 'JOB_DISPATCHER' IN SCHEMA app_schema").collect()
+            scheduler_state = dispatcher[0]['state'] if dispatcher else 'not created'
+        except Exception:
+            scheduler_state = 'unknown'
+        st.markdown(f"**Dispatcher task:** {scheduler_state}")
+        st.caption("A dispatcher task checks every minute for due jobs. Jobs whose previous run is still going are skipped, and each job's start is spread by a fixed per-job jitter")
+        sched_col1, sched_col2 = st.columns(2)
+        with sched_col1:
+            max_concurrent_jobs = st.slider("Max Concurrent Jobs", 1, 32, 4)
+        with sched_col2:
+            max_jitter_seconds = st.slider("Max Jitter (seconds)", 0, 900, 300)
+        start_col, stop_col = st.columns(2)
+        with start_col:
+            if st.button("▶️ Start Scheduler", use_container_width=True):
+                try:
+                    st.success(session.call("app_schema.start_scheduler", max_concurrent_jobs, max_jitter_seconds))
+                except Exception as e:
+                    st.error(f"Error: {str(e)}")
+        with stop_col:
+            if st.button("⏸️ Stop Scheduler", use_container_width=True):
+                try:
+                    st.success(session.call("app_schema.stop_scheduler"))
+                except Exception as e:
+                    st.error(f"Error: {str(e)}")
+    with st.expander("🔀 Dependency DAG"):
+        st.caption("Runs every active job in dependency order. Jobs in the same wave run in parallel, and jobs downstream of a failure are skipped.")
+        max_parallel_jobs = st.slider("Max Parallel Jobs", 1, 32, 8)
+        if st.button("▶️ Run DAG", use_container_width=True):
+            try:
+                session.sql(f"CALL app_schema.run_job_dag({max_parallel_jobs})").collect_nowait()
+                st.success("DAG run started")
+            except Exception as e:
+                st.error(f"Error: {str(e)}")
+        try:
+            dag_runs_df = session.sql("""
+                SELECT
+                    r.started_at,
+                    r.status,
+                    r.job_count,
+                    r.wave_count,
+                    r.succeeded_count,
+                    r.failed_count,
+                    r.skipped_count,
+                    r.critical_path_seconds,
+                    LISTAGG(j.job_name, ' → ') WITHIN GROUP (ORDER BY p.index) as critical_path
+                FROM app_schema.dag_runs r,
+                LATERAL FLATTEN(input => r.critical_path, outer => TRUE) p
+                LEFT JOIN app_schema.transformation_jobs j ON j.job_id = p.value::STRING
+                GROUP BY ALL
+                ORDER BY r.started_at DESC
+                LIMIT 10
+            """).to_pandas()
+            if not dag_runs_df.empty:
+                st.dataframe(
+                    dag_runs_df,
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={
+                        "STARTED_AT": st.column_config.DatetimeColumn("Started", format="MMM DD HH:mm:ss"),
+                        "CRITICAL_PATH_SECONDS": st.column_config.NumberColumn("Critical Path (s)", format="%.0f"),
+                        "CRITICAL_PATH": "Critical Path"
+                    }
+                )
+        except Exception as e:
+            st.error(f"Error loading DAG runs: {str(e)}")
+    max_runs_per_warehouse = st.slider("Max Concurrent Runs per Warehouse", 1, 32, 4, help="Caps RUNNING runs per queue lane. A lane is the warehouse name current when the run was submitted; queued runs execute on the warehouse of whichever session or scheduler task drains them, so this limits concurrency, not that warehouse's load")
+    try:
+        active_runs_df = session.sql("""
+            SELECT
+                h.execution_id,
+                j.job_name,
+                h.status,
+                q.warehouse_name,
+                q.submitted_at,
+                h.started_at
+            FROM app_schema.job_execution_history h
+            JOIN app_schema.transformation_jobs j ON h.job_id = j.job_id
+            LEFT JOIN app_schema.job_run_queue q ON q.run_id = h.execution_id
+            WHERE h.status IN ('QUEUED', 'RUNNING')
+            AND h.started_at > DATEADD(day, -1, CURRENT_TIMESTAMP())
+            ORDER BY h.started_at DESC
+        """).to_pandas()
+        if not active_runs_df.empty:
+            st.markdown(f"#### Active Runs ({len(active_runs_df)})")
+            active_runs_df['STATUS'] = active_runs_df['STATUS'].map({'QUEUED': '🕒 Queued', 'RUNNING': '⏳ Running'})
+            st.dataframe(active_runs_df, use_container_width=True, hide_index=True)
+            if st.button("🔄 Refresh Run Status"):
+                st.rerun()
+    except Exception as e:
+        st.error(f"Error loading active runs: {str(e)}")
     try:
         jobs_df = session.sql("""
             SELECT 
@@ -144,6 +297,7 @@ with tab2:
                 schedule,
                 is_active,
                 last_run,
+                next_run_at,
                 created_at
             FROM app_schema.transformation_jobs
             ORDER BY created_at DESC
@@ -158,6 +312,14 @@ with tab2:
             with col3:
                 scheduled_count = len(jobs_df[jobs_df['SCHEDULE'].notna()])
                 st.metric("Scheduled Jobs", scheduled_count)
+            if st.button("▶️ Run All Active Jobs", use_container_width=True):
+                try:
+                    for job_id in jobs_df[jobs_df['IS_ACTIVE'] == True]['JOB_ID']:
+                        session.call("app_schema.submit_job_run", job_id)
+                    session.sql(f"CALL app_schema.drain_job_queue({max_runs_per_warehouse})").collect_nowait()
+                    st.success(f"Queued {active_count} jobs")
+                except Exception as e:
+                    st.error(f"Error: {str(e)}")
             st.markdown("---")
             for idx, job in jobs_df.iterrows():
                 with st.expander(f"{'🟢' if job['IS_ACTIVE'] else '🔴'} {job['JOB_NAME']}", expanded=False):
@@ -171,18 +333,19 @@ with tab2:
                         st.markdown(f"**Status:** {'✅ Active' if job['IS_ACTIVE'] else '⏸️ Inactive'}")
                         st.markdown(f"**Schedule:** {job['SCHEDULE'] if job['SCHEDULE'] else 'Manual'}")
                         st.markdown(f"**Last Run:** {job['LAST_RUN'] if job['LAST_RUN'] else 'Never'}")
+                        st.markdown(f"**Next Run (UTC):** {job['NEXT_RUN_AT'] if pd.notna(job['NEXT_RUN_AT']) else 'Not scheduled'}")
                         st.markdown(f"**Created:** {job['CREATED_AT']}")
                     st.markdown("---")
                     action_col1, action_col2, action_col3 = st.columns(3)
                     with action_col1:
+                        force_rebuild = st.checkbox("Force rebuild", key=f"force_{job['JOB_ID']}", help="Run even if the source and config are unchanged since the last successful run")
                         if st.button(f"▶️ Run Now", key=f"run_{job['JOB_ID']}"):
-                            with st.spinner("Executing job..."):
-                                try:
-                                    result = session.call("app_schema.execute_transformation_job", job['JOB_ID'])
-                                    st.success(result)
-                                    st.rerun()
-                                except Exception as e:
-                                    st.error(f"Error: {str(e)}")
+                            try:
+                                run_id = session.call("app_schema.submit_job_run", job['JOB_ID'], None, 0, force_rebuild)
+                                session.sql(f"CALL app_schema.drain_job_queue({max_runs_per_warehouse})").collect_nowait()
+                                st.success(f"Job queued as run `{run_id}`. Track it under Active Runs above.")
+                            except Exception as e:
+                                st.error(f"Error: {str(e)}")
                     with action_col2:
                         new_status = not job['IS_ACTIVE']
                         action_label = "⏸️ Deactivate" if job['IS_ACTIVE'] else "▶️ Activate"
@@ -219,7 +382,14 @@ with tab3:
                 h.rows_processed,
                 h.rows_affected,
                 h.execution_time_seconds,
-                h.error_message
+                h.error_message,
+                h.telemetry:lookup_ms::NUMBER as lookup_ms,
+                h.telemetry:transform_ms::NUMBER as transform_ms,
+                h.telemetry:stats_ms::NUMBER as stats_ms,
+                h.telemetry:rows_per_second::FLOAT as rows_per_second,
+                h.telemetry:bytes_scanned::NUMBER as bytes_scanned,
+                h.telemetry:bytes_written::NUMBER as bytes_written,
+                ARRAY_TO_STRING(h.telemetry:query_ids::ARRAY, ', ') as query_ids
             FROM app_schema.job_execution_history h
             JOIN app_schema.transformation_jobs j ON h.job_id = j.job_id
             ORDER BY h.started_at DESC
@@ -249,7 +419,7 @@ with tab3:
                     names=status_counts.index,
                     title="Execution Status Distribution",
                     color=status_counts.index,
-                    color_discrete_map={'SUCCESS': '#28a745', 'FAILED': '#dc3545', 'RUNNING': '#ffc107'}
+                    color_discrete_map={'SUCCESS': '#28a745', 'FAILED': '#dc3545', 'RUNNING': '#ffc107', 'SKIPPED': '#6c757d', 'QUEUED': '#17a2b8'}
                 )
                 st.plotly_chart(fig, use_container_width=True)
             with col2:
@@ -258,10 +428,27 @@ with tab3:
                 fig.update_layout(xaxis_tickangle=-45)
                 st.plotly_chart(fig, use_container_width=True)
             st.markdown("---")
+            st.markdown("#### Performance Over Time")
+            perf_df = history_df[history_df['STATUS'] == 'SUCCESS'].sort_values('STARTED_AT')
+            if not perf_df.empty:
+                col1, col2 = st.columns(2)
+                with col1:
+                    fig = px.line(perf_df, x='STARTED_AT', y='ROWS_PER_SECOND', color='JOB_NAME', markers=True, title="Throughput by Job", labels={'STARTED_AT': 'Started', 'ROWS_PER_SECOND': 'Rows / sec', 'JOB_NAME': 'Job'})
+                    st.plotly_chart(fig, use_container_width=True)
+                with col2:
+                    perf_df['BASELINE_SECONDS'] = perf_df.groupby('JOB_NAME')['EXECUTION_TIME_SECONDS'].transform(lambda durations: durations.shift().rolling(10, min_periods=1).median())
+                    perf_df['DURATION_VS_BASELINE'] = perf_df['EXECUTION_TIME_SECONDS'] / perf_df['BASELINE_SECONDS']
+                    fig = px.line(perf_df, x='STARTED_AT', y='DURATION_VS_BASELINE', color='JOB_NAME', markers=True, title="Duration vs. Median of Previous 10 Runs", labels={'STARTED_AT': 'Started', 'DURATION_VS_BASELINE': 'Duration / baseline', 'JOB_NAME': 'Job'})
+                    fig.add_hline(y=1, line_dash="dash", line_color="gray")
+                    st.plotly_chart(fig, use_container_width=True)
+                phase_df = perf_df.groupby('JOB_NAME')[['LOOKUP_MS', 'TRANSFORM_MS', 'STATS_MS']].mean().reset_index()
+                fig = px.bar(phase_df, x='JOB_NAME', y=['LOOKUP_MS', 'TRANSFORM_MS', 'STATS_MS'], title="Average Phase Time by Job (ms)", labels={'JOB_NAME': 'Job', 'value': 'ms', 'variable': 'Phase'})
+                st.plotly_chart(fig, use_container_width=True)
+            st.markdown("---")
             st.markdown("#### Detailed Execution Log")
-            history_df['STATUS_DISPLAY'] = history_df['STATUS'].map({'SUCCESS': '✅ Success','FAILED': '❌ Failed','RUNNING': '⏳ Running'})
+            history_df['STATUS_DISPLAY'] = history_df['STATUS'].map({'SUCCESS': '✅ Success','FAILED': '❌ Failed','RUNNING': '⏳ Running','SKIPPED': '⏭️ Skipped','QUEUED': '🕒 Queued'})
             st.dataframe(
-                history_df[['JOB_NAME', 'STATUS_DISPLAY', 'STARTED_AT', 'EXECUTION_TIME_SECONDS','ROWS_PROCESSED', 'ROWS_AFFECTED', 'ERROR_MESSAGE']],
+                history_df[['JOB_NAME', 'STATUS_DISPLAY', 'STARTED_AT', 'EXECUTION_TIME_SECONDS','ROWS_PROCESSED', 'ROWS_AFFECTED', 'ROWS_PER_SECOND', 'BYTES_SCANNED', 'BYTES_WRITTEN', 'QUERY_IDS', 'ERROR_MESSAGE']],
                 use_container_width=True,
                 hide_index=True,
                 column_config={
@@ -271,6 +458,10 @@ with tab3:
                     "EXECUTION_TIME_SECONDS": st.column_config.NumberColumn("Duration (s)", format="%.2f"),
                     "ROWS_PROCESSED": st.column_config.NumberColumn("Processed", format="%d"),
                     "ROWS_AFFECTED": st.column_config.NumberColumn("Affected", format="%d"),
+                    "ROWS_PER_SECOND": st.column_config.NumberColumn("Rows/sec", format="%.0f"),
+                    "BYTES_SCANNED": st.column_config.NumberColumn("Bytes Scanned", format="%d"),
+                    "BYTES_WRITTEN": st.column_config.NumberColumn("Bytes Written", format="%d"),
+                    "QUERY_IDS": "Query IDs",
                     "ERROR_MESSAGE": "Error"
                 }
             )
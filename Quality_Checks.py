@@ -40,6 +40,7 @@ with tab1:
             st.error(f"Error loading database objects: {str(e)}")
             full_table_name = ""
             column_name = ""
+            column_list = []
 
     with col2:
         check_type = st.selectbox("Check Type", ["NULL_CHECK", "DUPLICATE_CHECK", "RANGE_CHECK", "PATTERN_CHECK", "UNIQUENESS_CHECK"])
@@ -54,12 +55,34 @@ with tab1:
             st.markdown("##### Pattern Parameters")
             pattern = st.text_input("Regex Pattern", placeholder="e.g., ^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\\.[A-Z|a-z]{2,}$")
             check_params = {"pattern": pattern}
+        evaluation_mode = st.selectbox(
+            "Evaluation Mode",
+            ["EXACT", "SAMPLED", "EARLY_EXIT", "INCREMENTAL"],
+            help="SAMPLED estimates the failure rate from a Bernoulli sample; EARLY_EXIT stops scanning once the failure threshold is exceeded; INCREMENTAL only reads rows added since the last run of an append-only table"
+        )
+        if evaluation_mode != "EXACT":
+            check_params["evaluation_mode"] = evaluation_mode
+            check_params["failure_threshold"] = st.number_input("Failure Threshold (%)", min_value=0.0, max_value=100.0, value=0.0)
+        if evaluation_mode == "SAMPLED":
+            check_params["sample_percent"] = st.slider("Sample Percent", 1, 100, 10)
+            check_params["confidence"] = st.selectbox("Confidence Level", [0.90, 0.95, 0.99], index=1)
+            if check_type in ["DUPLICATE_CHECK", "UNIQUENESS_CHECK"]:
+                st.caption("Duplicate and uniqueness checks cannot be estimated from a sample and always run exactly")
+        if evaluation_mode == "INCREMENTAL":
+            check_params["watermark_column"] = st.selectbox("Watermark Column", column_list, help="Monotonically increasing column, e.g. a load timestamp or sequence id")
+            if check_type in ["DUPLICATE_CHECK", "UNIQUENESS_CHECK"]:
+                check_params["exact_keys"] = st.checkbox("Track exact key set", value=False, help="Stores every distinct key instead of a HyperLogLog sketch (~1.6% error). Limited to 500,000 keys; the sketch result is reported with its error range")
+        if check_type in ["NULL_CHECK", "RANGE_CHECK", "PATTERN_CHECK"] and st.checkbox("Capture failing rows", value=False):
+            check_params["capture_failures"] = True
+            check_params["key_columns"] = st.multiselect("Key Columns", column_list, help="Columns stored for each failing row; leave empty to store the whole row")
+            check_params["max_captured_rows"] = st.number_input("Max Captured Rows", min_value=1, max_value=10000, value=1000, help="Failing rows beyond the cap are reservoir sampled; wide rows are capped lower so every capture fits in one result row")
         is_active = st.checkbox("Active", value=True)
 
     if st.button("💾 Create Quality Check", type="primary", use_container_width=True):
         if check_name and full_table_name and check_type:
             try:
                 params_json = json.dumps(check_params) if check_params else "{}"
+                params_json = params_json.replace("\\", "\\\\").replace("'", "\\'")
                 session.sql(f"""
                     INSERT INTO app_schema.quality_check_configs 
                     (check_name, table_name, column_name, check_type, check_parameters, severity, is_active)
@@ -128,19 +151,50 @@ with tab2:
             st.markdown("#### Quick Actions")
             action_col1, action_col2 = st.columns(2)
             with action_col1:
+                max_concurrency = st.slider("Max Concurrent Tables", 1, 32, 8)
                 if st.button("▶️ Run All Active Checks", use_container_width=True):
-                    with st.spinner("Running all active quality checks..."):
-                        try:
-                            active_tables = checks_df[checks_df['IS_ACTIVE']]['TABLE_NAME'].unique()
-                            for table in active_tables:
-                                session.call("app_schema.run_quality_checks", table)
-                            st.success(f"✅ Completed checks on {len(active_tables)} tables")
-                            st.rerun()
-                        except Exception as e:
-                            st.error(f"Error: {str(e)}")
+                    try:
+                        session.sql(f"CALL app_schema.run_all_quality_checks({max_concurrency})").collect_nowait()
+                        st.success("Started quality checks on all active tables in the background")
+                    except Exception as e:
+                        st.error(f"Error: {str(e)}")
             with action_col2:
                 if st.button("🔄 Refresh Results", use_container_width=True):
                     st.rerun()
+            progress_df = session.sql("""
+                SELECT
+                    object_name,
+                    status,
+                    estimated_rows,
+                    started_at,
+                    completed_at,
+                    message
+                FROM app_schema.batch_run_progress
+                WHERE batch_id = (
+                    SELECT batch_id FROM app_schema.batch_run_progress
+                    WHERE batch_type = 'QUALITY_CHECKS'
+                    ORDER BY queued_at DESC
+                    LIMIT 1
+                )
+                ORDER BY completed_at DESC NULLS FIRST, started_at DESC NULLS LAST
+            """).to_pandas()
+            if not progress_df.empty:
+                st.markdown("#### Latest Batch Run")
+                done = len(progress_df[progress_df['STATUS'].isin(['COMPLETED', 'FAILED'])])
+                st.progress(done / len(progress_df), text=f"{done} of {len(progress_df)} tables finished")
+                st.dataframe(
+                    progress_df,
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={
+                        "OBJECT_NAME": "Table",
+                        "STATUS": "Status",
+                        "ESTIMATED_ROWS": st.column_config.NumberColumn("Rows", format="%d"),
+                        "STARTED_AT": st.column_config.DatetimeColumn("Started", format="HH:mm:ss"),
+                        "COMPLETED_AT": st.column_config.DatetimeColumn("Completed", format="HH:mm:ss"),
+                        "MESSAGE": "Message"
+                    }
+                )
         else:
             st.info("No quality checks configured yet. Create your first check in the 'Create Check' tab!")
     except Exception as e:
@@ -160,6 +214,10 @@ with tab3:
                 r.records_checked,
                 r.records_failed,
                 r.failure_rate,
+                COALESCE(r.details:evaluation_mode::STRING, 'EXACT') as evaluation_mode,
+                COALESCE(r.details:exact::BOOLEAN, TRUE) as is_exact,
+                r.details:failure_rate_low::FLOAT as failure_rate_low,
+                r.details:failure_rate_high::FLOAT as failure_rate_high,
                 r.execution_time,
                 c.severity
             FROM app_schema.quality_check_results r
@@ -215,7 +273,7 @@ with tab3:
                     names=status_counts.index,
                     title="Check Status Distribution",
                     color=status_counts.index,
-                    color_discrete_map={'PASSED': '#28a745', 'FAILED': '#dc3545', 'WARNING': '#ffc107'}
+                    color_discrete_map={'PASSED': '#28a745', 'FAILED': '#dc3545', 'WARNING': '#ffc107', 'ERROR': '#6c757d'}
                 )
                 st.plotly_chart(fig, use_container_width=True)
             with col2:
@@ -231,13 +289,15 @@ with tab3:
             filtered_df['STATUS_DISPLAY'] = filtered_df['STATUS'].map({
                 'PASSED': '✅ Passed',
                 'FAILED': '❌ Failed',
-                'WARNING': '⚠️ Warning'
+                'WARNING': '⚠️ Warning',
+                'ERROR': '🚫 Error'
             })
             st.dataframe(
                 filtered_df[[
                     'CHECK_NAME', 'TABLE_NAME', 'COLUMN_NAME', 'CHECK_TYPE',
                     'STATUS_DISPLAY', 'RECORDS_CHECKED', 'RECORDS_FAILED',
-                    'FAILURE_RATE', 'SEVERITY', 'EXECUTION_TIME'
+                    'FAILURE_RATE', 'FAILURE_RATE_LOW', 'FAILURE_RATE_HIGH',
+                    'EVALUATION_MODE', 'IS_EXACT', 'SEVERITY', 'EXECUTION_TIME'
                 ]],
                 use_container_width=True,
                 hide_index=True,
@@ -250,6 +310,10 @@ with tab3:
                     "RECORDS_CHECKED": st.column_config.NumberColumn("Checked", format="%d"),
                     "RECORDS_FAILED": st.column_config.NumberColumn("Failed", format="%d"),
                     "FAILURE_RATE": st.column_config.NumberColumn("Failure Rate", format="%.2f%%"),
+                    "FAILURE_RATE_LOW": st.column_config.NumberColumn("Rate Low", format="%.2f%%"),
+                    "FAILURE_RATE_HIGH": st.column_config.NumberColumn("Rate High", format="%.2f%%"),
+                    "EVALUATION_MODE": "Mode",
+                    "IS_EXACT": st.column_config.CheckboxColumn("Exact"),
                     "SEVERITY": "Severity",
                     "EXECUTION_TIME": st.column_config.DatetimeColumn("Time", format="MMM DD HH:mm")
                 }
@@ -262,6 +326,42 @@ with tab3:
                     file_name="quality_check_results.csv",
                     mime="text/csv"
                 )
+            captured_df = session.sql("""
+                SELECT
+                    e.check_id,
+                    c.check_name,
+                    c.table_name,
+                    COUNT(*) as captured_rows
+                FROM app_schema.quality_check_exceptions e
+                JOIN app_schema.quality_check_configs c ON e.check_id = c.check_id
+                GROUP BY e.check_id, c.check_name, c.table_name
+                ORDER BY c.check_name
+            """).to_pandas()
+            if not captured_df.empty:
+                st.markdown("#### Captured Failing Rows")
+                captured_labels = (captured_df['CHECK_NAME'] + " (" + captured_df['TABLE_NAME'] + ")").tolist()
+                selected_capture = st.selectbox("Check", range(len(captured_labels)), format_func=lambda i: captured_labels[i])
+                capture_check_id = captured_df.iloc[selected_capture]['CHECK_ID']
+                capture_total = int(captured_df.iloc[selected_capture]['CAPTURED_ROWS'])
+                page_col1, page_col2 = st.columns(2)
+                with page_col1:
+                    page_size = st.selectbox("Rows per Page", [25, 50, 100], index=1)
+                with page_col2:
+                    page_count = max((capture_total + page_size - 1) // page_size, 1)
+                    page_number = st.number_input("Page", min_value=1, max_value=page_count, value=1)
+                page_rows = session.sql(f"""
+                    SELECT failed_row
+                    FROM app_schema.quality_check_exceptions
+                    WHERE check_id = '{capture_check_id}'
+                    ORDER BY row_index
+                    LIMIT {page_size} OFFSET {(page_number - 1) * page_size}
+                """).collect()
+                st.dataframe(
+                    pd.DataFrame([json.loads(row['FAILED_ROW']) for row in page_rows]),
+                    use_container_width=True,
+                    hide_index=True
+                )
+                st.caption(f"Page {page_number} of {page_count} · {capture_total} captured rows")
         else:
             st.info("No quality check results yet. Run some checks in the 'Run Checks' tab!")
     except Exception as e:
@@ -57,12 +57,14 @@ with tab1:
                 column_list = [row['column_name'] for row in columns]
                 key_columns = st.multiselect("Select Key Columns", column_list)
                 st.info(f"💡 Rows with identical values in {', '.join(key_columns) if key_columns else 'selected columns'} will be considered duplicates")
+                tiebreak_column = st.selectbox("Keep Row With", ["(any)"] + column_list, help="When keys collide, the row with the highest (or lowest) value in this column is kept")
+                tiebreak_descending = st.radio("Winning Value", ["Latest / highest", "Earliest / lowest"], horizontal=True) == "Latest / highest"
                 if st.button("🔄 Run Deduplication", type="primary", use_container_width=True):
                     if key_columns and target_full_name:
                         with st.spinner("Deduplicating data..."):
                             try:
                                 key_cols_array = "['" + "','".join(key_columns) + "']"
-                                result = session.call("app_schema.deduplicate_table", source_full_name, target_full_name, key_cols_array)
+                                result = session.call("app_schema.deduplicate_table", source_full_name, target_full_name, key_cols_array, "FULL", None, None if tiebreak_column == "(any)" else tiebreak_column, tiebreak_descending)
                                 st.success(result)
                                 st.balloons()
                             except Exception as e:
@@ -107,20 +109,28 @@ with tab1:
                 columns = session.sql(f"SHOW COLUMNS IN TABLE {source_full_name}").collect()
                 text_columns = [row['column_name'] for row in columns if 'VARCHAR' in row['type'] or 'TEXT' in row['type'] or 'STRING' in row['type']]
                 if text_columns:
-                    column_to_standardize = st.selectbox("Select Text Column", text_columns)
-                    operation = st.selectbox("Standardization Operation", ["UPPERCASE - Convert to uppercase", "LOWERCASE - Convert to lowercase", "TRIM - Remove leading/trailing spaces", "REMOVE_SPECIAL_CHARS - Remove special characters"])
-                    operation_code = operation.split(" - ")[0]
+                    columns_to_standardize = st.multiselect("Select Text Columns", text_columns)
+                    column_operations = {}
+                    for column_to_standardize in columns_to_standardize:
+                        operations = st.multiselect(
+                            f"Operations for {column_to_standardize} (applied in the order selected)",
+                            ["UPPERCASE - Convert to uppercase", "LOWERCASE - Convert to lowercase", "TRIM - Remove leading/trailing spaces", "REMOVE_SPECIAL_CHARS - Remove special characters"],
+                            key=f"operations_{column_to_standardize}"
+                        )
+                        if operations:
+                            column_operations[column_to_standardize] = [operation.split(" - ")[0] for operation in operations]
                     if st.button("📝 Standardize Text", type="primary", use_container_width=True):
-                        if target_full_name:
+                        if target_full_name and column_operations:
                             with st.spinner("Standardizing text..."):
                                 try:
-                                    result = session.call("app_schema.standardize_text_column", source_full_name, target_full_name, column_to_standardize, operation_code)
+                                    operations_json = json.dumps(column_operations).replace("'", "''")
+                                    result = session.sql(f"CALL app_schema.standardize_text_columns('{source_full_name}', '{target_full_name}', PARSE_JSON('{operations_json}')::OBJECT)").collect()[0][0]
                                     st.success(result)
                                     st.balloons()
                                 except Exception as e:
                                     st.error(f"Error: {str(e)}")
                         else:
-                            st.warning("Please specify target table")
+                            st.warning("Please specify target table and at least one operation")
                 else:
                     st.warning("No text columns found in the selected table")
             except Exception as e:
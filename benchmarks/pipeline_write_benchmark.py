@@ -0,0 +1,110 @@
+"""Compare bytes written and runtime of step-by-step and fused transformation pipelines.
+
+SQLite stands in for Snowflake. The step-by-step path mirrors running each
+transformation job on its own: every step materializes its output as a table
+that the next step reads. The fused path mirrors run_transformation_pipeline:
+compile_transformation_pipeline nests every step into one query and only the
+final result is written. Bytes written are the growth of the database file.
+
+    python benchmarks/pipeline_write_benchmark.py --rows 100000 200000
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+SOURCE_TABLE = "pipeline_source"
+COLUMNS = ["customer_id", "email", "amount", "loaded_at"]
+
+
+def build_source(connection, row_count):
+    connection.execute(
+        f"CREATE TABLE {SOURCE_TABLE} (customer_id INTEGER, email TEXT, amount REAL, loaded_at INTEGER)"
+    )
+    rows = (
+        (
+            random.randrange(row_count * 4 // 5),
+            f"  Customer{random.randrange(row_count)}@Example.com ",
+            None if random.random() < 0.1 else random.random() * 500,
+            loaded_at,
+        )
+        for loaded_at in range(row_count)
+    )
+    connection.executemany(f"INSERT INTO {SOURCE_TABLE} VALUES (?, ?, ?, ?)", rows)
+    connection.commit()
+
+
+def pipeline_steps():
+    """DEDUPLICATE, STANDARDIZE, CLEAN_NULLS FILL_ZERO and FILTER as SELECTs over a relation."""
+    columns = ", ".join(COLUMNS)
+    return [
+        lambda relation: (
+            f"SELECT {columns} FROM (SELECT *, ROW_NUMBER() OVER "
+            f"(PARTITION BY customer_id ORDER BY loaded_at DESC) as row_number FROM {relation}) WHERE row_number = 1"
+        ),
+        lambda relation: f"SELECT customer_id, LOWER(TRIM(email)) as email, amount, loaded_at FROM {relation}",
+        lambda relation: f"SELECT customer_id, email, COALESCE(amount, 0) as amount, loaded_at FROM {relation}",
+        lambda relation: f"SELECT * FROM {relation} WHERE amount >= 10",
+    ]
+
+
+def run_step_by_step(connection, steps):
+    relation = SOURCE_TABLE
+    for i, step in enumerate(steps):
+        connection.execute(f"CREATE TABLE step_{i} AS {step(relation)}")
+        relation = f"step_{i}"
+    connection.commit()
+    return relation
+
+
+def run_fused(connection, steps):
+    compiled = f"SELECT * FROM {SOURCE_TABLE}"
+    for step in steps:
+        compiled = step(f"({compiled})")
+    connection.execute(f"CREATE TABLE pipeline_target AS {compiled}")
+    connection.commit()
+    return "pipeline_target"
+
+
+def database_bytes(connection):
+    page_count = connection.execute("PRAGMA page_count").fetchone()[0]
+    page_size = connection.execute("PRAGMA page_size").fetchone()[0]
+    return page_count * page_size
+
+
+def measure(row_count, seed, run):
+    random.seed(seed)
+    with tempfile.TemporaryDirectory() as directory:
+        connection = sqlite3.connect(os.path.join(directory, "pipeline.db"))
+        build_source(connection, row_count)
+        bytes_before = database_bytes(connection)
+        started = time.perf_counter()
+        target = run(connection, pipeline_steps())
+        elapsed = time.perf_counter() - started
+        written = database_bytes(connection) - bytes_before
+        result_rows = connection.execute(f"SELECT COUNT(*) FROM {target}").fetchone()[0]
+        connection.close()
+    return written, elapsed, result_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100000, 200000])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    print(f"{'rows':>8} {'steps':>6} {'step MB':>8} {'fused MB':>9} {'step s':>7} {'fused s':>8} {'write ratio':>12} {'speedup':>8}")
+    for row_count in args.rows:
+        step_bytes, step_seconds, step_rows = measure(row_count, args.seed, run_step_by_step)
+        fused_bytes, fused_seconds, fused_rows = measure(row_count, args.seed, run_fused)
+        assert step_rows == fused_rows
+        print(
+            f"{row_count:>8} {len(pipeline_steps()):>6} {step_bytes / 1e6:>8.1f} {fused_bytes / 1e6:>9.1f} "
+            f"{step_seconds:>7.2f} {fused_seconds:>8.2f} {step_bytes / fused_bytes:>11.1f}x {step_seconds / fused_seconds:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
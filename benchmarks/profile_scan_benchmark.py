@@ -0,0 +1,169 @@
+"""Compare scan count and wall time of per-column and single-scan profiling.
+
+SQLite stands in for Snowflake. The legacy path mirrors the original
+profile_table: one statement per column, each sorting every value by a random
+key to pick sample_values. The batched path mirrors the current profile_table:
+one wide aggregate per batch of columns, sample_values from the
+reservoir_sample handler in setup.sql, and one multi-row insert of the results.
+
+Each width is measured with sample_values (sample size 100) and without them
+(sample size 0). The batched path always needs one scan instead of one per
+column, but SQLite's in-memory scans are cheap, so wall time on the stand-in
+stays roughly even: 0.9x to 1.1x of legacy without sample_values, and 0.9x
+(slower) with them, where the Python reservoir_sample handler costs more per
+value than the legacy random sort. Read the scan counts, not the speedup
+column, as the result that carries over to Snowflake.
+
+    python benchmarks/profile_scan_benchmark.py --rows 20000 --columns 10 50 150
+"""
+
+import argparse
+import json
+import pathlib
+import random
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "tests"))
+
+from setup_sql import python_udf  # noqa: E402
+
+ReservoirSample = python_udf("reservoir_sample")["ReservoirSample"]
+
+SOURCE_TABLE = "profile_source"
+
+
+class ReservoirSampleAggregate:
+    def __init__(self):
+        self._reservoir = ReservoirSample()
+
+    def step(self, value, sample_size):
+        self._reservoir.accumulate(value, sample_size)
+
+    def finalize(self):
+        return json.dumps(self._reservoir.finish())
+
+
+class RandomOrderSampleAggregate:
+    """ARRAY_AGG(...) WITHIN GROUP (ORDER BY RANDOM()) LIMIT n: keeps and sorts every value."""
+
+    def __init__(self):
+        self._values = []
+        self._sample_size = 0
+
+    def step(self, value, sample_size):
+        self._sample_size = sample_size
+        self._values.append((random.random(), value))
+
+    def finalize(self):
+        self._values.sort(key=lambda keyed: keyed[0])
+        return json.dumps([value for _, value in self._values[:self._sample_size] if value is not None])
+
+
+def build_source(connection, row_count, column_count):
+    columns = [f"c{i}" for i in range(column_count)]
+    kinds = ["INTEGER", "REAL", "TEXT"]
+    connection.execute(
+        f"CREATE TABLE {SOURCE_TABLE} ({', '.join(f'{name} {kinds[i % 3]}' for i, name in enumerate(columns))})"
+    )
+    generators = [
+        lambda: random.randrange(1000),
+        lambda: random.random() * 100,
+        lambda: f"value_{random.randrange(5000)}",
+    ]
+    rows = (
+        tuple(None if random.random() < 0.05 else generators[i % 3]() for i in range(column_count))
+        for _ in range(row_count)
+    )
+    connection.executemany(f"INSERT INTO {SOURCE_TABLE} VALUES ({', '.join('?' * column_count)})", rows)
+    connection.execute(
+        """CREATE TABLE data_profile_results (
+            table_name TEXT, column_name TEXT, row_count INTEGER, null_count INTEGER,
+            distinct_count INTEGER, min_value, max_value, avg_value REAL, sample_values TEXT
+        )"""
+    )
+    return columns
+
+
+def column_aggregates(column, sample_function, sample_size):
+    sample_expr = f"{sample_function}({column}, :sample_size)" if sample_size else "NULL"
+    return (
+        f"COUNT(*) - COUNT({column}), COUNT(DISTINCT {column}), MIN({column}), MAX({column}), "
+        f"AVG({column}), {sample_expr}"
+    )
+
+
+def profile_per_column(connection, columns, sample_size):
+    connection.execute("DELETE FROM data_profile_results")
+    for column in columns:
+        connection.execute(
+            f"""INSERT INTO data_profile_results
+            SELECT '{SOURCE_TABLE}', '{column}', COUNT(*), {column_aggregates(column, 'random_order_sample', sample_size)}
+            FROM {SOURCE_TABLE}""",
+            {"sample_size": sample_size},
+        )
+
+
+def profile_batched(connection, columns, sample_size, columns_per_scan):
+    connection.execute("DELETE FROM data_profile_results")
+    for start in range(0, len(columns), columns_per_scan):
+        batch = columns[start:start + columns_per_scan]
+        select_list = ", ".join(column_aggregates(column, "reservoir_sample", sample_size) for column in batch)
+        stats = connection.execute(
+            f"SELECT COUNT(*), {select_list} FROM {SOURCE_TABLE}", {"sample_size": sample_size}
+        ).fetchone()
+        row_count, values = stats[0], stats[1:]
+        rows = [
+            (SOURCE_TABLE, column, row_count, *values[i * 6:(i + 1) * 6])
+            for i, column in enumerate(batch)
+        ]
+        connection.execute(
+            f"INSERT INTO data_profile_results VALUES {', '.join(['(?, ?, ?, ?, ?, ?, ?, ?, ?)'] * len(rows))}",
+            [value for row in rows for value in row],
+        )
+
+
+def measure(connection, profile):
+    scans = []
+    connection.set_trace_callback(
+        lambda statement: scans.append(statement) if f"FROM {SOURCE_TABLE}" in statement else None
+    )
+    started = time.perf_counter()
+    profile()
+    elapsed = time.perf_counter() - started
+    connection.set_trace_callback(None)
+    return len(scans), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--columns", type=int, nargs="+", default=[10, 50, 150])
+    parser.add_argument("--sample-sizes", type=int, nargs="+", default=[0, 100])
+    parser.add_argument("--columns-per-scan", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    random.seed(args.seed)
+    print(f"{'columns':>8} {'rows':>8} {'samples':>8} {'legacy scans':>13} {'batched scans':>14} {'legacy s':>9} {'batched s':>10} {'speedup':>8}")
+    for column_count in args.columns:
+        connection = sqlite3.connect(":memory:")
+        connection.create_aggregate("reservoir_sample", 2, ReservoirSampleAggregate)
+        connection.create_aggregate("random_order_sample", 2, RandomOrderSampleAggregate)
+        columns = build_source(connection, args.rows, column_count)
+        for sample_size in args.sample_sizes:
+            legacy_scans, legacy_seconds = measure(
+                connection, lambda: profile_per_column(connection, columns, sample_size)
+            )
+            batched_scans, batched_seconds = measure(
+                connection, lambda: profile_batched(connection, columns, sample_size, args.columns_per_scan)
+            )
+            print(
+                f"{column_count:>8} {args.rows:>8} {sample_size:>8} {legacy_scans:>13} {batched_scans:>14} "
+                f"{legacy_seconds:>9.2f} {batched_seconds:>10.2f} {legacy_seconds / batched_seconds:>7.1f}x"
+            )
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Compare scan count and runtime of per-check and fused quality check execution.
+
+SQLite stands in for Snowflake. The per-check path mirrors the original
+run_quality_checks: one INSERT ... SELECT COUNT(*) ... FROM <table> per check.
+The fused path mirrors the current executor: one aggregate over the table with
+a conditional count per check, then one multi-row insert of every result.
+
+    python benchmarks/quality_check_scan_benchmark.py --rows 200000 --checks 1 5 10 20 40
+"""
+
+import argparse
+import random
+import sqlite3
+import time
+
+SOURCE_TABLE = "quality_source"
+COLUMN_COUNT = 20
+
+
+def build_source(connection, row_count):
+    columns = [f"c{i}" for i in range(COLUMN_COUNT)]
+    connection.execute(f"CREATE TABLE {SOURCE_TABLE} ({', '.join(f'{name} INTEGER' for name in columns)})")
+    rows = (
+        tuple(None if random.random() < 0.02 else random.randrange(100000) for _ in columns)
+        for _ in range(row_count)
+    )
+    connection.executemany(f"INSERT INTO {SOURCE_TABLE} VALUES ({', '.join('?' * COLUMN_COUNT)})", rows)
+    connection.execute(
+        """CREATE TABLE quality_check_results (
+            check_id TEXT, status TEXT, records_checked INTEGER, records_failed INTEGER, failure_rate REAL
+        )"""
+    )
+    return columns
+
+
+def configured_checks(columns, check_count):
+    """Cycle NULL, DUPLICATE and RANGE checks over the columns, as failed-count expressions."""
+    checks = []
+    for i in range(check_count):
+        column = columns[i % len(columns)]
+        kind = ("NULL", "DUPLICATE", "RANGE")[i % 3]
+        if kind == "NULL":
+            failed = f"SUM(CASE WHEN {column} IS NULL THEN 1 ELSE 0 END)"
+        elif kind == "DUPLICATE":
+            failed = f"COUNT(*) - COUNT(DISTINCT {column})"
+        else:
+            failed = f"SUM(CASE WHEN {column} < 100 OR {column} > 90000 THEN 1 ELSE 0 END)"
+        checks.append((f"check_{i}", failed))
+    return checks
+
+
+def run_per_check(connection, checks):
+    for check_id, failed in checks:
+        connection.execute(
+            f"""INSERT INTO quality_check_results
+            SELECT '{check_id}', CASE WHEN failed = 0 THEN 'PASSED' ELSE 'FAILED' END,
+                total, failed, ROUND(failed * 100.0 / total, 2)
+            FROM (SELECT COUNT(*) as total, {failed} as failed FROM {SOURCE_TABLE})"""
+        )
+
+
+def run_fused(connection, checks):
+    counts = connection.execute(
+        f"SELECT COUNT(*), {', '.join(failed for _, failed in checks)} FROM {SOURCE_TABLE}"
+    ).fetchone()
+    total, failures = counts[0], counts[1:]
+    rows = [
+        (check_id, "PASSED" if failed == 0 else "FAILED", total, failed, round(failed * 100.0 / total, 2))
+        for (check_id, _), failed in zip(checks, failures)
+    ]
+    connection.execute(
+        f"INSERT INTO quality_check_results VALUES {', '.join(['(?, ?, ?, ?, ?)'] * len(rows))}",
+        [value for row in rows for value in row],
+    )
+
+
+def measure(connection, run):
+    scans = []
+    connection.set_trace_callback(
+        lambda statement: scans.append(statement) if f"FROM {SOURCE_TABLE}" in statement else None
+    )
+    started = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - started
+    connection.set_trace_callback(None)
+    return len(scans), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--checks", type=int, nargs="+", default=[1, 5, 10, 20, 40])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    random.seed(args.seed)
+    connection = sqlite3.connect(":memory:")
+    columns = build_source(connection, args.rows)
+    print(f"{'checks':>7} {'rows':>8} {'per-check scans':>16} {'fused scans':>12} {'per-check s':>12} {'fused s':>8} {'speedup':>8}")
+    for check_count in args.checks:
+        checks = configured_checks(columns, check_count)
+        per_check_scans, per_check_seconds = measure(connection, lambda: run_per_check(connection, checks))
+        fused_scans, fused_seconds = measure(connection, lambda: run_fused(connection, checks))
+        print(
+            f"{check_count:>7} {args.rows:>8} {per_check_scans:>16} {fused_scans:>12} "
+            f"{per_check_seconds:>12.2f} {fused_seconds:>8.2f} {per_check_seconds / fused_seconds:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
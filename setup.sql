@@ -3,6 +3,7 @@ USE SCHEMA app_schema;
 
 CREATE OR REPLACE TABLE data_profile_results (
     profile_id STRING DEFAULT UUID_STRING(),
+    profile_run_id STRING,
     table_name STRING NOT NULL,
     column_name STRING NOT NULL,
     data_type STRING,
@@ -15,8 +16,44 @@ CREATE OR REPLACE TABLE data_profile_results (
     max_value VARIANT,
     avg_value FLOAT,
     sample_values ARRAY,
+    profile_mode STRING DEFAULT 'EXACT',
+    median_value FLOAT,
+    percentiles VARIANT,
+    top_values ARRAY,
+    error_bounds VARIANT,
+    histogram VARIANT,
     profiled_at TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP(),
     PRIMARY KEY (profile_id)
+)
+CLUSTER BY (table_name, TO_DATE(profiled_at));
+
+CREATE OR REPLACE TABLE profile_runs (
+    profile_run_id STRING NOT NULL,
+    table_name STRING NOT NULL,
+    profile_mode STRING,
+    column_count NUMBER,
+    started_at TIMESTAMP_NTZ,
+    completed_at TIMESTAMP_NTZ,
+    is_latest BOOLEAN DEFAULT TRUE,
+    PRIMARY KEY (profile_run_id)
+);
+
+CREATE OR REPLACE TABLE profile_state (
+    table_name STRING NOT NULL,
+    column_name STRING NOT NULL,
+    data_type STRING,
+    watermark_column STRING,
+    watermark_value STRING,
+    row_count NUMBER,
+    null_count NUMBER,
+    value_sum FLOAT,
+    min_value VARIANT,
+    max_value VARIANT,
+    hll_state OBJECT,
+    sample_values ARRAY,
+    last_delta_rows NUMBER,
+    updated_at TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP(),
+    PRIMARY KEY (table_name, column_name)
 );
 
 CREATE OR REPLACE TABLE quality_check_configs (
@@ -44,6 +81,31 @@ CREATE OR REPLACE TABLE quality_check_results (
     PRIMARY KEY (result_id)
 );
 
+CREATE OR REPLACE TABLE quality_check_state (
+    check_id STRING NOT NULL,
+    table_name STRING NOT NULL,
+    watermark_column STRING,
+    config_hash NUMBER,
+    watermark_value STRING,
+    total_count NUMBER,
+    non_null_count NUMBER,
+    failed_count NUMBER,
+    hll_state OBJECT,
+    key_set ARRAY,
+    last_delta_rows NUMBER,
+    updated_at TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP(),
+    PRIMARY KEY (check_id)
+);
+
+CREATE OR REPLACE TABLE quality_check_exceptions (
+    check_id STRING NOT NULL,
+    scan_query_id STRING,
+    row_index NUMBER,
+    failed_row VARIANT,
+    captured_at TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
+)
+CLUSTER BY (check_id);
+
 CREATE OR REPLACE TABLE transformation_jobs (
     job_id STRING DEFAULT UUID_STRING(),
     job_name STRING NOT NULL,
@@ -54,6 +116,9 @@ CREATE OR REPLACE TABLE transformation_jobs (
     schedule STRING,
     is_active BOOLEAN DEFAULT TRUE,
     last_run TIMESTAMP_NTZ,
+    scheduled_cron STRING,
+    next_run_at TIMESTAMP_NTZ,
+    depends_on ARRAY,
     created_at TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP(),
     PRIMARY KEY (job_id)
 );
@@ -68,12 +133,421 @@ CREATE OR REPLACE TABLE job_execution_history (
     rows_affected NUMBER,
     error_message STRING,
     execution_time_seconds FLOAT,
+    source_fingerprint VARIANT,
+    telemetry VARIANT,
     PRIMARY KEY (execution_id)
 );
 
+CREATE OR REPLACE TABLE job_run_queue (
+    run_id STRING DEFAULT UUID_STRING(),
+    job_id STRING NOT NULL,
+    warehouse_name STRING,
+    priority NUMBER DEFAULT 0,
+    force_rebuild BOOLEAN DEFAULT FALSE,
+    status STRING DEFAULT 'QUEUED',
+    claim_id STRING,
+    submitted_at TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP(),
+    started_at TIMESTAMP_NTZ,
+    completed_at TIMESTAMP_NTZ,
+    PRIMARY KEY (run_id)
+);
+
+CREATE OR REPLACE TABLE dag_runs (
+    dag_run_id STRING DEFAULT UUID_STRING(),
+    started_at TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP(),
+    completed_at TIMESTAMP_NTZ,
+    status STRING,
+    job_count NUMBER,
+    wave_count NUMBER,
+    succeeded_count NUMBER,
+    failed_count NUMBER,
+    skipped_count NUMBER,
+    critical_path ARRAY,
+    critical_path_seconds FLOAT,
+    PRIMARY KEY (dag_run_id)
+);
+
+CREATE OR REPLACE TABLE dag_run_jobs (
+    dag_run_id STRING NOT NULL,
+    job_id STRING NOT NULL,
+    upstream_job_ids ARRAY,
+    wave NUMBER,
+    execution_id STRING,
+    status STRING,
+    execution_time_seconds FLOAT,
+    path_seconds FLOAT,
+    path_job_ids ARRAY,
+    PRIMARY KEY (dag_run_id, job_id)
+);
+
+CREATE OR REPLACE TABLE dedup_state (
+    source_table STRING NOT NULL,
+    target_table STRING NOT NULL,
+    key_columns ARRAY,
+    watermark_column STRING,
+    watermark_value STRING,
+    updated_at TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP(),
+    PRIMARY KEY (source_table, target_table)
+);
+
+CREATE OR REPLACE TABLE perf_baselines (
+    entity_type STRING NOT NULL,
+    entity_id STRING NOT NULL,
+    metric STRING NOT NULL,
+    samples ARRAY,
+    median_value FLOAT,
+    mad_value FLOAT,
+    sample_count NUMBER,
+    updated_at TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP(),
+    PRIMARY KEY (entity_type, entity_id, metric)
+);
+
+CREATE OR REPLACE TABLE perf_alerts (
+    alert_id STRING DEFAULT UUID_STRING(),
+    entity_type STRING NOT NULL,
+    entity_id STRING NOT NULL,
+    metric STRING NOT NULL,
+    source_row_id STRING,
+    observed_at TIMESTAMP_NTZ,
+    observed_value FLOAT,
+    baseline_median FLOAT,
+    baseline_mad FLOAT,
+    robust_z FLOAT,
+    slowdown_factor FLOAT,
+    detected_at TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP(),
+    acknowledged BOOLEAN DEFAULT FALSE,
+    PRIMARY KEY (alert_id)
+);
+
+CREATE OR REPLACE TABLE perf_analyzer_state (
+    source_name STRING NOT NULL,
+    watermark TIMESTAMP_NTZ,
+    updated_at TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP(),
+    PRIMARY KEY (source_name)
+);
+
+CREATE OR REPLACE TABLE batch_run_progress (
+    batch_id STRING NOT NULL,
+    batch_type STRING NOT NULL,
+    object_name STRING NOT NULL,
+    status STRING DEFAULT 'QUEUED',
+    estimated_rows NUMBER,
+    estimated_bytes NUMBER,
+    queued_at TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP(),
+    started_at TIMESTAMP_NTZ,
+    completed_at TIMESTAMP_NTZ,
+    message STRING
+);
+
+CREATE OR REPLACE VIEW latest_profile_results AS
+SELECT r.*
+FROM data_profile_results r
+JOIN profile_runs p
+    ON r.profile_run_id = p.profile_run_id
+    AND r.table_name = p.table_name
+    AND r.profiled_at >= p.started_at
+WHERE p.is_latest;
+
+CREATE OR REPLACE AGGREGATE FUNCTION reservoir_sample(
+    value VARIANT,
+    sample_size NUMBER
+)
+RETURNS ARRAY
+LANGUAGE PYTHON
+RUNTIME_VERSION = '3.11'
+HANDLER = 'ReservoirSample'
+AS
+$$
+import random
+
+
+class ReservoirSample:
+    def __init__(self):
+        self._seen = 0
+        self._sample_size = 0
+        self._sample = []
+
+    @property
+    def aggregate_state(self):
+        return [self._seen, self._sample_size, self._sample]
+
+    def accumulate(self, value, sample_size):
+        if value is None:
+            return
+        self._sample_size = int(sample_size)
+        self._seen += 1
+        if len(self._sample) < self._sample_size:
+            self._sample.append(value)
+        else:
+            slot = random.randrange(self._seen)
+            if slot < self._sample_size:
+                self._sample[slot] = value
+
+    def merge(self, other_state):
+        other_seen, other_sample_size, other_sample = other_state
+        sample_size = max(self._sample_size, other_sample_size)
+        left, right = list(self._sample), list(other_sample)
+        random.shuffle(left)
+        random.shuffle(right)
+        left_remaining, right_remaining = self._seen, other_seen
+        merged = []
+        while len(merged) < sample_size and left_remaining + right_remaining > 0:
+            if random.randrange(left_remaining + right_remaining) < left_remaining:
+                merged.append(left.pop())
+                left_remaining -= 1
+            else:
+                merged.append(right.pop())
+                right_remaining -= 1
+        self._seen += other_seen
+        self._sample_size = sample_size
+        self._sample = merged
+
+    def finish(self):
+        return self._sample
+$$;
+
+CREATE OR REPLACE AGGREGATE FUNCTION reservoir_merge(
+    sample ARRAY,
+    seen NUMBER,
+    sample_size NUMBER
+)
+RETURNS ARRAY
+LANGUAGE PYTHON
+RUNTIME_VERSION = '3.11'
+HANDLER = 'ReservoirMerge'
+AS
+$$
+import random
+
+
+class ReservoirMerge:
+    def __init__(self):
+        self._seen = 0
+        self._sample_size = 0
+        self._sample = []
+
+    @property
+    def aggregate_state(self):
+        return [self._seen, self._sample_size, self._sample]
+
+    def accumulate(self, sample, seen, sample_size):
+        if sample is None or not seen:
+            return
+        self.merge([int(seen), int(sample_size), sample])
+
+    def merge(self, other_state):
+        other_seen, other_sample_size, other_sample = other_state
+        sample_size = max(self._sample_size, other_sample_size)
+        left, right = list(self._sample), list(other_sample)
+        random.shuffle(left)
+        random.shuffle(right)
+        left_remaining, right_remaining = self._seen, other_seen
+        merged = []
+        while len(merged) < sample_size and (left or right):
+            if left and (not right or random.randrange(left_remaining + right_remaining) < left_remaining):
+                merged.append(left.pop())
+                left_remaining -= 1
+            else:
+                merged.append(right.pop())
+                right_remaining -= 1
+        self._seen += other_seen
+        self._sample_size = sample_size
+        self._sample = merged
+
+    def finish(self):
+        return self._sample
+$$;
+
+CREATE OR REPLACE AGGREGATE FUNCTION histogram_sketch(
+    value FLOAT,
+    bin_count NUMBER
+)
+RETURNS OBJECT
+LANGUAGE PYTHON
+RUNTIME_VERSION = '3.11'
+HANDLER = 'HistogramSketch'
+AS
+$$
+import bisect
+
+
+class HistogramSketch:
+    CENTROIDS_PER_BIN = 10
+
+    def __init__(self):
+        self._count = 0
+        self._min = None
+        self._max = None
+        self._bin_count = 0
+        self._centroids = []
+        self._buffer = []
+
+    @property
+    def aggregate_state(self):
+        return [self._count, self._min, self._max, self._bin_count, self._centroids, self._buffer]
+
+    def accumulate(self, value, bin_count):
+        if value is None:
+            return
+        self._bin_count = int(bin_count)
+        self._count += 1
+        self._min = value if self._min is None else min(self._min, value)
+        self._max = value if self._max is None else max(self._max, value)
+        self._buffer.append(value)
+        if len(self._buffer) >= self._capacity():
+            self._compress()
+
+    def merge(self, other_state):
+        count, low, high, bin_count, centroids, buffer = other_state
+        if not count:
+            return
+        self._count += count
+        self._min = low if self._min is None else min(self._min, low)
+        self._max = high if self._max is None else max(self._max, high)
+        self._bin_count = max(self._bin_count, bin_count)
+        self._centroids.extend(centroids)
+        self._buffer.extend(buffer)
+        self._compress()
+
+    def finish(self):
+        if not self._count:
+            return None
+        self._compress()
+        bins = self._bin_count
+        width = (self._max - self._min) / bins
+        width_edges = [self._min + width * i for i in range(bins)] + [self._max]
+        width_counts = [0] * bins
+        for mean, weight in self._centroids:
+            slot = min(int((mean - self._min) / width), bins - 1) if width > 0 else 0
+            width_counts[slot] += weight
+        return {
+            "bins": bins,
+            "count": self._count,
+            "equi_width": {"edges": width_edges, "counts": width_counts},
+            "equi_depth": {"edges": self._quantile_edges(bins)},
+        }
+
+    def _capacity(self):
+        return max(self._bin_count, 1) * self.CENTROIDS_PER_BIN
+
+    def _compress(self):
+        points = sorted(self._centroids + [[value, 1] for value in self._buffer])
+        self._buffer = []
+        capacity = self._capacity()
+        if len(points) <= capacity:
+            self._centroids = points
+            return
+        seen = sum(weight for _, weight in points)
+        compressed = []
+        total, weighted, before = 0, 0.0, 0
+        for mean, weight in points:
+            total += weight
+            weighted += mean * weight
+            quantile = (before + total / 2) / seen
+            if total >= 4 * seen * quantile * (1 - quantile) / capacity:
+                compressed.append([weighted / total, total])
+                before += total
+                total, weighted = 0, 0.0
+        if total:
+            compressed.append([weighted / total, total])
+        self._centroids = compressed
+
+    def _quantile_edges(self, bins):
+        cumulative, means = [], []
+        running = 0
+        for mean, weight in self._centroids:
+            running += weight
+            cumulative.append(running - weight / 2)
+            means.append(mean)
+        edges = [self._min]
+        for i in range(1, bins):
+            rank = self._count * i / bins
+            slot = bisect.bisect_left(cumulative, rank)
+            if slot == 0:
+                edges.append(means[0])
+            elif slot == len(cumulative):
+                edges.append(means[-1])
+            else:
+                span = cumulative[slot] - cumulative[slot - 1]
+                fraction = (rank - cumulative[slot - 1]) / span if span else 0
+                edges.append(means[slot - 1] + fraction * (means[slot] - means[slot - 1]))
+        edges.append(self._max)
+        return edges
+$$;
+
+CREATE OR REPLACE PROCEDURE record_profile_run(
+    profile_run_id STRING,
+    target_table STRING,
+    profile_mode STRING,
+    run_started_at TIMESTAMP_NTZ
+)
+RETURNS STRING
+LANGUAGE SQL
+AS
+$$
+BEGIN
+    UPDATE profile_runs
+    SET is_latest = FALSE
+    WHERE table_name = :target_table AND is_latest;
+    INSERT INTO profile_runs (profile_run_id, table_name, profile_mode, column_count, started_at, completed_at, is_latest)
+    SELECT :profile_run_id, :target_table, :profile_mode, COUNT(*), :run_started_at, CURRENT_TIMESTAMP(), TRUE
+    FROM data_profile_results
+    WHERE table_name = :target_table
+    AND profile_run_id = :profile_run_id
+    AND profiled_at >= :run_started_at;
+    CALL apply_profile_retention(:target_table);
+    RETURN 'Recorded profile run ' || :profile_run_id;
+END;
+$$;
+
+CREATE OR REPLACE PROCEDURE apply_profile_retention(
+    target_table STRING DEFAULT NULL,
+    daily_retention_days NUMBER DEFAULT 30,
+    weekly_retention_weeks NUMBER DEFAULT NULL
+)
+RETURNS STRING
+LANGUAGE SQL
+AS
+$$
+DECLARE
+    expired_runs ARRAY;
+BEGIN
+    SELECT ARRAY_AGG(profile_run_id) INTO :expired_runs
+    FROM (
+        SELECT
+            profile_run_id,
+            is_latest,
+            started_at >= DATEADD('day', -:daily_retention_days, CURRENT_TIMESTAMP()) as in_daily_window,
+            :weekly_retention_weeks IS NULL
+                OR started_at >= DATEADD('week', -:weekly_retention_weeks, CURRENT_TIMESTAMP()) as in_weekly_window,
+            ROW_NUMBER() OVER (PARTITION BY table_name, TO_DATE(started_at) ORDER BY started_at DESC) as daily_rank,
+            ROW_NUMBER() OVER (PARTITION BY table_name, DATE_TRUNC('week', started_at) ORDER BY started_at DESC) as weekly_rank
+        FROM profile_runs
+        WHERE :target_table IS NULL OR table_name = :target_table
+    )
+    WHERE NOT (
+        is_latest
+        OR (in_daily_window AND daily_rank = 1)
+        OR (NOT in_daily_window AND in_weekly_window AND weekly_rank = 1)
+    );
+    IF (ARRAY_SIZE(:expired_runs) > 0) THEN
+        DELETE FROM data_profile_results WHERE ARRAY_CONTAINS(profile_run_id::VARIANT, :expired_runs);
+        DELETE FROM profile_runs WHERE ARRAY_CONTAINS(profile_run_id::VARIANT, :expired_runs);
+    END IF;
+    RETURN 'Removed ' || ARRAY_SIZE(:expired_runs) || ' expired profile snapshots';
+END;
+$$;
+
 CREATE OR REPLACE PROCEDURE profile_table(
     target_table STRING,
-    sample_size NUMBER DEFAULT 100
+    sample_size NUMBER DEFAULT 100,
+    profile_mode STRING DEFAULT 'EXACT',
+    sample_percent FLOAT DEFAULT 10,
+    sample_rows NUMBER DEFAULT NULL,
+    sample_method STRING DEFAULT 'SYSTEM',
+    watermark_column STRING DEFAULT NULL,
+    histogram_bins NUMBER DEFAULT 20,
+    columns_per_scan NUMBER DEFAULT 200
 )
 RETURNS STRING
 LANGUAGE SQL
@@ -81,267 +555,1726 @@ AS
 $$
 DECLARE
     result_message STRING;
-    col_cursor CURSOR FOR 
-        SELECT column_name, data_type 
-        FROM information_schema.columns 
-        WHERE table_name = :target_table;
+    column_query STRING;
+    profile_template STRING;
+    column_exprs STRING := '';
+    batch_columns NUMBER := 0;
+    total_columns NUMBER := 0;
+    scan_count NUMBER := 0;
+    profile_run_id STRING := UUID_STRING();
+    run_started_at TIMESTAMP_NTZ := CURRENT_TIMESTAMP();
+    full_row_count NUMBER;
+    population_expr STRING := 's.scanned_rows';
+    sample_clause STRING := '';
+    sample_label STRING := :sample_method;
 BEGIN
-    DELETE FROM data_profile_results WHERE table_name = :target_table;
-    FOR col IN col_cursor DO
-        LET col_name := col.column_name;
-        LET col_type := col.data_type;
-        EXECUTE IMMEDIATE '
-            INSERT INTO data_profile_results (
-                table_name, column_name, data_type, row_count, 
-                null_count, null_percentage, distinct_count, distinct_percentage,
-                min_value, max_value, avg_value, sample_values
-            )
-            SELECT 
-                ''' || :target_table || ''',
-                ''' || :col_name || ''',
-                ''' || :col_type || ''',
-                COUNT(*) as row_count,
-                COUNT(*) - COUNT(' || :col_name || ') as null_count,
-                ROUND((COUNT(*) - COUNT(' || :col_name || ')) * 100.0 / NULLIF(COUNT(*), 0), 2) as null_percentage,
-                COUNT(DISTINCT ' || :col_name || ') as distinct_count,
-                ROUND(COUNT(DISTINCT ' || :col_name || ') * 100.0 / NULLIF(COUNT(' || :col_name || '), 0), 2) as distinct_percentage,
-                TO_VARIANT(MIN(' || :col_name || ')) as min_value,
-                TO_VARIANT(MAX(' || :col_name || ')) as max_value,
-                TRY_CAST(AVG(TRY_CAST(' || :col_name || ' AS FLOAT)) AS FLOAT) as avg_value,
-                ARRAY_AGG(TO_VARIANT(' || :col_name || ')) WITHIN GROUP (ORDER BY RANDOM()) LIMIT ' || :sample_size || ' as sample_values
-            FROM ' || :target_table;
+    IF (profile_mode = 'INCREMENTAL') THEN
+        IF (watermark_column IS NULL) THEN
+            RETURN 'Incremental profiling requires a watermark column';
+        END IF;
+        CALL profile_table_incremental(:target_table, :watermark_column, :sample_size);
+        SELECT $1 INTO :result_message FROM TABLE(RESULT_SCAN(LAST_QUERY_ID()));
+        RETURN result_message;
+    END IF;
+    IF (profile_mode NOT IN ('EXACT', 'APPROXIMATE', 'SAMPLED')) THEN
+        RETURN 'Invalid profile mode: ' || :profile_mode;
+    END IF;
+    IF (profile_mode = 'SAMPLED') THEN
+        IF (sample_rows IS NOT NULL) THEN
+            sample_clause := ' SAMPLE (' || :sample_rows || ' ROWS)';
+            sample_label := 'ROWS';
+        ELSEIF (sample_method IN ('SYSTEM', 'BERNOULLI')) THEN
+            sample_clause := ' SAMPLE ' || :sample_method || ' (' || :sample_percent || ')';
+        ELSE
+            RETURN 'Invalid sample method: ' || :sample_method;
+        END IF;
+        SELECT COUNT(*) INTO :full_row_count FROM IDENTIFIER(:target_table);
+        population_expr := :full_row_count::STRING;
+    END IF;
+    column_query := '
+        SELECT column_name, data_type
+        FROM ' || SPLIT_PART(:target_table, '.', 1) || '.information_schema.columns
+        WHERE table_schema = ''' || SPLIT_PART(:target_table, '.', 2) || '''
+        AND table_name = ''' || SPLIT_PART(:target_table, '.', 3) || '''
+        ORDER BY ordinal_position';
+    profile_template := '
+        INSERT INTO data_profile_results (
+            profile_run_id, table_name, column_name, data_type, row_count,
+            null_count, null_percentage, distinct_count, distinct_percentage,
+            min_value, max_value, avg_value, sample_values,
+            profile_mode, median_value, percentiles, top_values, error_bounds, histogram
+        )
+        SELECT
+            ''' || :profile_run_id || ''',
+            ''' || :target_table || ''',
+            column_name,
+            data_type,
+            population_rows,
+            ROUND(null_ratio * population_rows),
+            ROUND(null_ratio * 100, 2),
+            distinct_count,
+            ROUND(distinct_count * 100.0 / NULLIF((1 - null_ratio) * population_rows, 0), 2),
+            min_value,
+            max_value,
+            avg_value,
+            sample_values,
+            ''' || :profile_mode || ''',
+            APPROX_PERCENTILE_ESTIMATE(percentile_state, 0.5),
+            IFF(percentile_state IS NULL, NULL, OBJECT_CONSTRUCT(
+                ''p05'', APPROX_PERCENTILE_ESTIMATE(percentile_state, 0.05),
+                ''p25'', APPROX_PERCENTILE_ESTIMATE(percentile_state, 0.25),
+                ''p50'', APPROX_PERCENTILE_ESTIMATE(percentile_state, 0.5),
+                ''p75'', APPROX_PERCENTILE_ESTIMATE(percentile_state, 0.75),
+                ''p95'', APPROX_PERCENTILE_ESTIMATE(percentile_state, 0.95)
+            )),
+            top_values,
+            CASE ''' || :profile_mode || '''
+                WHEN ''APPROXIMATE'' THEN OBJECT_CONSTRUCT(
+                    ''distinct_count'', OBJECT_CONSTRUCT(''method'', ''HLL'', ''relative_error'', 0.0162),
+                    ''percentiles'', IFF(percentile_state IS NULL, NULL, OBJECT_CONSTRUCT(''method'', ''T_DIGEST'', ''rank_error'', 0.01)),
+                    ''top_values'', OBJECT_CONSTRUCT(''method'', ''SPACE_SAVING'', ''max_count_error'', CEIL((scanned_rows - scanned_null_count) / 1000))
+                )
+                WHEN ''SAMPLED'' THEN OBJECT_CONSTRUCT(
+                    ''sample_method'', ''' || :sample_label || ''',
+                    ''scanned_rows'', scanned_rows,
+                    ''confidence'', 0.95,
+                    ''null_percentage'', OBJECT_CONSTRUCT(
+                        ''low'', ROUND(GREATEST(0, null_ratio - null_margin) * 100, 2),
+                        ''high'', ROUND(LEAST(1, null_ratio + null_margin) * 100, 2)
+                    ),
+                    ''avg_value'', IFF(avg_margin IS NULL, NULL, OBJECT_CONSTRUCT(
+                        ''low'', avg_value - avg_margin,
+                        ''high'', avg_value + avg_margin
+                    )),
+                    ''distinct_count'', OBJECT_CONSTRUCT(
+                        ''method'', IFF(distinct_count > scanned_distinct_count, ''SCALE_UP'', ''OBSERVED''),
+                        ''low'', scanned_distinct_count,
+                        ''high'', scanned_distinct_count + GREATEST(0, ROUND((1 - null_ratio) * (population_rows - scanned_rows)))
+                    )
+                )
+            END,
+            histogram
+        FROM (
+            SELECT
+                f.value:column_name::STRING as column_name,
+                f.value:data_type::STRING as data_type,
+                ' || :population_expr || ' as population_rows,
+                s.scanned_rows,
+                f.value:null_count::NUMBER as scanned_null_count,
+                f.value:distinct_count::NUMBER as scanned_distinct_count,
+                scanned_null_count / NULLIF(scanned_rows, 0) as null_ratio,
+                IFF(scanned_distinct_count >= 0.95 * (scanned_rows - scanned_null_count),
+                    ROUND(scanned_distinct_count * population_rows / NULLIF(scanned_rows, 0)),
+                    scanned_distinct_count) as distinct_count,
+                f.value:min_value as min_value,
+                f.value:max_value as max_value,
+                f.value:avg_value::FLOAT as avg_value,
+                f.value:sample_values::ARRAY as sample_values,
+                f.value:percentile_state::OBJECT as percentile_state,
+                f.value:top_values::ARRAY as top_values,
+                f.value:histogram::OBJECT as histogram,
+                1.96 * SQRT(null_ratio * (1 - null_ratio) / NULLIF(scanned_rows, 0)
+                    * GREATEST(0, 1 - scanned_rows / NULLIF(population_rows, 0))) as null_margin,
+                1.96 * f.value:stddev_value::FLOAT / SQRT(NULLIF(scanned_rows - scanned_null_count, 0))
+                    * SQRT(GREATEST(0, 1 - scanned_rows / NULLIF(population_rows, 0))) as avg_margin
+            FROM (
+                SELECT
+                    COUNT(*) as scanned_rows,
+                    ARRAY_CONSTRUCT(<column_stats>) as column_stats
+                FROM ' || :target_table || :sample_clause || '
+            ) s,
+            LATERAL FLATTEN(input => s.column_stats) f
+        )';
+    LET column_rs RESULTSET := (EXECUTE IMMEDIATE :column_query);
+    LET column_cursor CURSOR FOR column_rs;
+    FOR col IN column_cursor DO
+        LET col_name STRING := col.column_name;
+        LET col_type STRING := col.data_type;
+        LET col_ref STRING := '"' || col_name || '"';
+        LET avg_expr STRING := 'NULL';
+        LET min_expr STRING := 'NULL';
+        LET max_expr STRING := 'NULL';
+        LET distinct_expr STRING := 'COUNT(DISTINCT ' || :col_ref || ')';
+        LET sketch_exprs STRING := '';
+        IF (col_type IN ('NUMBER', 'FLOAT')) THEN
+            avg_expr := 'AVG(' || :col_ref || ')::FLOAT';
+            sketch_exprs := ',
+                        ''histogram'', OBJECT_INSERT(histogram_sketch(' || :col_ref || '::FLOAT, ' || :histogram_bins || '), ''value_type'', ''NUMBER'')';
+        ELSEIF (col_type = 'DATE' OR col_type LIKE 'TIMESTAMP%') THEN
+            sketch_exprs := ',
+                        ''histogram'', OBJECT_INSERT(histogram_sketch(DATE_PART(EPOCH_SECOND, ' || :col_ref || ')::FLOAT, ' || :histogram_bins || '), ''value_type'', ''EPOCH_SECOND'')';
+        END IF;
+        IF (col_type NOT IN ('VARIANT', 'OBJECT', 'ARRAY', 'GEOGRAPHY', 'GEOMETRY')) THEN
+            min_expr := 'TO_VARIANT(MIN(' || :col_ref || '))';
+            max_expr := 'TO_VARIANT(MAX(' || :col_ref || '))';
+        END IF;
+        IF (profile_mode = 'APPROXIMATE') THEN
+            distinct_expr := 'APPROX_COUNT_DISTINCT(' || :col_ref || ')';
+            sketch_exprs := sketch_exprs || ',
+                        ''top_values'', APPROX_TOP_K(' || :col_ref || ', 10, 1000)';
+            IF (col_type IN ('NUMBER', 'FLOAT')) THEN
+                sketch_exprs := sketch_exprs || ',
+                        ''percentile_state'', APPROX_PERCENTILE_ACCUMULATE(' || :col_ref || ')';
+            END IF;
+        ELSEIF (profile_mode = 'SAMPLED' AND col_type IN ('NUMBER', 'FLOAT')) THEN
+            sketch_exprs := sketch_exprs || ',
+                        ''stddev_value'', STDDEV(' || :col_ref || ')::FLOAT';
+        END IF;
+        column_exprs := column_exprs || ',
+                    OBJECT_CONSTRUCT(
+                        ''column_name'', ''' || :col_name || ''',
+                        ''data_type'', ''' || :col_type || ''',
+                        ''null_count'', COUNT(*) - COUNT(' || :col_ref || '),
+                        ''distinct_count'', ' || :distinct_expr || ',
+                        ''min_value'', ' || :min_expr || ',
+                        ''max_value'', ' || :max_expr || ',
+                        ''avg_value'', ' || :avg_expr || ',
+                        ''sample_values'', reservoir_sample(TO_VARIANT(' || :col_ref || '), ' || :sample_size || ')' || :sketch_exprs || '
+                    )';
+        batch_columns := batch_columns + 1;
+        total_columns := total_columns + 1;
+        IF (batch_columns >= columns_per_scan) THEN
+            EXECUTE IMMEDIATE REPLACE(:profile_template, '<column_stats>', SUBSTR(:column_exprs, 2));
+            scan_count := scan_count + 1;
+            column_exprs := '';
+            batch_columns := 0;
+        END IF;
     END FOR;
-    result_message := 'Successfully profiled table: ' || :target_table;
+    IF (batch_columns > 0) THEN
+        EXECUTE IMMEDIATE REPLACE(:profile_template, '<column_stats>', SUBSTR(:column_exprs, 2));
+        scan_count := scan_count + 1;
+    END IF;
+    CALL record_profile_run(:profile_run_id, :target_table, :profile_mode, :run_started_at);
+    result_message := 'Successfully profiled table: ' || :target_table || ' (' || :profile_mode || ', ' || :total_columns || ' columns in ' || :scan_count || ' scans)';
     RETURN result_message;
 END;
 $$;
 
-CREATE OR REPLACE PROCEDURE run_quality_checks(
-    target_table STRING
+CREATE OR REPLACE PROCEDURE profile_table_incremental(
+    target_table STRING,
+    watermark_column STRING,
+    sample_size NUMBER DEFAULT 100
 )
 RETURNS STRING
 LANGUAGE SQL
 AS
 $$
 DECLARE
-    check_cursor CURSOR FOR 
-        SELECT check_id, check_name, table_name, column_name, check_type, check_parameters, severity
-        FROM quality_check_configs 
-        WHERE table_name = :target_table AND is_active = TRUE;
-    total_checks NUMBER := 0;
+    column_query STRING;
+    column_exprs STRING := '';
+    total_columns NUMBER := 0;
+    state_columns NUMBER := 0;
+    watermark_type STRING;
+    last_watermark STRING;
+    delta_filter STRING := '';
+    delta_rows NUMBER := 0;
+    null_watermarks NUMBER;
+    profile_run_id STRING := UUID_STRING();
+    run_started_at TIMESTAMP_NTZ := CURRENT_TIMESTAMP();
 BEGIN
-    FOR check IN check_cursor DO
-        LET check_id := check.check_id;
-        LET check_type := check.check_type;
-        LET column_name := check.column_name;
-        LET check_params := check.check_parameters;
-        IF (check_type = 'NULL_CHECK') THEN
-            EXECUTE IMMEDIATE '
-                INSERT INTO quality_check_results (check_id, status, records_checked, records_failed, failure_rate, details)
-                SELECT 
-                    ''' || :check_id || ''',
-                    CASE WHEN null_count = 0 THEN ''PASSED'' ELSE ''FAILED'' END,
-                    total_count,
-                    null_count,
-                    ROUND(null_count * 100.0 / NULLIF(total_count, 0), 2),
-                    OBJECT_CONSTRUCT(''message'', ''Found '' || null_count || '' null values'')
-                FROM (
-                    SELECT 
-                        COUNT(*) as total_count,
-                        COUNT(*) - COUNT(' || :column_name || ') as null_count
-                    FROM ' || :target_table || '
-                )';
-        ELSEIF (check_type = 'DUPLICATE_CHECK') THEN
-            EXECUTE IMMEDIATE '
-                INSERT INTO quality_check_results (check_id, status, records_checked, records_failed, failure_rate, details)
-                SELECT 
-                    ''' || :check_id || ''',
-                    CASE WHEN duplicate_count = 0 THEN ''PASSED'' ELSE ''FAILED'' END,
-                    total_count,
-                    duplicate_count,
-                    ROUND(duplicate_count * 100.0 / NULLIF(total_count, 0), 2),
-                    OBJECT_CONSTRUCT(''message'', ''Found '' || duplicate_count || '' duplicate values'')
-                FROM (
-                    SELECT 
-                        COUNT(*) as total_count,
-                        COUNT(*) - COUNT(DISTINCT ' || :column_name || ') as duplicate_count
-                    FROM ' || :target_table || '
-                )';
+    column_query := '
+        SELECT
+            column_name,
+            data_type,
+            IFF(data_type = ''NUMBER'', ''NUMBER('' || numeric_precision || '','' || numeric_scale || '')'', data_type) as column_type
+        FROM ' || SPLIT_PART(:target_table, '.', 1) || '.information_schema.columns
+        WHERE table_schema = ''' || SPLIT_PART(:target_table, '.', 2) || '''
+        AND table_name = ''' || SPLIT_PART(:target_table, '.', 3) || '''
+        ORDER BY ordinal_position';
+    LET column_rs RESULTSET := (EXECUTE IMMEDIATE :column_query);
+    LET column_cursor CURSOR FOR column_rs;
+    FOR col IN column_cursor DO
+        LET col_name STRING := col.column_name;
+        LET col_type STRING := col.data_type;
+        LET col_ref STRING := '"' || col_name || '"';
+        LET sum_expr STRING := 'NULL';
+        LET min_expr STRING := 'NULL';
+        LET max_expr STRING := 'NULL';
+        IF (col_name = watermark_column) THEN
+            watermark_type := col.column_type;
         END IF;
-        total_checks := total_checks + 1;
+        IF (col_type IN ('NUMBER', 'FLOAT')) THEN
+            sum_expr := 'SUM(' || :col_ref || ')::FLOAT';
+        END IF;
+        IF (col_type NOT IN ('VARIANT', 'OBJECT', 'ARRAY', 'GEOGRAPHY', 'GEOMETRY')) THEN
+            min_expr := 'TO_VARIANT(MIN(' || :col_ref || '))';
+            max_expr := 'TO_VARIANT(MAX(' || :col_ref || '))';
+        END IF;
+        column_exprs := column_exprs || ',
+                            OBJECT_CONSTRUCT(
+                                ''column_name'', ''' || :col_name || ''',
+                                ''data_type'', ''' || :col_type || ''',
+                                ''null_count'', COUNT(*) - COUNT(' || :col_ref || '),
+                                ''value_sum'', ' || :sum_expr || ',
+                                ''min_value'', ' || :min_expr || ',
+                                ''max_value'', ' || :max_expr || ',
+                                ''hll_state'', HLL_EXPORT(HLL_ACCUMULATE(' || :col_ref || ')),
+                                ''sample_values'', reservoir_sample(TO_VARIANT(' || :col_ref || '), ' || :sample_size || ')
+                            )';
+        total_columns := total_columns + 1;
     END FOR;
-    RETURN 'Completed ' || total_checks || ' quality checks on ' || :target_table;
+    IF (watermark_type IS NULL) THEN
+        RETURN 'Watermark column not found: ' || :watermark_column;
+    END IF;
+    EXECUTE IMMEDIATE 'SELECT COUNT(*) - COUNT("' || :watermark_column || '") FROM ' || :target_table;
+    SELECT $1 INTO :null_watermarks FROM TABLE(RESULT_SCAN(LAST_QUERY_ID()));
+    IF (null_watermarks > 0) THEN
+        RETURN 'Incremental profiling requires a non-null watermark: ' || :null_watermarks || ' rows have a NULL ' || :watermark_column;
+    END IF;
+    SELECT COUNT(*), MAX(watermark_value) INTO :state_columns, :last_watermark
+    FROM profile_state
+    WHERE table_name = :target_table AND watermark_column = :watermark_column;
+    IF (state_columns <> total_columns) THEN
+        DELETE FROM profile_state WHERE table_name = :target_table;
+        last_watermark := NULL;
+    END IF;
+    IF (last_watermark IS NOT NULL) THEN
+        delta_filter := '
+                        WHERE "' || :watermark_column || '" > ''' || :last_watermark || '''::' || :watermark_type;
+    END IF;
+    EXECUTE IMMEDIATE '
+        MERGE INTO profile_state p
+        USING (
+            SELECT
+                column_name,
+                ANY_VALUE(data_type) as data_type,
+                SUM(row_count) as row_count,
+                SUM(null_count) as null_count,
+                SUM(value_sum) as value_sum,
+                MIN(min_value) as min_value,
+                MAX(max_value) as max_value,
+                HLL_EXPORT(HLL_COMBINE(HLL_IMPORT(hll_state))) as hll_state,
+                reservoir_merge(sample_values, row_count - null_count, ' || :sample_size || ') as sample_values,
+                COALESCE(MAX(IFF(is_delta, watermark_value, NULL)), MAX(watermark_value)) as watermark_value,
+                SUM(IFF(is_delta, row_count, 0)) as delta_rows
+            FROM (
+                SELECT
+                    column_name, data_type, row_count, null_count, value_sum,
+                    min_value, max_value, hll_state, sample_values, watermark_value,
+                    FALSE as is_delta
+                FROM profile_state
+                WHERE table_name = ''' || :target_table || '''
+                UNION ALL
+                SELECT
+                    f.value:column_name::STRING,
+                    f.value:data_type::STRING,
+                    d.delta_rows,
+                    f.value:null_count::NUMBER,
+                    f.value:value_sum::FLOAT,
+                    f.value:min_value,
+                    f.value:max_value,
+                    f.value:hll_state::OBJECT,
+                    f.value:sample_values::ARRAY,
+                    d.watermark_value,
+                    TRUE
+                FROM (
+                    SELECT
+                        COUNT(*) as delta_rows,
+                        TO_VARIANT(MAX("' || :watermark_column || '"))::STRING as watermark_value,
+                        ARRAY_CONSTRUCT(' || SUBSTR(:column_exprs, 2) || ') as column_stats
+                    FROM ' || :target_table || :delta_filter || '
+                ) d,
+                LATERAL FLATTEN(input => d.column_stats) f
+            )
+            GROUP BY column_name
+        ) m
+        ON p.table_name = ''' || :target_table || ''' AND p.column_name = m.column_name
+        WHEN MATCHED THEN UPDATE SET
+            data_type = m.data_type,
+            row_count = m.row_count,
+            null_count = m.null_count,
+            value_sum = m.value_sum,
+            min_value = m.min_value,
+            max_value = m.max_value,
+            hll_state = m.hll_state,
+            sample_values = m.sample_values,
+            watermark_value = m.watermark_value,
+            last_delta_rows = m.delta_rows,
+            updated_at = CURRENT_TIMESTAMP()
+        WHEN NOT MATCHED THEN INSERT (
+            table_name, column_name, data_type, watermark_column, watermark_value,
+            row_count, null_count, value_sum, min_value, max_value,
+            hll_state, sample_values, last_delta_rows
+        ) VALUES (
+            ''' || :target_table || ''', m.column_name, m.data_type, ''' || :watermark_column || ''', m.watermark_value,
+            m.row_count, m.null_count, m.value_sum, m.min_value, m.max_value,
+            m.hll_state, m.sample_values, m.delta_rows
+        )';
+    SELECT MAX(last_delta_rows) INTO :delta_rows FROM profile_state WHERE table_name = :target_table;
+    INSERT INTO data_profile_results (
+        profile_run_id, table_name, column_name, data_type, row_count,
+        null_count, null_percentage, distinct_count, distinct_percentage,
+        min_value, max_value, avg_value, sample_values,
+        profile_mode, error_bounds
+    )
+    SELECT
+        :profile_run_id,
+        table_name,
+        column_name,
+        data_type,
+        row_count,
+        null_count,
+        ROUND(null_count * 100.0 / NULLIF(row_count, 0), 2),
+        HLL_ESTIMATE(HLL_IMPORT(hll_state)),
+        ROUND(HLL_ESTIMATE(HLL_IMPORT(hll_state)) * 100.0 / NULLIF(row_count - null_count, 0), 2),
+        min_value,
+        max_value,
+        value_sum / NULLIF(row_count - null_count, 0),
+        sample_values,
+        'INCREMENTAL',
+        OBJECT_CONSTRUCT(
+            'distinct_count', OBJECT_CONSTRUCT('method', 'HLL', 'relative_error', 0.0162),
+            'watermark_column', watermark_column,
+            'watermark_value', watermark_value,
+            'delta_rows', last_delta_rows
+        )
+    FROM profile_state
+    WHERE table_name = :target_table;
+    CALL record_profile_run(:profile_run_id, :target_table, 'INCREMENTAL', :run_started_at);
+    RETURN 'Successfully profiled table: ' || :target_table || ' (INCREMENTAL, ' || :total_columns || ' columns, ' || :delta_rows || ' new rows since ' || COALESCE(:last_watermark, 'initial load') || ')';
 END;
 $$;
 
-CREATE OR REPLACE PROCEDURE deduplicate_table(
-    source_table STRING,
+CREATE OR REPLACE PROCEDURE profile_table_task(
+    batch_id STRING,
     target_table STRING,
-    key_columns ARRAY
+    sample_size NUMBER DEFAULT 100,
+    profile_mode STRING DEFAULT 'EXACT'
 )
 RETURNS STRING
 LANGUAGE SQL
 AS
 $$
 DECLARE
-    key_cols_str STRING;
-    rows_before NUMBER;
-    rows_after NUMBER;
+    result_message STRING;
+BEGIN
+    UPDATE batch_run_progress
+    SET status = 'RUNNING', started_at = CURRENT_TIMESTAMP()
+    WHERE batch_id = :batch_id AND object_name = :target_table;
+    BEGIN
+        CALL profile_table(:target_table, :sample_size, :profile_mode);
+        SELECT $1 INTO :result_message FROM TABLE(RESULT_SCAN(LAST_QUERY_ID()));
+        UPDATE batch_run_progress
+        SET status = 'COMPLETED', completed_at = CURRENT_TIMESTAMP(), message = :result_message
+        WHERE batch_id = :batch_id AND object_name = :target_table;
+    EXCEPTION
+        WHEN OTHER THEN
+            result_message := SQLERRM;
+            UPDATE batch_run_progress
+            SET status = 'FAILED', completed_at = CURRENT_TIMESTAMP(), message = :result_message
+            WHERE batch_id = :batch_id AND object_name = :target_table;
+    END;
+    RETURN result_message;
+END;
+$$;
+
+CREATE OR REPLACE PROCEDURE profile_schema_worker(
+    batch_id STRING,
+    sample_size NUMBER DEFAULT 100,
+    profile_mode STRING DEFAULT 'EXACT'
+)
+RETURNS STRING
+LANGUAGE SQL
+AS
+$$
+DECLARE
+    next_table STRING;
+    profiled NUMBER := 0;
+BEGIN
+    LOOP
+        SELECT ANY_VALUE(object_name) INTO :next_table
+        FROM (
+            SELECT object_name
+            FROM batch_run_progress
+            WHERE batch_id = :batch_id AND status = 'QUEUED'
+            ORDER BY estimated_bytes DESC NULLS LAST, estimated_rows DESC NULLS LAST
+            LIMIT 1
+        );
+        IF (next_table IS NULL) THEN
+            BREAK;
+        END IF;
+        UPDATE batch_run_progress
+        SET status = 'RUNNING', started_at = CURRENT_TIMESTAMP()
+        WHERE batch_id = :batch_id AND object_name = :next_table AND status = 'QUEUED';
+        IF (SQLROWCOUNT = 1) THEN
+            CALL profile_table_task(:batch_id, :next_table, :sample_size, :profile_mode);
+            profiled := profiled + 1;
+        END IF;
+    END LOOP;
+    RETURN 'Worker profiled ' || :profiled || ' tables';
+END;
+$$;
+
+CREATE OR REPLACE PROCEDURE profile_schema(
+    database_name STRING,
+    schema_name STRING,
+    max_concurrency NUMBER DEFAULT 8,
+    sample_size NUMBER DEFAULT 100,
+    profile_mode STRING DEFAULT 'EXACT'
+)
+RETURNS STRING
+LANGUAGE SQL
+AS
+$$
+DECLARE
+    batch_id STRING := UUID_STRING();
+    launched NUMBER := 0;
+    worker_count NUMBER;
+    failed_tables NUMBER := 0;
 BEGIN
-    SELECT ARRAY_TO_STRING(:key_columns, ', ') INTO :key_cols_str;
-    EXECUTE IMMEDIATE 'SELECT COUNT(*) FROM ' || :source_table INTO :rows_before;
     EXECUTE IMMEDIATE '
-        CREATE OR REPLACE TABLE ' || :target_table || ' AS
-        SELECT * FROM (
-            SELECT *, 
-                   ROW_NUMBER() OVER (PARTITION BY ' || :key_cols_str || ' ORDER BY (SELECT NULL)) as rn
-            FROM ' || :source_table || '
-        )
-        WHERE rn = 1';
-    EXECUTE IMMEDIATE 'ALTER TABLE ' || :target_table || ' DROP COLUMN rn';
-    EXECUTE IMMEDIATE 'SELECT COUNT(*) FROM ' || :target_table INTO :rows_after;
-    RETURN 'Deduplication complete. Rows before: ' || :rows_before || ', Rows after: ' || :rows_after || ', Duplicates removed: ' || (:rows_before - :rows_after);
+        INSERT INTO batch_run_progress (batch_id, batch_type, object_name, estimated_rows, estimated_bytes)
+        SELECT
+            ''' || :batch_id || ''',
+            ''PROFILE_SCHEMA'',
+            table_catalog || ''.'' || table_schema || ''.'' || table_name,
+            row_count,
+            bytes
+        FROM ' || :database_name || '.information_schema.tables
+        WHERE table_schema = ''' || :schema_name || '''
+        AND table_type = ''BASE TABLE''';
+    SELECT COUNT(*) INTO :launched FROM batch_run_progress WHERE batch_id = :batch_id;
+    worker_count := LEAST(max_concurrency, launched);
+    FOR worker IN 1 TO worker_count DO
+        ASYNC (CALL profile_schema_worker(:batch_id, :sample_size, :profile_mode));
+    END FOR;
+    AWAIT ALL;
+    SELECT COUNT(*) INTO :failed_tables
+    FROM batch_run_progress
+    WHERE batch_id = :batch_id AND status = 'FAILED';
+    RETURN 'Profiled ' || (:launched - :failed_tables) || ' of ' || :launched || ' tables in ' || :database_name || '.' || :schema_name || ' (batch ' || :batch_id || ')';
 END;
 $$;
 
-CREATE OR REPLACE PROCEDURE clean_null_values(
-    source_table STRING,
-    target_table STRING,
-    strategy STRING,
-    columns_to_clean ARRAY DEFAULT NULL
+CREATE OR REPLACE FUNCTION quality_check_expr(
+    check_type STRING,
+    column_name STRING,
+    check_params VARIANT
+)
+RETURNS OBJECT
+LANGUAGE PYTHON
+RUNTIME_VERSION = '3.11'
+HANDLER = 'check_expr'
+AS
+$$
+import math
+
+
+def sql_literal(value):
+    return "'" + str(value).replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+def check_expr(check_type, column_name, check_params):
+    params = check_params or {}
+    col_ref = '"' + column_name + '"' if column_name else None
+    if check_type == "UNIQUENESS_CHECK":
+        if col_ref is None:
+            return {"failed_expr": "COUNT(*) - COUNT(DISTINCT HASH(*))", "failure_label": "non-unique row"}
+        return {"failed_expr": f"COUNT({col_ref}) - COUNT(DISTINCT {col_ref})", "failure_label": "non-unique"}
+    if check_type not in ("NULL_CHECK", "DUPLICATE_CHECK", "RANGE_CHECK", "PATTERN_CHECK"):
+        return {"error": f"Unsupported check type: {check_type}"}
+    if col_ref is None:
+        return {"error": f"{check_type} requires a column"}
+    if check_type == "DUPLICATE_CHECK":
+        return {"failed_expr": f"COUNT(*) - COUNT(DISTINCT {col_ref})", "failure_label": "duplicate"}
+    result = {}
+    if check_type == "NULL_CHECK":
+        result["failed_pred"], result["failure_label"] = f"{col_ref} IS NULL", "null"
+    elif check_type == "RANGE_CHECK":
+        conditions = []
+        for key, operator in (("min_value", "<"), ("max_value", ">")):
+            if params.get(key) is None:
+                continue
+            try:
+                bound = float(params[key])
+            except (TypeError, ValueError):
+                bound = math.nan
+            if not math.isfinite(bound):
+                return {"error": f"RANGE_CHECK {key} must be a number"}
+            conditions.append(f"{col_ref} {operator} {bound!r}")
+        if not conditions:
+            return {"error": "RANGE_CHECK requires min_value or max_value"}
+        result["failed_pred"], result["failure_label"] = " OR ".join(conditions), "out-of-range"
+    else:
+        if params.get("pattern") is None:
+            return {"error": "PATTERN_CHECK requires a pattern"}
+        result["pattern_literal"] = sql_literal(params["pattern"])
+        result["failed_pred"] = f"NOT REGEXP_LIKE({col_ref}::STRING, {result['pattern_literal']})"
+        result["failure_label"] = "non-matching"
+    result["failed_expr"] = f"COUNT_IF({result['failed_pred']})"
+    return result
+$$;
+
+CREATE OR REPLACE FUNCTION quality_check_status(
+    records_failed FLOAT,
+    records_checked FLOAT,
+    failure_threshold FLOAT
+)
+RETURNS STRING
+AS
+$$
+    CASE WHEN records_failed * 100.0 / NULLIF(records_checked, 0) > failure_threshold THEN 'FAILED' ELSE 'PASSED' END
+$$;
+
+CREATE OR REPLACE PROCEDURE run_quality_checks(
+    target_table STRING
 )
 RETURNS STRING
 LANGUAGE SQL
 AS
 $$
 DECLARE
-    col_cursor CURSOR FOR 
-        SELECT column_name, data_type 
-        FROM information_schema.columns 
-        WHERE table_name = :source_table;
-    select_clause STRING := '';
-    first_col BOOLEAN := TRUE;
+    check_cursor CURSOR FOR
+        SELECT check_id, check_name, table_name, column_name, check_type, check_parameters, severity
+        FROM quality_check_configs
+        WHERE table_name = :target_table AND is_active = TRUE;
+    total_checks NUMBER := 0;
+    fused_checks NUMBER := 0;
+    check_exprs STRING := '';
+    sampled_checks NUMBER := 0;
+    sampled_exprs STRING := '';
+    sample_percent FLOAT := 0;
+    early_exit_checks ARRAY := ARRAY_CONSTRUCT();
+    resolved_checks ARRAY := ARRAY_CONSTRUCT();
+    round_resolved ARRAY;
+    round_exprs STRING;
+    captured_checks ARRAY := ARRAY_CONSTRUCT();
+    capturing_checks NUMBER;
+    capture_bytes NUMBER := 8000000;
+    prefix_rows NUMBER := 1000000;
+    table_rows NUMBER;
+    table_scans NUMBER := 0;
+    scan_started_at TIMESTAMP_NTZ;
+    scan_elapsed_ms NUMBER;
+    scan_query_id STRING;
 BEGIN
-    IF (strategy = 'DROP') THEN
-        IF (columns_to_clean IS NULL) THEN
-            EXECUTE IMMEDIATE '
-                CREATE OR REPLACE TABLE ' || :target_table || ' AS
-                SELECT * FROM ' || :source_table || '
-                WHERE NOT EXISTS (
-                    SELECT 1 FROM information_schema.columns c
-                    WHERE c.table_name = ''' || :source_table || '''
-                    AND COLUMN_NAME IS NULL
-                )';
-        ELSE
-            LET where_clause STRING := '';
-            FOR i IN 0 TO ARRAY_SIZE(:columns_to_clean) - 1 DO
-                IF (i > 0) THEN
-                    where_clause := where_clause || ' AND ';
-                END IF;
-                where_clause := where_clause || columns_to_clean[i] || ' IS NOT NULL';
-            END FOR;
-            EXECUTE IMMEDIATE '
-                CREATE OR REPLACE TABLE ' || :target_table || ' AS
-                SELECT * FROM ' || :source_table || '
-                WHERE ' || :where_clause;
-        END IF;
-    ELSEIF (strategy = 'FILL_ZERO') THEN
-        FOR col IN col_cursor DO
-            IF (NOT first_col) THEN
-                select_clause := select_clause || ', ';
+    SELECT GREATEST(COUNT_IF(COALESCE(check_parameters:capture_failures::BOOLEAN, FALSE)), 1) INTO :capturing_checks
+    FROM quality_check_configs
+    WHERE table_name = :target_table AND is_active = TRUE;
+    FOR check IN check_cursor DO
+        LET check_id := check.check_id;
+        LET check_type := check.check_type;
+        LET column_name := check.column_name;
+        LET check_params := check.check_parameters;
+        LET check_sql OBJECT := quality_check_expr(check_type, column_name, check_params);
+        LET failed_expr STRING := check_sql:failed_expr::STRING;
+        LET failed_pred STRING := check_sql:failed_pred::STRING;
+        LET failure_label STRING := check_sql:failure_label::STRING;
+        LET check_error STRING := check_sql:error::STRING;
+        IF (check_sql:pattern_literal IS NOT NULL) THEN
+            BEGIN
+                EXECUTE IMMEDIATE 'SELECT REGEXP_LIKE('''', ' || check_sql:pattern_literal::STRING || ')';
+            EXCEPTION
+                WHEN OTHER THEN
+                    failed_expr := NULL;
+                    failed_pred := NULL;
+                    check_error := 'Invalid pattern: ' || SQLERRM;
+            END;
+        END IF;
+        IF (check_error IS NOT NULL) THEN
+            INSERT INTO quality_check_results (check_id, status, details)
+            SELECT :check_id, 'ERROR', OBJECT_CONSTRUCT('message', :check_error);
+        END IF;
+        LET capture_expr STRING := '';
+        IF (failed_pred IS NOT NULL AND COALESCE(check_params:capture_failures::BOOLEAN, FALSE)) THEN
+            LET key_columns ARRAY := COALESCE(check_params:key_columns, ARRAY_CONSTRUCT());
+            LET key_object STRING := 'OBJECT_CONSTRUCT_KEEP_NULL(*)';
+            LET captured_width NUMBER := ARRAY_SIZE(key_columns);
+            IF (captured_width > 0) THEN
+                SELECT 'OBJECT_CONSTRUCT_KEEP_NULL(' || LISTAGG('''' || f.value::STRING || ''', "' || f.value::STRING || '"', ', ') || ')'
+                INTO :key_object
+                FROM TABLE(FLATTEN(input => :key_columns)) f;
+            ELSE
+                EXECUTE IMMEDIATE 'SELECT ARRAY_SIZE(OBJECT_KEYS(OBJECT_CONSTRUCT_KEEP_NULL(*))) FROM ' || :target_table || ' LIMIT 1';
+                SELECT COALESCE(MAX($1), 1) INTO :captured_width FROM TABLE(RESULT_SCAN(LAST_QUERY_ID()));
+            END IF;
+            LET max_captured_rows NUMBER := LEAST(
+                COALESCE(check_params:max_captured_rows::NUMBER, 1000),
+                GREATEST(FLOOR(:capture_bytes / :capturing_checks / (64 * :captured_width)), 1)
+            );
+            capture_expr := ',
+                        ''captured_rows'', reservoir_sample(IFF(' || :failed_pred || ', TO_VARIANT(' || :key_object || '), NULL), ' || :max_captured_rows || ')';
+            captured_checks := ARRAY_APPEND(captured_checks, check_id);
+        END IF;
+        IF (failed_expr IS NOT NULL) THEN
+            LET evaluation_mode STRING := COALESCE(UPPER(check_params:evaluation_mode::STRING), 'EXACT');
+            IF (evaluation_mode = 'SAMPLED' AND check_type IN ('DUPLICATE_CHECK', 'UNIQUENESS_CHECK')) THEN
+                evaluation_mode := 'EXACT';
             END IF;
-            IF (col.data_type IN ('NUMBER', 'FLOAT', 'INTEGER')) THEN
-                select_clause := select_clause || 'COALESCE(' || col.column_name || ', 0) AS ' || col.column_name;
+            LET check_expr STRING := '
+                    OBJECT_CONSTRUCT(
+                        ''check_id'', ''' || :check_id || ''',
+                        ''failure_label'', ''' || :failure_label || ''',
+                        ''failure_threshold'', ' || COALESCE(check_params:failure_threshold::FLOAT, 0) || ',
+                        ''confidence'', ' || COALESCE(check_params:confidence::FLOAT, 0.95) || ',
+                        ''records_failed'', ' || :failed_expr || :capture_expr || '
+                    )';
+            IF (evaluation_mode = 'SAMPLED') THEN
+                sampled_exprs := sampled_exprs || ',' || check_expr;
+                sample_percent := GREATEST(sample_percent, COALESCE(check_params:sample_percent::FLOAT, 10));
+                sampled_checks := sampled_checks + 1;
+            ELSEIF (evaluation_mode = 'INCREMENTAL') THEN
+                CALL run_quality_check_incremental(:check_id, :target_table, :check_type, :column_name, :check_params, :failed_expr, :failure_label);
+                table_scans := table_scans + 1;
+            ELSEIF (evaluation_mode = 'EARLY_EXIT') THEN
+                early_exit_checks := ARRAY_APPEND(early_exit_checks, OBJECT_CONSTRUCT('check_id', check_id, 'expr', check_expr));
             ELSE
-                select_clause := select_clause || col.column_name;
+                check_exprs := check_exprs || ',' || check_expr;
+                fused_checks := fused_checks + 1;
             END IF;
-            first_col := FALSE;
-        END FOR;
+        END IF;
+        total_checks := total_checks + 1;
+    END FOR;
+    IF (ARRAY_SIZE(captured_checks) > 0) THEN
+        DELETE FROM quality_check_exceptions WHERE ARRAY_CONTAINS(check_id::VARIANT, :captured_checks);
+    END IF;
+    IF (fused_checks > 0) THEN
+        scan_started_at := CURRENT_TIMESTAMP();
         EXECUTE IMMEDIATE '
-            CREATE OR REPLACE TABLE ' || :target_table || ' AS
-            SELECT ' || :select_clause || '
-            FROM ' || :source_table;
+            SELECT
+                COUNT(*) as total_count,
+                ARRAY_CONSTRUCT(' || SUBSTR(:check_exprs, 2) || ') as checks
+            FROM ' || :target_table;
+        scan_query_id := LAST_QUERY_ID();
+        scan_elapsed_ms := DATEDIFF('millisecond', :scan_started_at, CURRENT_TIMESTAMP());
+        table_scans := table_scans + 1;
+        INSERT INTO quality_check_results (check_id, status, records_checked, records_failed, failure_rate, details)
+        SELECT
+            f.value:check_id::STRING,
+            quality_check_status(f.value:records_failed, s.total_count, f.value:failure_threshold),
+            s.total_count,
+            f.value:records_failed::NUMBER,
+            ROUND(f.value:records_failed * 100.0 / NULLIF(s.total_count, 0), 2),
+            OBJECT_CONSTRUCT(
+                'message', 'Found ' || f.value:records_failed || ' ' || f.value:failure_label || ' values',
+                'evaluation_mode', 'EXACT',
+                'exact', TRUE,
+                'captured_rows', ARRAY_SIZE(f.value:captured_rows),
+                'checks_in_scan', :fused_checks,
+                'scan_elapsed_ms', :scan_elapsed_ms,
+                'scan_query_id', :scan_query_id
+            )
+        FROM TABLE(RESULT_SCAN(:scan_query_id)) s,
+        LATERAL FLATTEN(input => s.checks) f;
+        INSERT INTO quality_check_exceptions (check_id, scan_query_id, row_index, failed_row)
+        SELECT f.value:check_id::STRING, :scan_query_id, c.index, c.value
+        FROM TABLE(RESULT_SCAN(:scan_query_id)) s,
+        LATERAL FLATTEN(input => s.checks) f,
+        LATERAL FLATTEN(input => f.value:captured_rows) c;
+    END IF;
+    IF (sampled_checks > 0 OR ARRAY_SIZE(early_exit_checks) > 0) THEN
+        SELECT COUNT(*) INTO :table_rows FROM IDENTIFIER(:target_table);
+    END IF;
+    IF (sampled_checks > 0) THEN
+        scan_started_at := CURRENT_TIMESTAMP();
+        EXECUTE IMMEDIATE '
+            SELECT
+                COUNT(*) as total_count,
+                ARRAY_CONSTRUCT(' || SUBSTR(:sampled_exprs, 2) || ') as checks
+            FROM ' || :target_table || ' SAMPLE BERNOULLI (' || LEAST(:sample_percent, 100) || ')';
+        scan_query_id := LAST_QUERY_ID();
+        scan_elapsed_ms := DATEDIFF('millisecond', :scan_started_at, CURRENT_TIMESTAMP());
+        table_scans := table_scans + 1;
+        INSERT INTO quality_check_results (check_id, status, records_checked, records_failed, failure_rate, details)
+        SELECT
+            check_id,
+            quality_check_status(sample_failed, sample_rows, failure_threshold),
+            :table_rows,
+            ROUND(failed_ratio * :table_rows),
+            ROUND(failed_ratio * 100, 2),
+            OBJECT_CONSTRUCT(
+                'message', 'Estimated ' || ROUND(failed_ratio * :table_rows) || ' ' || failure_label || ' values from ' || sample_rows || ' sampled rows',
+                'evaluation_mode', 'SAMPLED',
+                'exact', FALSE,
+                'sample_percent', :sample_percent,
+                'sample_rows', sample_rows,
+                'sample_failed', sample_failed,
+                'confidence', confidence,
+                'failure_rate_low', ROUND(GREATEST(center - half_width, 0) * 100, 4),
+                'failure_rate_high', ROUND(LEAST(center + half_width, 1) * 100, 4),
+                'captured_rows', ARRAY_SIZE(captured_rows),
+                'checks_in_scan', :sampled_checks,
+                'scan_elapsed_ms', :scan_elapsed_ms,
+                'scan_query_id', :scan_query_id
+            )
+        FROM (
+            SELECT
+                check_id, failure_label, failure_threshold, confidence, sample_rows, sample_failed, failed_ratio, captured_rows,
+                (failed_ratio + z * z / (2 * sample_rows)) / (1 + z * z / sample_rows) as center,
+                z * SQRT(failed_ratio * (1 - failed_ratio) / sample_rows + z * z / (4 * sample_rows * sample_rows))
+                    / (1 + z * z / sample_rows) as half_width
+            FROM (
+                SELECT
+                    f.value:check_id::STRING as check_id,
+                    f.value:failure_label::STRING as failure_label,
+                    f.value:failure_threshold::FLOAT as failure_threshold,
+                    f.value:confidence::FLOAT as confidence,
+                    CASE
+                        WHEN f.value:confidence >= 0.99 THEN 2.576
+                        WHEN f.value:confidence >= 0.95 THEN 1.960
+                        WHEN f.value:confidence >= 0.90 THEN 1.645
+                        ELSE 1.282
+                    END as z,
+                    NULLIF(s.total_count, 0) as sample_rows,
+                    f.value:records_failed::NUMBER as sample_failed,
+                    f.value:records_failed / NULLIF(s.total_count, 0) as failed_ratio,
+                    f.value:captured_rows as captured_rows
+                FROM TABLE(RESULT_SCAN(:scan_query_id)) s,
+                LATERAL FLATTEN(input => s.checks) f
+            )
+        );
+        INSERT INTO quality_check_exceptions (check_id, scan_query_id, row_index, failed_row)
+        SELECT f.value:check_id::STRING, :scan_query_id, c.index, c.value
+        FROM TABLE(RESULT_SCAN(:scan_query_id)) s,
+        LATERAL FLATTEN(input => s.checks) f,
+        LATERAL FLATTEN(input => f.value:captured_rows) c;
     END IF;
-    RETURN 'Null value cleaning complete using strategy: ' || :strategy;
+    WHILE (ARRAY_SIZE(resolved_checks) < ARRAY_SIZE(early_exit_checks)) DO
+        SELECT LISTAGG(f.value:expr::STRING, ',') INTO :round_exprs
+        FROM TABLE(FLATTEN(input => :early_exit_checks)) f
+        WHERE NOT ARRAY_CONTAINS(f.value:check_id, :resolved_checks);
+        scan_started_at := CURRENT_TIMESTAMP();
+        EXECUTE IMMEDIATE '
+            SELECT
+                COUNT(*) as total_count,
+                ARRAY_CONSTRUCT(' || :round_exprs || ') as checks
+            FROM (SELECT * FROM ' || :target_table || ' LIMIT ' || :prefix_rows || ')';
+        scan_query_id := LAST_QUERY_ID();
+        scan_elapsed_ms := DATEDIFF('millisecond', :scan_started_at, CURRENT_TIMESTAMP());
+        table_scans := table_scans + 1;
+        SELECT ARRAY_AGG(f.value:check_id) INTO :round_resolved
+        FROM TABLE(RESULT_SCAN(:scan_query_id)) s,
+        LATERAL FLATTEN(input => s.checks) f
+        WHERE s.total_count < :prefix_rows
+        OR s.total_count >= :table_rows
+        OR quality_check_status(f.value:records_failed, :table_rows, f.value:failure_threshold) = 'FAILED';
+        INSERT INTO quality_check_results (check_id, status, records_checked, records_failed, failure_rate, details)
+        SELECT
+            f.value:check_id::STRING,
+            quality_check_status(f.value:records_failed, :table_rows, f.value:failure_threshold),
+            s.total_count,
+            f.value:records_failed::NUMBER,
+            ROUND(f.value:records_failed * 100.0 / NULLIF(s.total_count, 0), 2),
+            OBJECT_CONSTRUCT(
+                'message', 'Found ' || IFF(s.total_count < :table_rows, 'at least ', '') || f.value:records_failed || ' ' || f.value:failure_label || ' values in ' || s.total_count || ' rows',
+                'evaluation_mode', 'EARLY_EXIT',
+                'exact', s.total_count >= :table_rows,
+                'rows_scanned', s.total_count,
+                'table_rows', :table_rows,
+                'captured_rows', ARRAY_SIZE(f.value:captured_rows),
+                'scan_elapsed_ms', :scan_elapsed_ms,
+                'scan_query_id', :scan_query_id
+            )
+        FROM TABLE(RESULT_SCAN(:scan_query_id)) s,
+        LATERAL FLATTEN(input => s.checks) f
+        WHERE ARRAY_CONTAINS(f.value:check_id, :round_resolved);
+        INSERT INTO quality_check_exceptions (check_id, scan_query_id, row_index, failed_row)
+        SELECT f.value:check_id::STRING, :scan_query_id, c.index, c.value
+        FROM TABLE(RESULT_SCAN(:scan_query_id)) s,
+        LATERAL FLATTEN(input => s.checks) f,
+        LATERAL FLATTEN(input => f.value:captured_rows) c
+        WHERE ARRAY_CONTAINS(f.value:check_id, :round_resolved);
+        resolved_checks := ARRAY_CAT(resolved_checks, round_resolved);
+        prefix_rows := prefix_rows * 10;
+    END WHILE;
+    RETURN 'Completed ' || total_checks || ' quality checks on ' || :target_table || ' in ' || :table_scans || ' table scans';
 END;
 $$;
 
-CREATE OR REPLACE PROCEDURE standardize_text_column(
-    source_table STRING,
+CREATE OR REPLACE PROCEDURE run_quality_check_incremental(
+    check_id STRING,
     target_table STRING,
+    check_type STRING,
     column_name STRING,
-    operation STRING
+    check_params VARIANT,
+    failed_expr STRING,
+    failure_label STRING
 )
 RETURNS STRING
 LANGUAGE SQL
 AS
 $$
 DECLARE
-    transformation_expr STRING;
+    watermark_column STRING := check_params:watermark_column::STRING;
+    exact_keys BOOLEAN := COALESCE(check_params:exact_keys::BOOLEAN, FALSE);
+    max_exact_keys NUMBER := COALESCE(check_params:max_exact_keys::NUMBER, 500000);
+    failure_threshold FLOAT := COALESCE(check_params:failure_threshold::FLOAT, 0);
+    config_hash NUMBER := HASH(check_type, column_name, check_params);
+    is_key_check BOOLEAN := check_type IN ('DUPLICATE_CHECK', 'UNIQUENESS_CHECK');
+    key_ref STRING;
+    count_ref STRING;
+    last_watermark STRING;
+    delta_filter STRING := '';
+    delta_rows NUMBER;
+    scan_started_at TIMESTAMP_NTZ;
+    scan_elapsed_ms NUMBER;
+    scan_query_id STRING;
+    null_watermarks NUMBER;
+    key_values NUMBER;
 BEGIN
-    CASE (operation)
-        WHEN 'UPPERCASE' THEN
-            transformation_expr := 'UPPER(' || :column_name || ')';
-        WHEN 'LOWERCASE' THEN
-            transformation_expr := 'LOWER(' || :column_name || ')';
-        WHEN 'TRIM' THEN
-            transformation_expr := 'TRIM(' || :column_name || ')';
-        WHEN 'REMOVE_SPECIAL_CHARS' THEN
-            transformation_expr := 'REGEXP_REPLACE(' || :column_name || ', ''[^a-zA-Z0-9 ]'', '''')';
-        ELSE
-            RETURN 'Invalid operation: ' || :operation;
-    END CASE;
+    IF (watermark_column IS NULL) THEN
+        INSERT INTO quality_check_results (check_id, status, details)
+        SELECT :check_id, 'ERROR', OBJECT_CONSTRUCT('message', 'INCREMENTAL evaluation requires a watermark_column');
+        RETURN 'Missing watermark column for check ' || :check_id;
+    END IF;
+    key_ref := IFF(COALESCE(column_name, '') = '', 'HASH(*)', '"' || column_name || '"');
+    count_ref := IFF(check_type = 'DUPLICATE_CHECK', '*', key_ref);
+    EXECUTE IMMEDIATE 'SELECT COUNT(*) - COUNT("' || :watermark_column || '"), COUNT(' || :count_ref || ') FROM ' || :target_table;
+    SELECT $1, $2 INTO :null_watermarks, :key_values FROM TABLE(RESULT_SCAN(LAST_QUERY_ID()));
+    IF (null_watermarks > 0) THEN
+        INSERT INTO quality_check_results (check_id, status, details)
+        SELECT :check_id, 'ERROR', OBJECT_CONSTRUCT('message', 'INCREMENTAL evaluation requires a non-null watermark: ' || :null_watermarks || ' rows have a NULL ' || :watermark_column);
+        RETURN 'NULL watermark values for check ' || :check_id;
+    END IF;
+    IF (is_key_check AND exact_keys AND key_values > max_exact_keys) THEN
+        INSERT INTO quality_check_results (check_id, status, details)
+        SELECT :check_id, 'ERROR', OBJECT_CONSTRUCT('message', 'exact_keys keeps every key in one VARIANT and is limited to ' || :max_exact_keys || ' keys, but ' || :target_table || ' has ' || :key_values || '. Use the HLL sketch instead');
+        RETURN 'Too many keys for exact tracking in check ' || :check_id;
+    END IF;
+    SELECT MAX(watermark_value) INTO :last_watermark
+    FROM quality_check_state
+    WHERE check_id = :check_id
+    AND watermark_column = :watermark_column
+    AND config_hash = :config_hash;
+    IF (last_watermark IS NULL) THEN
+        DELETE FROM quality_check_state WHERE check_id = :check_id;
+    ELSE
+        delta_filter := '
+            WHERE "' || :watermark_column || '" > ''' || :last_watermark || '''';
+    END IF;
+    scan_started_at := CURRENT_TIMESTAMP();
     EXECUTE IMMEDIATE '
-        CREATE OR REPLACE TABLE ' || :target_table || ' AS
-        SELECT 
-            ' || :transformation_expr || ' AS ' || :column_name || ',
-            * EXCLUDE ' || :column_name || '
-        FROM ' || :source_table;
-    RETURN 'Text standardization complete: ' || :operation || ' applied to ' || :column_name;
+        SELECT
+            COUNT(*) as delta_rows,
+            TO_VARIANT(MAX("' || :watermark_column || '"))::STRING as watermark_value,
+            COUNT(' || :count_ref || ') as non_null_count,
+            ' || IFF(:is_key_check, '0', :failed_expr) || ' as failed_count,
+            ' || IFF(:is_key_check AND NOT :exact_keys, 'HLL_EXPORT(HLL_ACCUMULATE(' || :key_ref || '))', 'NULL') || ' as hll_state,
+            ' || IFF(:is_key_check AND :exact_keys, 'ARRAY_UNIQUE_AGG(' || :key_ref || ')', 'NULL') || ' as key_set
+        FROM ' || :target_table || :delta_filter;
+    scan_query_id := LAST_QUERY_ID();
+    scan_elapsed_ms := DATEDIFF('millisecond', :scan_started_at, CURRENT_TIMESTAMP());
+    MERGE INTO quality_check_state s
+    USING (
+        SELECT
+            SUM(total_count) as total_count,
+            SUM(non_null_count) as non_null_count,
+            SUM(failed_count) as failed_count,
+            HLL_EXPORT(HLL_COMBINE(HLL_IMPORT(hll_state))) as hll_state,
+            ARRAY_UNION_AGG(key_set) as key_set,
+            COALESCE(MAX(IFF(is_delta, watermark_value, NULL)), MAX(watermark_value)) as watermark_value,
+            SUM(IFF(is_delta, total_count, 0)) as delta_rows
+        FROM (
+            SELECT total_count, non_null_count, failed_count, hll_state, key_set, watermark_value, FALSE as is_delta
+            FROM quality_check_state
+            WHERE check_id = :check_id
+            UNION ALL
+            SELECT delta_rows, non_null_count, failed_count, hll_state::OBJECT, key_set::ARRAY, watermark_value, TRUE
+            FROM TABLE(RESULT_SCAN(:scan_query_id))
+        )
+    ) m
+    ON s.check_id = :check_id
+    WHEN MATCHED THEN UPDATE SET
+        total_count = m.total_count,
+        non_null_count = m.non_null_count,
+        failed_count = m.failed_count,
+        hll_state = m.hll_state,
+        key_set = m.key_set,
+        watermark_value = m.watermark_value,
+        last_delta_rows = m.delta_rows,
+        updated_at = CURRENT_TIMESTAMP()
+    WHEN NOT MATCHED THEN INSERT (
+        check_id, table_name, watermark_column, config_hash, watermark_value,
+        total_count, non_null_count, failed_count, hll_state, key_set, last_delta_rows
+    ) VALUES (
+        :check_id, :target_table, :watermark_column, :config_hash, m.watermark_value,
+        m.total_count, m.non_null_count, m.failed_count, m.hll_state, m.key_set, m.delta_rows
+    );
+    INSERT INTO quality_check_results (check_id, status, records_checked, records_failed, failure_rate, details)
+    SELECT
+        check_id,
+        CASE
+            WHEN quality_check_status(GREATEST(records_failed - error_bound, 0), total_count, :failure_threshold) = 'FAILED' THEN 'FAILED'
+            WHEN quality_check_status(records_failed + error_bound, total_count, :failure_threshold) = 'FAILED' THEN 'WARNING'
+            ELSE 'PASSED'
+        END,
+        total_count,
+        records_failed,
+        ROUND(records_failed * 100.0 / NULLIF(total_count, 0), 2),
+        OBJECT_CONSTRUCT(
+            'message', IFF(error_bound = 0,
+                'Found ' || records_failed || ' ' || :failure_label || ' values',
+                'Found approximately ' || records_failed || ' ' || :failure_label || ' values (between ' || GREATEST(records_failed - error_bound, 0) || ' and ' || (records_failed + error_bound) || ')'),
+            'evaluation_mode', 'INCREMENTAL',
+            'exact', error_bound = 0,
+            'records_failed_low', GREATEST(records_failed - error_bound, 0),
+            'records_failed_high', records_failed + error_bound,
+            'watermark_column', watermark_column,
+            'watermark_value', watermark_value,
+            'delta_rows', last_delta_rows,
+            'scan_elapsed_ms', :scan_elapsed_ms,
+            'scan_query_id', :scan_query_id
+        )
+    FROM (
+        SELECT
+            check_id,
+            total_count,
+            non_null_count,
+            watermark_column,
+            watermark_value,
+            last_delta_rows,
+            CASE
+                WHEN :is_key_check AND :exact_keys THEN non_null_count - ARRAY_SIZE(key_set)
+                WHEN :is_key_check THEN GREATEST(ROUND(non_null_count - HLL_ESTIMATE(HLL_IMPORT(hll_state))), 0)
+                ELSE failed_count
+            END as records_failed,
+            IFF(:is_key_check AND NOT :exact_keys, CEIL(3 * 0.0162 * non_null_count), 0) as error_bound
+        FROM quality_check_state
+        WHERE check_id = :check_id
+    );
+    SELECT last_delta_rows INTO :delta_rows FROM quality_check_state WHERE check_id = :check_id;
+    RETURN 'Checked ' || :delta_rows || ' new rows for check ' || :check_id;
 END;
 $$;
 
-CREATE OR REPLACE PROCEDURE execute_transformation_job(
-    job_id_param STRING
+CREATE OR REPLACE PROCEDURE run_quality_checks_task(
+    batch_id STRING,
+    target_table STRING
 )
 RETURNS STRING
 LANGUAGE SQL
 AS
 $$
 DECLARE
-    job_record VARIANT;
+    result_message STRING;
+BEGIN
+    UPDATE batch_run_progress
+    SET status = 'RUNNING', started_at = CURRENT_TIMESTAMP()
+    WHERE batch_id = :batch_id AND object_name = :target_table;
+    BEGIN
+        CALL run_quality_checks(:target_table);
+        SELECT $1 INTO :result_message FROM TABLE(RESULT_SCAN(LAST_QUERY_ID()));
+        UPDATE batch_run_progress
+        SET status = 'COMPLETED', completed_at = CURRENT_TIMESTAMP(), message = :result_message
+        WHERE batch_id = :batch_id AND object_name = :target_table;
+    EXCEPTION
+        WHEN OTHER THEN
+            result_message := SQLERRM;
+            UPDATE batch_run_progress
+            SET status = 'FAILED', completed_at = CURRENT_TIMESTAMP(), message = :result_message
+            WHERE batch_id = :batch_id AND object_name = :target_table;
+    END;
+    RETURN result_message;
+END;
+$$;
+
+CREATE OR REPLACE PROCEDURE quality_check_worker(
+    batch_id STRING
+)
+RETURNS STRING
+LANGUAGE SQL
+AS
+$$
+DECLARE
+    next_table STRING;
+    checked NUMBER := 0;
+BEGIN
+    LOOP
+        SELECT ANY_VALUE(object_name) INTO :next_table
+        FROM (
+            SELECT object_name
+            FROM batch_run_progress
+            WHERE batch_id = :batch_id AND status = 'QUEUED'
+            ORDER BY estimated_rows DESC NULLS FIRST
+            LIMIT 1
+        );
+        IF (next_table IS NULL) THEN
+            BREAK;
+        END IF;
+        UPDATE batch_run_progress
+        SET status = 'RUNNING', started_at = CURRENT_TIMESTAMP()
+        WHERE batch_id = :batch_id AND object_name = :next_table AND status = 'QUEUED';
+        IF (SQLROWCOUNT = 1) THEN
+            CALL run_quality_checks_task(:batch_id, :next_table);
+            checked := checked + 1;
+        END IF;
+    END LOOP;
+    RETURN 'Worker checked ' || :checked || ' tables';
+END;
+$$;
+
+CREATE OR REPLACE PROCEDURE run_all_quality_checks(
+    max_concurrency NUMBER DEFAULT 8
+)
+RETURNS STRING
+LANGUAGE SQL
+AS
+$$
+DECLARE
+    batch_id STRING := UUID_STRING();
+    launched NUMBER := 0;
+    worker_count NUMBER;
+    failed_tables NUMBER := 0;
+BEGIN
+    INSERT INTO batch_run_progress (batch_id, batch_type, object_name, estimated_rows)
+    SELECT
+        :batch_id,
+        'QUALITY_CHECKS',
+        c.table_name,
+        MAX(r.records_checked)
+    FROM quality_check_configs c
+    LEFT JOIN (
+        SELECT check_id, records_checked
+        FROM quality_check_results
+        QUALIFY ROW_NUMBER() OVER (PARTITION BY check_id ORDER BY execution_time DESC) = 1
+    ) r ON c.check_id = r.check_id
+    WHERE c.is_active = TRUE
+    GROUP BY c.table_name;
+    launched := SQLROWCOUNT;
+    worker_count := LEAST(max_concurrency, launched);
+    FOR worker IN 1 TO worker_count DO
+        ASYNC (CALL quality_check_worker(:batch_id));
+    END FOR;
+    AWAIT ALL;
+    SELECT COUNT(*) INTO :failed_tables
+    FROM batch_run_progress
+    WHERE batch_id = :batch_id AND status = 'FAILED';
+    RETURN 'Completed quality checks on ' || (:launched - :failed_tables) || ' of ' || :launched || ' tables (batch ' || :batch_id || ')';
+END;
+$$;
+
+CREATE OR REPLACE PROCEDURE deduplicate_table(
+    source_table STRING,
+    target_table STRING,
+    key_columns ARRAY,
+    dedup_mode STRING DEFAULT 'FULL',
+    watermark_column STRING DEFAULT NULL,
+    tiebreak_column STRING DEFAULT NULL,
+    tiebreak_descending BOOLEAN DEFAULT TRUE,
+    execution_id STRING DEFAULT NULL
+)
+RETURNS STRING
+LANGUAGE SQL
+AS
+$$
+DECLARE
+    key_cols_str STRING;
+    order_by_str STRING;
+    rows_before NUMBER;
+    rows_after NUMBER;
+    query_ids ARRAY := ARRAY_CONSTRUCT();
+    state_rows NUMBER := 0;
+    last_watermark STRING;
+    next_watermark STRING;
+    column_query STRING;
+    insert_cols STRING := '';
+    insert_values STRING := '';
+    update_sets STRING := '';
+    key_match STRING;
+    matched_clause STRING := '';
+    result_message STRING;
+BEGIN
+    SELECT ARRAY_TO_STRING(:key_columns, ', ') INTO :key_cols_str;
+    IF (tiebreak_column IS NOT NULL) THEN
+        order_by_str := '"' || tiebreak_column || '"' || IFF(tiebreak_descending, ' DESC NULLS LAST', ' ASC NULLS LAST');
+    END IF;
+    IF (dedup_mode = 'INCREMENTAL') THEN
+        IF (watermark_column IS NULL) THEN
+            RETURN 'Incremental deduplication requires a watermark column';
+        END IF;
+        SELECT COUNT(*), MAX(watermark_value) INTO :state_rows, :last_watermark
+        FROM dedup_state
+        WHERE source_table = :source_table
+        AND target_table = :target_table
+        AND watermark_column = :watermark_column
+        AND key_columns = :key_columns;
+        EXECUTE IMMEDIATE 'SELECT TO_VARIANT(MAX("' || :watermark_column || '"))::STRING FROM ' || :source_table;
+        query_ids := ARRAY_APPEND(query_ids, SQLID);
+        SELECT $1 INTO :next_watermark FROM TABLE(RESULT_SCAN(LAST_QUERY_ID()));
+    END IF;
+    IF (dedup_mode = 'INCREMENTAL' AND state_rows > 0) THEN
+        IF (next_watermark IS NULL OR next_watermark = last_watermark) THEN
+            IF (execution_id IS NOT NULL) THEN
+                UPDATE job_execution_history
+                SET rows_processed = 0,
+                    rows_affected = 0
+                WHERE execution_id = :execution_id;
+            END IF;
+            RETURN 'Incremental deduplication complete. No new rows since ' || :last_watermark;
+        END IF;
+        column_query := '
+            SELECT column_name
+            FROM ' || SPLIT_PART(:source_table, '.', 1) || '.information_schema.columns
+            WHERE table_schema = ''' || SPLIT_PART(:source_table, '.', 2) || '''
+            AND table_name = ''' || SPLIT_PART(:source_table, '.', 3) || '''
+            ORDER BY ordinal_position';
+        LET column_rs RESULTSET := (EXECUTE IMMEDIATE :column_query);
+        query_ids := ARRAY_APPEND(query_ids, SQLID);
+        LET column_cursor CURSOR FOR column_rs;
+        FOR col IN column_cursor DO
+            insert_cols := insert_cols || ', "' || col.column_name || '"';
+            insert_values := insert_values || ', s."' || col.column_name || '"';
+            update_sets := update_sets || ', t."' || col.column_name || '" = s."' || col.column_name || '"';
+        END FOR;
+        SELECT LISTAGG('EQUAL_NULL(t.' || value::STRING || ', s.' || value::STRING || ')', ' AND ') INTO :key_match
+        FROM TABLE(FLATTEN(input => :key_columns));
+        IF (tiebreak_column IS NOT NULL) THEN
+            matched_clause := '
+            WHEN MATCHED AND s."' || :tiebreak_column || '" ' || IFF(:tiebreak_descending, '>', '<') || ' t."' || :tiebreak_column || '" THEN UPDATE SET ' || SUBSTR(:update_sets, 3);
+        END IF;
+        EXECUTE IMMEDIATE '
+            MERGE INTO ' || :target_table || ' t
+            USING (
+                SELECT *
+                FROM ' || :source_table || '
+                WHERE "' || :watermark_column || '" > ''' || :last_watermark || '''
+                AND "' || :watermark_column || '" <= ''' || :next_watermark || '''
+                QUALIFY ROW_NUMBER() OVER (PARTITION BY ' || :key_cols_str || ' ORDER BY ' || COALESCE(:order_by_str, '"' || :watermark_column || '"') || ') = 1
+            ) s
+            ON ' || :key_match || :matched_clause || '
+            WHEN NOT MATCHED THEN INSERT (' || SUBSTR(:insert_cols, 3) || ')
+            VALUES (' || SUBSTR(:insert_values, 3) || ')';
+        rows_after := SQLROWCOUNT;
+        query_ids := ARRAY_APPEND(query_ids, SQLID);
+        SELECT SUM(operator_statistics:output_rows) INTO :rows_before
+        FROM TABLE(GET_QUERY_OPERATOR_STATS(LAST_QUERY_ID()))
+        WHERE operator_type = 'TableScan'
+        AND UPPER(REPLACE(operator_attributes:table_name::STRING, '"', '')) = UPPER(REPLACE(:source_table, '"', ''));
+        query_ids := ARRAY_APPEND(query_ids, SQLID);
+        UPDATE dedup_state
+        SET watermark_value = :next_watermark, updated_at = CURRENT_TIMESTAMP()
+        WHERE source_table = :source_table AND target_table = :target_table;
+        result_message := 'Incremental deduplication complete. New rows read: ' || COALESCE(:rows_before::STRING, 'unknown') || ', Rows merged: ' || :rows_after || ', Watermark: ' || :next_watermark;
+    ELSE
+        EXECUTE IMMEDIATE '
+            CREATE OR REPLACE TABLE ' || :target_table || ' AS
+            SELECT *
+            FROM ' || :source_table || '
+            QUALIFY ROW_NUMBER() OVER (PARTITION BY ' || :key_cols_str || ' ORDER BY ' || COALESCE(:order_by_str, IFF(:dedup_mode = 'INCREMENTAL', '"' || :watermark_column || '"', 'HASH(*)')) || ') = 1';
+        query_ids := ARRAY_APPEND(query_ids, SQLID);
+        SELECT
+            SUM(IFF(operator_type = 'TableScan', operator_statistics:output_rows, 0)),
+            SUM(IFF(operator_type = 'CreateTableAsSelect', operator_statistics:input_rows, 0))
+        INTO :rows_before, :rows_after
+        FROM TABLE(GET_QUERY_OPERATOR_STATS(LAST_QUERY_ID()));
+        query_ids := ARRAY_APPEND(query_ids, SQLID);
+        IF (dedup_mode = 'INCREMENTAL') THEN
+            DELETE FROM dedup_state WHERE source_table = :source_table AND target_table = :target_table;
+            INSERT INTO dedup_state (source_table, target_table, key_columns, watermark_column, watermark_value)
+            SELECT :source_table, :target_table, :key_columns, :watermark_column, :next_watermark;
+        END IF;
+        result_message := 'Deduplication complete. Rows before: ' || :rows_before || ', Rows after: ' || :rows_after || ', Duplicates removed: ' || (:rows_before - :rows_after);
+    END IF;
+    IF (execution_id IS NOT NULL) THEN
+        UPDATE job_execution_history
+        SET rows_processed = :rows_before,
+            rows_affected = :rows_after,
+            telemetry = OBJECT_CONSTRUCT('query_ids', :query_ids)
+        WHERE execution_id = :execution_id;
+    END IF;
+    RETURN result_message;
+END;
+$$;
+
+CREATE OR REPLACE PROCEDURE clean_null_values(
+    source_table STRING,
+    target_table STRING,
+    strategy STRING,
+    columns_to_clean ARRAY DEFAULT NULL,
+    execution_id STRING DEFAULT NULL
+)
+RETURNS STRING
+LANGUAGE SQL
+AS
+$$
+DECLARE
+    column_query STRING;
+    column_types OBJECT := OBJECT_CONSTRUCT();
+    fill_columns ARRAY := ARRAY_CONSTRUCT();
+    where_clause STRING := '';
+    replace_list STRING := '';
+    source_altered TIMESTAMP_LTZ;
+    profile_values OBJECT := OBJECT_CONSTRUCT();
+    stats_values OBJECT := OBJECT_CONSTRUCT();
+    stats_exprs STRING;
+    rows_before NUMBER;
+    rows_after NUMBER;
+    query_ids ARRAY := ARRAY_CONSTRUCT();
+BEGIN
+    IF (strategy NOT IN ('DROP', 'FILL_ZERO', 'FILL_MEAN', 'FILL_MODE')) THEN
+        RETURN 'Invalid strategy: ' || :strategy;
+    END IF;
+    column_query := '
+        SELECT
+            c.column_name,
+            IFF(c.data_type = ''NUMBER'', ''NUMBER('' || c.numeric_precision || '','' || c.numeric_scale || '')'', c.data_type) as column_type,
+            c.data_type IN (''NUMBER'', ''FLOAT'') as is_numeric,
+            t.last_altered
+        FROM ' || SPLIT_PART(:source_table, '.', 1) || '.information_schema.columns c
+        JOIN ' || SPLIT_PART(:source_table, '.', 1) || '.information_schema.tables t
+            ON t.table_schema = c.table_schema AND t.table_name = c.table_name
+        WHERE c.table_schema = ''' || SPLIT_PART(:source_table, '.', 2) || '''
+        AND c.table_name = ''' || SPLIT_PART(:source_table, '.', 3) || '''
+        ORDER BY c.ordinal_position';
+    LET column_rs RESULTSET := (EXECUTE IMMEDIATE :column_query);
+    query_ids := ARRAY_APPEND(query_ids, SQLID);
+    LET column_cursor CURSOR FOR column_rs;
+    FOR col IN column_cursor DO
+        LET col_name STRING := col.column_name;
+        LET col_ref STRING := '"' || col_name || '"';
+        source_altered := col.last_altered;
+        IF (columns_to_clean IS NULL OR ARRAY_CONTAINS(col_name::VARIANT, columns_to_clean)) THEN
+            IF (strategy = 'DROP') THEN
+                where_clause := where_clause || ' AND ' || col_ref || ' IS NOT NULL';
+            ELSEIF (strategy = 'FILL_ZERO' AND col.is_numeric) THEN
+                replace_list := replace_list || ', COALESCE(' || col_ref || ', 0) AS ' || col_ref;
+            ELSEIF (strategy = 'FILL_MODE' OR (strategy = 'FILL_MEAN' AND col.is_numeric)) THEN
+                fill_columns := ARRAY_APPEND(fill_columns, col_name);
+                column_types := OBJECT_INSERT(column_types, col_name, col.column_type);
+            END IF;
+        END IF;
+    END FOR;
+    IF (ARRAY_SIZE(fill_columns) > 0) THEN
+        SELECT COALESCE(OBJECT_AGG(column_name, fill_value), OBJECT_CONSTRUCT()) INTO :profile_values
+        FROM (
+            SELECT
+                column_name,
+                IFF(:strategy = 'FILL_MEAN', TO_VARIANT(avg_value), top_values[0][0]) as fill_value
+            FROM latest_profile_results
+            WHERE table_name = :source_table
+            AND profiled_at >= :source_altered
+            AND IFF(:strategy = 'FILL_MEAN', profile_mode IN ('EXACT', 'APPROXIMATE', 'INCREMENTAL'), profile_mode = 'APPROXIMATE')
+            AND ARRAY_CONTAINS(column_name::VARIANT, :fill_columns)
+        )
+        WHERE fill_value IS NOT NULL AND NOT IS_NULL_VALUE(fill_value);
+        query_ids := ARRAY_APPEND(query_ids, SQLID);
+        SELECT LISTAGG('''' || value::STRING || ''', ' || IFF(:strategy = 'FILL_MEAN', 'AVG', 'MODE') || '("' || value::STRING || '")', ', ') INTO :stats_exprs
+        FROM TABLE(FLATTEN(input => ARRAY_EXCEPT(:fill_columns, OBJECT_KEYS(:profile_values))));
+        IF (stats_exprs <> '') THEN
+            EXECUTE IMMEDIATE 'SELECT OBJECT_CONSTRUCT(' || :stats_exprs || ') FROM ' || :source_table;
+            query_ids := ARRAY_APPEND(query_ids, SQLID);
+            SELECT $1 INTO :stats_values FROM TABLE(RESULT_SCAN(LAST_QUERY_ID()));
+        END IF;
+        SELECT IFF(COUNT(*) = 0, '', ', ' || LISTAGG(
+            'COALESCE("' || key || '", ''' || REPLACE(REPLACE(value::STRING, '\\', '\\\\'), '''', '\\''') || '''::' || GET(:column_types, key)::STRING || ') AS "' || key || '"',
+            ', '
+        )) INTO :replace_list
+        FROM (
+            SELECT key, value FROM TABLE(FLATTEN(input => :profile_values))
+            UNION ALL
+            SELECT key, value FROM TABLE(FLATTEN(input => :stats_values))
+        );
+    END IF;
+    EXECUTE IMMEDIATE '
+        CREATE OR REPLACE TABLE ' || :target_table || ' AS
+        SELECT *' || IFF(:replace_list = '', '', ' REPLACE (' || SUBSTR(:replace_list, 3) || ')') || '
+        FROM ' || :source_table || IFF(:where_clause = '', '', '
+        WHERE ' || SUBSTR(:where_clause, 6));
+    query_ids := ARRAY_APPEND(query_ids, SQLID);
+    SELECT SUM(operator_statistics:input_rows) INTO :rows_after
+    FROM TABLE(GET_QUERY_OPERATOR_STATS(LAST_QUERY_ID()))
+    WHERE operator_type = 'CreateTableAsSelect';
+    query_ids := ARRAY_APPEND(query_ids, SQLID);
+    rows_before := rows_after;
+    IF (where_clause <> '') THEN
+        SELECT COUNT(*) INTO :rows_before FROM IDENTIFIER(:source_table);
+        query_ids := ARRAY_APPEND(query_ids, SQLID);
+    END IF;
+    IF (execution_id IS NOT NULL) THEN
+        UPDATE job_execution_history
+        SET rows_processed = :rows_before,
+            rows_affected = :rows_after,
+            telemetry = OBJECT_CONSTRUCT('query_ids', :query_ids)
+        WHERE execution_id = :execution_id;
+    END IF;
+    RETURN 'Null value cleaning complete using strategy: ' || :strategy ||
+        IFF(ARRAY_SIZE(:fill_columns) > 0,
+            ' (' || ARRAY_SIZE(OBJECT_KEYS(:profile_values)) || ' fill values from profile, ' || ARRAY_SIZE(OBJECT_KEYS(:stats_values)) || ' from one stats scan)',
+            '') ||
+        '. Rows before: ' || :rows_before || ', Rows after: ' || :rows_after;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION text_operation_expr(
+    column_expr STRING,
+    operation STRING
+)
+RETURNS STRING
+AS
+$$
+    CASE operation
+        WHEN 'UPPERCASE' THEN 'UPPER(' || column_expr || ')'
+        WHEN 'LOWERCASE' THEN 'LOWER(' || column_expr || ')'
+        WHEN 'TRIM' THEN 'TRIM(' || column_expr || ')'
+        WHEN 'REMOVE_SPECIAL_CHARS' THEN 'REGEXP_REPLACE(' || column_expr || ', ''[^a-zA-Z0-9 ]'', '''')'
+    END
+$$;
+
+CREATE OR REPLACE FUNCTION literal_expr(
+    value VARIANT
+)
+RETURNS STRING
+AS
+$$
+    CASE
+        WHEN value IS NULL OR IS_NULL_VALUE(value) THEN 'NULL'
+        WHEN IS_BOOLEAN(value) THEN IFF(value::BOOLEAN, 'TRUE', 'FALSE')
+        WHEN IS_INTEGER(value) OR IS_DECIMAL(value) THEN value::STRING
+        ELSE '''' || REPLACE(REPLACE(value::STRING, '\\', '\\\\'), '''', '\\''') || ''''
+    END
+$$;
+
+CREATE OR REPLACE PROCEDURE standardize_text_columns(
+    source_table STRING,
+    target_table STRING,
+    column_operations OBJECT,
+    execution_id STRING DEFAULT NULL
+)
+RETURNS STRING
+LANGUAGE SQL
+AS
+$$
+DECLARE
+    replace_list STRING := '';
+    rows_after NUMBER;
+    query_ids ARRAY := ARRAY_CONSTRUCT();
+BEGIN
+    LET operation_rs RESULTSET := (
+        SELECT c.key as column_name, o.value::STRING as operation, o.index as operation_index
+        FROM TABLE(FLATTEN(input => :column_operations)) c,
+        LATERAL FLATTEN(input => c.value) o
+        ORDER BY c.key, o.index
+    );
+    LET operation_cursor CURSOR FOR operation_rs;
+    LET current_column STRING := NULL;
+    LET column_expr STRING := NULL;
+    FOR op IN operation_cursor DO
+        IF (current_column IS NULL OR op.column_name <> current_column) THEN
+            IF (current_column IS NOT NULL) THEN
+                replace_list := replace_list || ', ' || column_expr || ' AS "' || current_column || '"';
+            END IF;
+            current_column := op.column_name;
+            column_expr := '"' || current_column || '"';
+        END IF;
+        column_expr := text_operation_expr(column_expr, op.operation);
+        IF (column_expr IS NULL) THEN
+            RETURN 'Invalid operation: ' || op.operation;
+        END IF;
+    END FOR;
+    IF (current_column IS NULL) THEN
+        RETURN 'No columns to standardize';
+    END IF;
+    replace_list := replace_list || ', ' || column_expr || ' AS "' || current_column || '"';
+    EXECUTE IMMEDIATE '
+        CREATE OR REPLACE TABLE ' || :target_table || ' AS
+        SELECT * REPLACE (' || SUBSTR(:replace_list, 3) || ')
+        FROM ' || :source_table;
+    query_ids := ARRAY_APPEND(query_ids, SQLID);
+    SELECT SUM(operator_statistics:input_rows) INTO :rows_after
+    FROM TABLE(GET_QUERY_OPERATOR_STATS(LAST_QUERY_ID()))
+    WHERE operator_type = 'CreateTableAsSelect';
+    query_ids := ARRAY_APPEND(query_ids, SQLID);
+    IF (execution_id IS NOT NULL) THEN
+        UPDATE job_execution_history
+        SET rows_processed = :rows_after,
+            rows_affected = :rows_after,
+            telemetry = OBJECT_CONSTRUCT('query_ids', :query_ids)
+        WHERE execution_id = :execution_id;
+    END IF;
+    RETURN 'Text standardization complete: ' || ARRAY_SIZE(OBJECT_KEYS(:column_operations)) || ' columns standardized in one pass over ' || :rows_after || ' rows';
+END;
+$$;
+
+CREATE OR REPLACE PROCEDURE standardize_text_column(
+    source_table STRING,
+    target_table STRING,
+    column_name STRING,
+    operation STRING
+)
+RETURNS STRING
+LANGUAGE SQL
+AS
+$$
+BEGIN
+    IF (text_operation_expr(:column_name, :operation) IS NULL) THEN
+        RETURN 'Invalid operation: ' || :operation;
+    END IF;
+    CALL standardize_text_columns(:source_table, :target_table, OBJECT_CONSTRUCT(:column_name, ARRAY_CONSTRUCT(:operation)));
+    RETURN 'Text standardization complete: ' || :operation || ' applied to ' || :column_name;
+END;
+$$;
+
+CREATE OR REPLACE PROCEDURE compile_transformation_pipeline(
+    source_table STRING,
+    steps ARRAY
+)
+RETURNS STRING
+LANGUAGE SQL
+AS
+$$
+DECLARE
+    column_query STRING;
+    all_columns ARRAY := ARRAY_CONSTRUCT();
+    numeric_columns ARRAY := ARRAY_CONSTRUCT();
+    compiled_sql STRING;
+    invalid_step EXCEPTION (-20001, 'Unsupported pipeline step');
+    invalid_filter EXCEPTION (-20002, 'FILTER step needs a source column, a supported operator and a literal value');
+BEGIN
+    column_query := '
+        SELECT column_name, data_type
+        FROM ' || SPLIT_PART(:source_table, '.', 1) || '.information_schema.columns
+        WHERE table_schema = ''' || SPLIT_PART(:source_table, '.', 2) || '''
+        AND table_name = ''' || SPLIT_PART(:source_table, '.', 3) || '''
+        ORDER BY ordinal_position';
+    LET column_rs RESULTSET := (EXECUTE IMMEDIATE :column_query);
+    LET column_cursor CURSOR FOR column_rs;
+    FOR col IN column_cursor DO
+        all_columns := ARRAY_APPEND(all_columns, col.column_name);
+        IF (col.data_type IN ('NUMBER', 'FLOAT')) THEN
+            numeric_columns := ARRAY_APPEND(numeric_columns, col.column_name);
+        END IF;
+    END FOR;
+    compiled_sql := 'SELECT * FROM ' || source_table;
+    LET step_rs RESULTSET := (
+        SELECT value as step
+        FROM TABLE(FLATTEN(input => :steps))
+        ORDER BY index
+    );
+    LET step_cursor CURSOR FOR step_rs;
+    FOR s IN step_cursor DO
+        LET step VARIANT := s.step;
+        LET step_type STRING := step:type::STRING;
+        LET step_columns ARRAY := COALESCE(step:columns::ARRAY, all_columns);
+        LET replace_list STRING := NULL;
+        IF (step_type = 'DEDUPLICATE') THEN
+            IF (COALESCE(ARRAY_SIZE(step:key_columns::ARRAY), 0) = 0) THEN
+                RAISE invalid_step;
+            END IF;
+            compiled_sql := 'SELECT * FROM (' || compiled_sql || ')
+                QUALIFY ROW_NUMBER() OVER (PARTITION BY ' || ARRAY_TO_STRING(step:key_columns::ARRAY, ', ') || ' ORDER BY ' ||
+                IFF(step:tiebreak_column IS NULL,
+                    'HASH(*)',
+                    '"' || step:tiebreak_column::STRING || '"' || IFF(COALESCE(step:tiebreak_descending::BOOLEAN, TRUE), ' DESC', ' ASC') || ' NULLS LAST') || ') = 1';
+        ELSEIF (step_type = 'STANDARDIZE') THEN
+            replace_list := text_operation_expr('"' || step:column_name::STRING || '"', step:operation::STRING) || ' AS "' || step:column_name::STRING || '"';
+            IF (replace_list IS NULL) THEN
+                RAISE invalid_step;
+            END IF;
+        ELSEIF (step_type = 'CLEAN_NULLS' AND step:strategy::STRING = 'DROP') THEN
+            SELECT LISTAGG('"' || value::STRING || '" IS NOT NULL', ' AND ') INTO :replace_list
+            FROM TABLE(FLATTEN(input => :step_columns));
+            IF (replace_list = '') THEN
+                RAISE invalid_step;
+            END IF;
+            compiled_sql := 'SELECT * FROM (' || compiled_sql || ')
+                WHERE ' || replace_list;
+            replace_list := NULL;
+        ELSEIF (step_type = 'CLEAN_NULLS' AND step:strategy::STRING = 'FILL_ZERO') THEN
+            SELECT LISTAGG('COALESCE("' || value::STRING || '", 0) AS "' || value::STRING || '"', ', ') INTO :replace_list
+            FROM TABLE(FLATTEN(input => ARRAY_INTERSECTION(:step_columns, :numeric_columns)));
+        ELSEIF (step_type = 'CLEAN_NULLS' AND step:strategy::STRING = 'FILL_MEAN') THEN
+            SELECT LISTAGG('COALESCE("' || value::STRING || '", AVG("' || value::STRING || '") OVER ()) AS "' || value::STRING || '"', ', ') INTO :replace_list
+            FROM TABLE(FLATTEN(input => ARRAY_INTERSECTION(:step_columns, :numeric_columns)));
+        ELSEIF (step_type = 'CLEAN_NULLS' AND step:strategy::STRING = 'FILL_MODE') THEN
+            SELECT LISTAGG('COALESCE("' || value::STRING || '", MODE("' || value::STRING || '") OVER ()) AS "' || value::STRING || '"', ', ') INTO :replace_list
+            FROM TABLE(FLATTEN(input => :step_columns));
+        ELSEIF (step_type = 'FILTER') THEN
+            LET filter_column STRING := step:column::STRING;
+            LET filter_operator STRING := UPPER(step:operator::STRING);
+            LET filter_value VARIANT := step:value;
+            LET value_list STRING := NULL;
+            IF (filter_column IS NULL OR filter_operator IS NULL OR NOT ARRAY_CONTAINS(filter_column::VARIANT, all_columns)) THEN
+                RAISE invalid_filter;
+            END IF;
+            IF (filter_operator IN ('IN', 'NOT IN') AND ARRAY_SIZE(filter_value) > 0) THEN
+                SELECT '(' || LISTAGG(literal_expr(value), ', ') || ')' INTO :value_list
+                FROM TABLE(FLATTEN(input => :filter_value));
+            ELSEIF (filter_operator IN ('=', '<>', '<', '<=', '>', '>=', 'LIKE', 'NOT LIKE') AND NOT IS_ARRAY(filter_value) AND NOT IS_NULL_VALUE(filter_value)) THEN
+                value_list := literal_expr(filter_value);
+            ELSEIF (filter_operator NOT IN ('IS NULL', 'IS NOT NULL')) THEN
+                RAISE invalid_filter;
+            END IF;
+            compiled_sql := 'SELECT * FROM (' || compiled_sql || ')
+                WHERE "' || REPLACE(filter_column, '"', '""') || '" ' || filter_operator || COALESCE(' ' || value_list, '');
+        ELSE
+            RAISE invalid_step;
+        END IF;
+        IF (replace_list = '') THEN
+            RAISE invalid_step;
+        END IF;
+        IF (replace_list IS NOT NULL) THEN
+            compiled_sql := 'SELECT * REPLACE (' || replace_list || ') FROM (' || compiled_sql || ')';
+        END IF;
+    END FOR;
+    RETURN compiled_sql;
+END;
+$$;
+
+CREATE OR REPLACE PROCEDURE run_transformation_pipeline(
+    source_table STRING,
+    target_table STRING,
+    steps ARRAY,
+    execution_id STRING DEFAULT NULL
+)
+RETURNS STRING
+LANGUAGE SQL
+AS
+$$
+DECLARE
+    compiled_sql STRING;
+    rows_before NUMBER;
+    rows_after NUMBER;
+    query_ids ARRAY := ARRAY_CONSTRUCT();
+BEGIN
+    CALL compile_transformation_pipeline(:source_table, :steps);
+    query_ids := ARRAY_APPEND(query_ids, SQLID);
+    SELECT $1 INTO :compiled_sql FROM TABLE(RESULT_SCAN(LAST_QUERY_ID()));
+    EXECUTE IMMEDIATE 'CREATE OR REPLACE TABLE ' || :target_table || ' AS ' || :compiled_sql;
+    query_ids := ARRAY_APPEND(query_ids, SQLID);
+    SELECT
+        SUM(IFF(operator_type = 'TableScan', operator_statistics:output_rows, 0)),
+        SUM(IFF(operator_type = 'CreateTableAsSelect', operator_statistics:input_rows, 0))
+    INTO :rows_before, :rows_after
+    FROM TABLE(GET_QUERY_OPERATOR_STATS(LAST_QUERY_ID()));
+    query_ids := ARRAY_APPEND(query_ids, SQLID);
+    IF (execution_id IS NOT NULL) THEN
+        UPDATE job_execution_history
+        SET rows_processed = :rows_before,
+            rows_affected = :rows_after,
+            telemetry = OBJECT_CONSTRUCT('query_ids', :query_ids)
+        WHERE execution_id = :execution_id;
+    END IF;
+    RETURN 'Pipeline complete. ' || ARRAY_SIZE(:steps) || ' steps fused into one write. Rows before: ' || :rows_before || ', Rows after: ' || :rows_after;
+END;
+$$;
+
+CREATE OR REPLACE PROCEDURE execute_transformation_job(
+    job_id_param STRING,
+    execution_id_param STRING DEFAULT NULL,
+    force_rebuild BOOLEAN DEFAULT FALSE
+)
+RETURNS STRING
+LANGUAGE SQL
+AS
+$$
+DECLARE
+    job_record VARIANT;
     execution_id STRING;
     start_time TIMESTAMP_NTZ;
     end_time TIMESTAMP_NTZ;
     job_status STRING;
     error_msg STRING;
+    source_table STRING;
+    target_table STRING;
+    source_fingerprint VARIANT;
+    previous_fingerprint VARIANT;
+    target_exists BOOLEAN := FALSE;
+    lookup_end TIMESTAMP_NTZ;
+    transform_end TIMESTAMP_NTZ;
+    query_stats OBJECT := OBJECT_CONSTRUCT();
+    lookup_query_ids ARRAY := ARRAY_CONSTRUCT();
 BEGIN
     start_time := CURRENT_TIMESTAMP();
-    execution_id := UUID_STRING();
+    execution_id := COALESCE(execution_id_param, UUID_STRING());
     SELECT OBJECT_CONSTRUCT(*) INTO job_record FROM transformation_jobs WHERE job_id = :job_id_param;
-    INSERT INTO job_execution_history (execution_id, job_id, status)
-    VALUES (:execution_id, :job_id_param, 'RUNNING');
+    MERGE INTO job_execution_history h
+    USING (SELECT :execution_id as execution_id) e
+    ON h.execution_id = e.execution_id
+    WHEN MATCHED THEN UPDATE SET status = 'RUNNING', started_at = :start_time
+    WHEN NOT MATCHED THEN INSERT (execution_id, job_id, started_at, status)
+    VALUES (:execution_id, :job_id_param, :start_time, 'RUNNING');
+    source_table := job_record:source_table::STRING;
+    target_table := job_record:target_table::STRING;
+    BEGIN
+        EXECUTE IMMEDIATE '
+            SELECT OBJECT_CONSTRUCT(
+                ''last_altered'', last_altered,
+                ''row_count'', row_count,
+                ''change_commit_time'', SYSTEM$LAST_CHANGE_COMMIT_TIME(''' || :source_table || '''),
+                ''config_hash'', ''' || SHA2(TO_JSON(OBJECT_CONSTRUCT('type', job_record:transformation_type, 'target', :target_table, 'config', job_record:transformation_config))) || '''
+            )
+            FROM ' || SPLIT_PART(:source_table, '.', 1) || '.information_schema.tables
+            WHERE table_schema = ''' || SPLIT_PART(:source_table, '.', 2) || '''
+            AND table_name = ''' || SPLIT_PART(:source_table, '.', 3) || '''';
+        lookup_query_ids := ARRAY_APPEND(lookup_query_ids, SQLID);
+        SELECT $1 INTO :source_fingerprint FROM TABLE(RESULT_SCAN(LAST_QUERY_ID()));
+        EXECUTE IMMEDIATE '
+            SELECT COUNT(*) > 0
+            FROM ' || SPLIT_PART(:target_table, '.', 1) || '.information_schema.tables
+            WHERE table_schema = ''' || SPLIT_PART(:target_table, '.', 2) || '''
+            AND table_name = ''' || SPLIT_PART(:target_table, '.', 3) || '''';
+        lookup_query_ids := ARRAY_APPEND(lookup_query_ids, SQLID);
+        SELECT $1 INTO :target_exists FROM TABLE(RESULT_SCAN(LAST_QUERY_ID()));
+    EXCEPTION
+        WHEN OTHER THEN
+            source_fingerprint := NULL;
+    END;
+    SELECT MAX_BY(source_fingerprint, completed_at) INTO :previous_fingerprint
+    FROM job_execution_history
+    WHERE job_id = :job_id_param AND status = 'SUCCESS' AND source_fingerprint IS NOT NULL;
+    lookup_end := CURRENT_TIMESTAMP();
+    UPDATE job_execution_history
+    SET source_fingerprint = :source_fingerprint
+    WHERE execution_id = :execution_id;
+    IF (NOT force_rebuild AND target_exists AND ARRAY_SIZE(OBJECT_KEYS(source_fingerprint)) = 4 AND source_fingerprint = previous_fingerprint) THEN
+        end_time := CURRENT_TIMESTAMP();
+        UPDATE job_execution_history
+        SET completed_at = :end_time,
+            status = 'SKIPPED',
+            error_message = 'Source and config unchanged since last successful run',
+            rows_processed = 0,
+            rows_affected = 0,
+            execution_time_seconds = DATEDIFF('millisecond', :start_time, :end_time) / 1000,
+            telemetry = OBJECT_CONSTRUCT(
+                'lookup_ms', DATEDIFF('millisecond', :start_time, :lookup_end),
+                'query_ids', :lookup_query_ids
+            )
+        WHERE execution_id = :execution_id;
+        UPDATE transformation_jobs
+        SET last_run = :end_time
+        WHERE job_id = :job_id_param;
+        RETURN 'Job execution skipped: source and config unchanged since last successful run';
+    END IF;
     BEGIN
         CASE (job_record:transformation_type::STRING)
             WHEN 'DEDUPLICATE' THEN
                 CALL deduplicate_table(
                     job_record:source_table::STRING,
                     job_record:target_table::STRING,
-                    job_record:transformation_config:key_columns::ARRAY
+                    job_record:transformation_config:key_columns::ARRAY,
+                    COALESCE(job_record:transformation_config:mode::STRING, 'FULL'),
+                    job_record:transformation_config:watermark_column::STRING,
+                    job_record:transformation_config:tiebreak_column::STRING,
+                    COALESCE(job_record:transformation_config:tiebreak_descending::BOOLEAN, TRUE),
+                    :execution_id
                 );
             WHEN 'CLEAN_NULLS' THEN
                 CALL clean_null_values(
                     job_record:source_table::STRING,
                     job_record:target_table::STRING,
                     job_record:transformation_config:strategy::STRING,
-                    job_record:transformation_config:columns::ARRAY
+                    job_record:transformation_config:columns::ARRAY,
+                    :execution_id
                 );
             WHEN 'STANDARDIZE' THEN
-                CALL standardize_text_column(
+                CALL standardize_text_columns(
                     job_record:source_table::STRING,
                     job_record:target_table::STRING,
-                    job_record:transformation_config:column_name::STRING,
-                    job_record:transformation_config:operation::STRING
+                    COALESCE(
+                        job_record:transformation_config:column_operations::OBJECT,
+                        OBJECT_CONSTRUCT(
+                            job_record:transformation_config:column_name::STRING,
+                            ARRAY_CONSTRUCT(job_record:transformation_config:operation::STRING)
+                        )
+                    ),
+                    :execution_id
+                );
+            WHEN 'PIPELINE' THEN
+                CALL run_transformation_pipeline(
+                    job_record:source_table::STRING,
+                    job_record:target_table::STRING,
+                    job_record:transformation_config:steps::ARRAY,
+                    :execution_id
                 );
         END CASE;
         job_status := 'SUCCESS';
@@ -351,12 +2284,45 @@ BEGIN
             job_status := 'FAILED';
             error_msg := SQLERRM;
     END;
+    transform_end := CURRENT_TIMESTAMP();
+    BEGIN
+        SELECT OBJECT_CONSTRUCT(
+            'bytes_scanned', SUM(q.bytes_scanned),
+            'bytes_written', SUM(q.bytes_written),
+            'query_elapsed_ms', SUM(q.total_elapsed_time)
+        ) INTO :query_stats
+        FROM job_execution_history h,
+        LATERAL FLATTEN(input => ARRAY_CAT(:lookup_query_ids, COALESCE(h.telemetry:query_ids::ARRAY, ARRAY_CONSTRUCT()))) f
+        JOIN (
+            SELECT query_id, bytes_scanned, bytes_written, total_elapsed_time
+            FROM TABLE(INFORMATION_SCHEMA.QUERY_HISTORY(
+                END_TIME_RANGE_START => :start_time::TIMESTAMP_LTZ,
+                RESULT_LIMIT => 10000
+            ))
+        ) q ON q.query_id = f.value::STRING
+        WHERE h.execution_id = :execution_id;
+    EXCEPTION
+        WHEN OTHER THEN
+            query_stats := OBJECT_CONSTRUCT();
+    END;
     end_time := CURRENT_TIMESTAMP();
     UPDATE job_execution_history
     SET completed_at = :end_time,
         status = :job_status,
         error_message = :error_msg,
-        execution_time_seconds = DATEDIFF('second', :start_time, :end_time)
+        execution_time_seconds = DATEDIFF('millisecond', :start_time, :end_time) / 1000,
+        telemetry = OBJECT_CONSTRUCT(
+            'lookup_ms', DATEDIFF('millisecond', :start_time, :lookup_end),
+            'transform_ms', DATEDIFF('millisecond', :lookup_end, :transform_end),
+            'stats_ms', DATEDIFF('millisecond', :transform_end, :end_time),
+            'rows_in', rows_processed,
+            'rows_out', rows_affected,
+            'rows_per_second', rows_processed / NULLIF(DATEDIFF('millisecond', :lookup_end, :transform_end) / 1000, 0),
+            'bytes_scanned', :query_stats:bytes_scanned,
+            'bytes_written', :query_stats:bytes_written,
+            'query_elapsed_ms', :query_stats:query_elapsed_ms,
+            'query_ids', ARRAY_CAT(:lookup_query_ids, COALESCE(telemetry:query_ids::ARRAY, ARRAY_CONSTRUCT()))
+        )
     WHERE execution_id = :execution_id;
     UPDATE transformation_jobs
     SET last_run = :end_time
@@ -365,8 +2331,636 @@ BEGIN
 END;
 $$;
 
+CREATE OR REPLACE PROCEDURE submit_job_run(
+    job_id STRING,
+    warehouse_name STRING DEFAULT NULL,
+    priority NUMBER DEFAULT 0,
+    force_rebuild BOOLEAN DEFAULT FALSE
+)
+RETURNS STRING
+LANGUAGE SQL
+AS
+$$
+DECLARE
+    run_id STRING := UUID_STRING();
+BEGIN
+    INSERT INTO job_run_queue (run_id, job_id, warehouse_name, priority, force_rebuild)
+    VALUES (:run_id, :job_id, COALESCE(:warehouse_name, CURRENT_WAREHOUSE()), :priority, :force_rebuild);
+    INSERT INTO job_execution_history (execution_id, job_id, status)
+    VALUES (:run_id, :job_id, 'QUEUED');
+    RETURN run_id;
+END;
+$$;
+
+CREATE OR REPLACE PROCEDURE run_queued_job(
+    run_id STRING,
+    job_id STRING,
+    force_rebuild BOOLEAN DEFAULT FALSE
+)
+RETURNS STRING
+LANGUAGE SQL
+AS
+$$
+DECLARE
+    result_message STRING;
+BEGIN
+    UPDATE job_run_queue SET started_at = CURRENT_TIMESTAMP() WHERE run_id = :run_id;
+    CALL execute_transformation_job(:job_id, :run_id, :force_rebuild);
+    SELECT $1 INTO :result_message FROM TABLE(RESULT_SCAN(LAST_QUERY_ID()));
+    UPDATE job_run_queue q
+    SET status = h.status, completed_at = CURRENT_TIMESTAMP()
+    FROM job_execution_history h
+    WHERE q.run_id = :run_id AND h.execution_id = :run_id;
+    RETURN result_message;
+END;
+$$;
+
+CREATE OR REPLACE PROCEDURE job_queue_worker(
+    lane STRING,
+    max_per_warehouse NUMBER,
+    drain_id STRING
+)
+RETURNS STRING
+LANGUAGE SQL
+AS
+$$
+DECLARE
+    next_run STRING;
+    still_queued NUMBER;
+    completed NUMBER := 0;
+BEGIN
+    LOOP
+        SELECT ANY_VALUE(run_id) INTO :next_run
+        FROM (
+            SELECT run_id
+            FROM job_run_queue
+            WHERE EQUAL_NULL(warehouse_name, :lane) AND status = 'QUEUED'
+            ORDER BY priority DESC, submitted_at
+            LIMIT 1
+        );
+        IF (next_run IS NULL) THEN
+            BREAK;
+        END IF;
+        UPDATE job_run_queue
+        SET status = 'RUNNING', claim_id = :drain_id
+        WHERE run_id = :next_run AND status = 'QUEUED'
+        AND (
+            SELECT COUNT(*)
+            FROM job_run_queue
+            WHERE EQUAL_NULL(warehouse_name, :lane)
+            AND status = 'RUNNING'
+            AND submitted_at > DATEADD(day, -1, CURRENT_TIMESTAMP())
+        ) < :max_per_warehouse;
+        IF (SQLROWCOUNT = 0) THEN
+            SELECT COUNT(*) INTO :still_queued FROM job_run_queue WHERE run_id = :next_run AND status = 'QUEUED';
+            IF (still_queued > 0) THEN
+                BREAK;
+            END IF;
+        ELSE
+            LET run_rs RESULTSET := (SELECT job_id, force_rebuild FROM job_run_queue WHERE run_id = :next_run);
+            LET run_cursor CURSOR FOR run_rs;
+            FOR run IN run_cursor DO
+                LET job_id STRING := run.job_id;
+                LET force_rebuild BOOLEAN := run.force_rebuild;
+                CALL run_queued_job(:next_run, :job_id, :force_rebuild);
+            END FOR;
+            completed := completed + 1;
+        END IF;
+    END LOOP;
+    RETURN 'Worker ran ' || :completed || ' queued runs';
+END;
+$$;
+
+CREATE OR REPLACE PROCEDURE drain_job_queue(
+    max_per_warehouse NUMBER DEFAULT 4,
+    warehouse_name STRING DEFAULT NULL
+)
+RETURNS STRING
+LANGUAGE SQL
+AS
+$$
+DECLARE
+    lane STRING;
+    drain_id STRING := UUID_STRING();
+    lane_running NUMBER;
+    lane_queued NUMBER;
+    worker_count NUMBER;
+    launched NUMBER;
+BEGIN
+    lane := COALESCE(warehouse_name, CURRENT_WAREHOUSE());
+    SELECT COUNT_IF(status = 'RUNNING' AND submitted_at > DATEADD(day, -1, CURRENT_TIMESTAMP())), COUNT_IF(status = 'QUEUED')
+    INTO :lane_running, :lane_queued
+    FROM job_run_queue
+    WHERE EQUAL_NULL(warehouse_name, :lane);
+    worker_count := LEAST(GREATEST(max_per_warehouse - lane_running, 0), lane_queued);
+    FOR worker IN 1 TO worker_count DO
+        ASYNC (CALL job_queue_worker(:lane, :max_per_warehouse, :drain_id));
+    END FOR;
+    AWAIT ALL;
+    SELECT COUNT(*) INTO :launched FROM job_run_queue WHERE claim_id = :drain_id;
+    RETURN 'Drained ' || :launched || ' queued runs on warehouse ' || COALESCE(:lane, 'default');
+END;
+$$;
+
+CREATE OR REPLACE PROCEDURE run_job_dag(
+    max_parallel_jobs NUMBER DEFAULT 8
+)
+RETURNS STRING
+LANGUAGE SQL
+AS
+$$
+DECLARE
+    dag_run_id STRING := UUID_STRING();
+    wave NUMBER := 0;
+    wave_count NUMBER;
+    in_flight NUMBER := 0;
+    job_count NUMBER;
+    succeeded NUMBER;
+    failed NUMBER;
+    skipped NUMBER;
+    blocked NUMBER;
+BEGIN
+    INSERT INTO dag_runs (dag_run_id, status) VALUES (:dag_run_id, 'RUNNING');
+    INSERT INTO dag_run_jobs (dag_run_id, job_id, upstream_job_ids)
+    SELECT :dag_run_id, j.job_id, ARRAY_UNIQUE_AGG(u.job_id)
+    FROM transformation_jobs j
+    LEFT JOIN transformation_jobs u
+        ON u.is_active
+        AND u.job_id <> j.job_id
+        AND (UPPER(u.target_table) = UPPER(j.source_table) OR ARRAY_CONTAINS(u.job_id::VARIANT, COALESCE(j.depends_on, ARRAY_CONSTRUCT())))
+    WHERE j.is_active
+    GROUP BY j.job_id;
+    job_count := SQLROWCOUNT;
+    LOOP
+        UPDATE dag_run_jobs d
+        SET wave = :wave
+        FROM (
+            SELECT d2.job_id
+            FROM dag_run_jobs d2
+            LEFT JOIN dag_run_jobs u
+                ON u.dag_run_id = d2.dag_run_id
+                AND ARRAY_CONTAINS(u.job_id::VARIANT, d2.upstream_job_ids)
+            WHERE d2.dag_run_id = :dag_run_id AND d2.wave IS NULL
+            GROUP BY d2.job_id
+            HAVING COUNT_IF(u.job_id IS NOT NULL AND u.wave IS NULL) = 0
+        ) ready
+        WHERE d.dag_run_id = :dag_run_id AND d.job_id = ready.job_id;
+        IF (SQLROWCOUNT = 0) THEN
+            BREAK;
+        END IF;
+        wave := wave + 1;
+    END LOOP;
+    wave_count := wave;
+    UPDATE dag_run_jobs
+    SET status = 'SKIPPED', execution_time_seconds = 0
+    WHERE dag_run_id = :dag_run_id AND wave IS NULL;
+    INSERT INTO job_execution_history (job_id, status, completed_at, error_message, execution_time_seconds)
+    SELECT job_id, 'SKIPPED', CURRENT_TIMESTAMP(), 'Dependency cycle in DAG run ' || :dag_run_id, 0
+    FROM dag_run_jobs
+    WHERE dag_run_id = :dag_run_id AND wave IS NULL;
+    FOR w IN 0 TO wave_count - 1 DO
+        UPDATE dag_run_jobs d
+        SET status = 'SKIPPED', execution_time_seconds = 0
+        FROM (
+            SELECT d2.job_id
+            FROM dag_run_jobs d2
+            JOIN dag_run_jobs u
+                ON u.dag_run_id = d2.dag_run_id
+                AND ARRAY_CONTAINS(u.job_id::VARIANT, d2.upstream_job_ids)
+            WHERE d2.dag_run_id = :dag_run_id AND d2.wave = :w
+            AND (u.status = 'FAILED' OR (u.status = 'SKIPPED' AND u.execution_id IS NULL))
+            GROUP BY d2.job_id
+        ) blocked
+        WHERE d.dag_run_id = :dag_run_id AND d.job_id = blocked.job_id;
+        INSERT INTO job_execution_history (job_id, status, completed_at, error_message, execution_time_seconds)
+        SELECT job_id, 'SKIPPED', CURRENT_TIMESTAMP(), 'Upstream job failed in DAG run ' || :dag_run_id, 0
+        FROM dag_run_jobs
+        WHERE dag_run_id = :dag_run_id AND wave = :w AND status = 'SKIPPED';
+        UPDATE dag_run_jobs
+        SET execution_id = UUID_STRING()
+        WHERE dag_run_id = :dag_run_id AND wave = :w AND status IS NULL;
+        LET ready_rs RESULTSET := (
+            SELECT job_id, execution_id
+            FROM dag_run_jobs
+            WHERE dag_run_id = :dag_run_id AND wave = :w AND status IS NULL
+        );
+        LET ready_cursor CURSOR FOR ready_rs;
+        FOR ready IN ready_cursor DO
+            LET job_id STRING := ready.job_id;
+            LET execution_id STRING := ready.execution_id;
+            IF (in_flight >= max_parallel_jobs) THEN
+                AWAIT ALL;
+                in_flight := 0;
+            END IF;
+            ASYNC (CALL execute_transformation_job(:job_id, :execution_id));
+            in_flight := in_flight + 1;
+        END FOR;
+        AWAIT ALL;
+        in_flight := 0;
+        UPDATE dag_run_jobs d
+        SET status = h.status, execution_time_seconds = h.execution_time_seconds
+        FROM job_execution_history h
+        WHERE d.dag_run_id = :dag_run_id AND d.wave = :w AND h.execution_id = d.execution_id;
+        UPDATE dag_run_jobs d
+        SET path_seconds = COALESCE(d.execution_time_seconds, 0) + COALESCE(longest.path_seconds, 0),
+            path_job_ids = ARRAY_APPEND(COALESCE(longest.path_job_ids, ARRAY_CONSTRUCT()), d.job_id)
+        FROM (
+            SELECT
+                d2.job_id,
+                MAX(u.path_seconds) as path_seconds,
+                MAX_BY(u.path_job_ids, u.path_seconds) as path_job_ids
+            FROM dag_run_jobs d2
+            LEFT JOIN dag_run_jobs u
+                ON u.dag_run_id = d2.dag_run_id
+                AND ARRAY_CONTAINS(u.job_id::VARIANT, d2.upstream_job_ids)
+            WHERE d2.dag_run_id = :dag_run_id AND d2.wave = :w
+            GROUP BY d2.job_id
+        ) longest
+        WHERE d.dag_run_id = :dag_run_id AND d.job_id = longest.job_id;
+    END FOR;
+    SELECT COUNT_IF(status = 'SUCCESS'), COUNT_IF(status = 'FAILED'), COUNT_IF(status = 'SKIPPED'), COUNT_IF(status = 'SKIPPED' AND execution_id IS NULL)
+    INTO :succeeded, :failed, :skipped, :blocked
+    FROM dag_run_jobs
+    WHERE dag_run_id = :dag_run_id;
+    UPDATE dag_runs r
+    SET completed_at = CURRENT_TIMESTAMP(),
+        status = IFF(:failed + :blocked = 0, 'SUCCESS', 'FAILED'),
+        job_count = :job_count,
+        wave_count = :wave_count,
+        succeeded_count = :succeeded,
+        failed_count = :failed,
+        skipped_count = :skipped,
+        critical_path = p.path_job_ids,
+        critical_path_seconds = p.path_seconds
+    FROM (
+        SELECT MAX_BY(path_job_ids, path_seconds) as path_job_ids, MAX(path_seconds) as path_seconds
+        FROM dag_run_jobs
+        WHERE dag_run_id = :dag_run_id
+    ) p
+    WHERE r.dag_run_id = :dag_run_id;
+    RETURN 'DAG run ' || :dag_run_id || ' complete: ' || :job_count || ' jobs in ' || :wave_count || ' waves. Succeeded: ' || :succeeded || ', Failed: ' || :failed || ', Skipped: ' || :skipped;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION cron_next_fire(
+    cron STRING,
+    after_time TIMESTAMP_NTZ
+)
+RETURNS TIMESTAMP_NTZ
+LANGUAGE PYTHON
+RUNTIME_VERSION = '3.11'
+HANDLER = 'next_fire'
+AS
+$$
+from datetime import datetime, timedelta
+
+FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+
+def parse_field(field, low, high):
+    values = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step = part.split("/")
+            step = int(step)
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(bound) for bound in part.split("-"))
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+        values.update(range(start, end + 1, step))
+    return values
+
+
+def next_fire(cron, after):
+    fields = (cron or "").split()
+    if len(fields) != 5 or after is None:
+        return None
+    try:
+        minutes, hours, days, months, weekdays = (
+            parse_field(field, low, high) for field, (low, high) in zip(fields, FIELD_RANGES)
+        )
+    except ValueError:
+        return None
+    weekdays = {day % 7 for day in weekdays}
+    day_restricted, weekday_restricted = fields[2] != "*", fields[4] != "*"
+    candidate = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    limit = candidate + timedelta(days=366 * 5)
+    while candidate < limit:
+        day_match = candidate.day in days
+        weekday_match = (candidate.weekday() + 1) % 7 in weekdays
+        if day_restricted and weekday_restricted:
+            date_match = day_match or weekday_match
+        else:
+            date_match = day_match and weekday_match
+        if candidate.month not in months or not date_match:
+            candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+        elif candidate.hour not in hours:
+            candidate = candidate.replace(minute=0) + timedelta(hours=1)
+        elif candidate.minute not in minutes:
+            candidate += timedelta(minutes=1)
+        else:
+            return candidate
+    return None
+$$;
+
+CREATE OR REPLACE FUNCTION next_scheduled_run(
+    job_id STRING,
+    cron STRING,
+    after_time TIMESTAMP_NTZ,
+    max_jitter_seconds NUMBER
+)
+RETURNS TIMESTAMP_NTZ
+AS
+$$
+    DATEADD(
+        'second',
+        MOD(
+            ABS(HASH(job_id)),
+            GREATEST(FLOOR(LEAST(
+                max_jitter_seconds,
+                DATEDIFF('second', cron_next_fire(cron, after_time), cron_next_fire(cron, cron_next_fire(cron, after_time))) / 2
+            )), 1)
+        ),
+        cron_next_fire(cron, after_time)
+    )
+$$;
+
+CREATE OR REPLACE PROCEDURE dispatch_scheduled_jobs(
+    max_concurrent_jobs NUMBER DEFAULT 4,
+    max_jitter_seconds NUMBER DEFAULT 300,
+    max_runs_per_warehouse NUMBER DEFAULT 4
+)
+RETURNS STRING
+LANGUAGE SQL
+AS
+$$
+DECLARE
+    tick_time TIMESTAMP_NTZ := SYSDATE();
+    running_jobs NUMBER;
+    open_slots NUMBER;
+    launched NUMBER := 0;
+    skipped NUMBER := 0;
+    deferred NUMBER := 0;
+    drained_lanes NUMBER := 0;
+BEGIN
+    UPDATE transformation_jobs
+    SET next_run_at = IFF(is_active AND schedule IS NOT NULL, next_scheduled_run(job_id, schedule, :tick_time, :max_jitter_seconds), NULL),
+        scheduled_cron = IFF(is_active, schedule, NULL)
+    WHERE NOT EQUAL_NULL(scheduled_cron, IFF(is_active, schedule, NULL));
+    SELECT COUNT(DISTINCT job_id) INTO :running_jobs
+    FROM job_execution_history
+    WHERE status = 'RUNNING'
+    AND started_at >= DATEADD('day', -1, CURRENT_TIMESTAMP());
+    open_slots := GREATEST(max_concurrent_jobs - running_jobs, 0);
+    LET due_rs RESULTSET := (
+        SELECT j.job_id, r.job_id IS NOT NULL as is_running
+        FROM transformation_jobs j
+        LEFT JOIN (
+            SELECT DISTINCT job_id
+            FROM job_execution_history
+            WHERE status = 'RUNNING'
+            AND started_at >= DATEADD('day', -1, CURRENT_TIMESTAMP())
+        ) r ON r.job_id = j.job_id
+        WHERE j.is_active AND j.next_run_at <= :tick_time
+        ORDER BY j.next_run_at
+    );
+    LET due_cursor CURSOR FOR due_rs;
+    FOR due IN due_cursor DO
+        LET job_id STRING := due.job_id;
+        IF (NOT due.is_running AND launched >= open_slots) THEN
+            deferred := deferred + 1;
+        ELSE
+            UPDATE transformation_jobs
+            SET next_run_at = next_scheduled_run(job_id, schedule, :tick_time, :max_jitter_seconds)
+            WHERE job_id = :job_id AND next_run_at <= :tick_time;
+            IF (SQLROWCOUNT = 1 AND due.is_running) THEN
+                INSERT INTO job_execution_history (job_id, status, completed_at, error_message, execution_time_seconds)
+                SELECT :job_id, 'SKIPPED', CURRENT_TIMESTAMP(), 'Previous run still in progress', 0;
+                skipped := skipped + 1;
+            ELSEIF (SQLROWCOUNT = 1) THEN
+                ASYNC (CALL execute_transformation_job(:job_id));
+                launched := launched + 1;
+            END IF;
+        END IF;
+    END FOR;
+    LET lane_rs RESULTSET := (SELECT DISTINCT warehouse_name FROM job_run_queue WHERE status = 'QUEUED');
+    LET lane_cursor CURSOR FOR lane_rs;
+    FOR queued_lane IN lane_cursor DO
+        LET lane STRING := queued_lane.warehouse_name;
+        ASYNC (CALL drain_job_queue(:max_runs_per_warehouse, :lane));
+        drained_lanes := drained_lanes + 1;
+    END FOR;
+    AWAIT ALL;
+    RETURN 'Dispatched ' || :launched || ' jobs, skipped ' || :skipped || ' still running, deferred ' || :deferred || ' over the concurrency limit, drained ' || :drained_lanes || ' queue lanes';
+END;
+$$;
+
+CREATE OR REPLACE PROCEDURE start_scheduler(
+    max_concurrent_jobs NUMBER DEFAULT 4,
+    max_jitter_seconds NUMBER DEFAULT 300,
+    warehouse_name STRING DEFAULT NULL,
+    max_runs_per_warehouse NUMBER DEFAULT 4
+)
+RETURNS STRING
+LANGUAGE SQL
+AS
+$$
+BEGIN
+    UPDATE transformation_jobs SET scheduled_cron = NULL, next_run_at = NULL;
+    EXECUTE IMMEDIATE '
+        CREATE OR REPLACE TASK app_schema.job_dispatcher
+        ' || IFF(:warehouse_name IS NULL, 'USER_TASK_MANAGED_INITIAL_WAREHOUSE_SIZE = ''XSMALL''', 'WAREHOUSE = ' || :warehouse_name) || '
+        SCHEDULE = ''1 MINUTE''
+        ALLOW_OVERLAPPING_EXECUTION = TRUE
+        AS
+        CALL app_schema.dispatch_scheduled_jobs(' || :max_concurrent_jobs || ', ' || :max_jitter_seconds || ', ' || :max_runs_per_warehouse || ')';
+    ALTER TASK app_schema.job_dispatcher RESUME;
+    RETURN 'Scheduler started: up to ' || :max_concurrent_jobs || ' concurrent jobs, up to ' || :max_jitter_seconds || 's jitter';
+END;
+$$;
+
+CREATE OR REPLACE PROCEDURE stop_scheduler()
+RETURNS STRING
+LANGUAGE SQL
+AS
+$$
+BEGIN
+    ALTER TASK IF EXISTS app_schema.job_dispatcher SUSPEND;
+    RETURN 'Scheduler suspended';
+END;
+$$;
+
+CREATE OR REPLACE PROCEDURE analyze_performance_regressions(
+    z_threshold FLOAT DEFAULT 3.5,
+    min_slowdown FLOAT DEFAULT 1.5,
+    min_samples NUMBER DEFAULT 5,
+    window_size NUMBER DEFAULT 30
+)
+RETURNS STRING
+LANGUAGE SQL
+AS
+$$
+DECLARE
+    analysis_time TIMESTAMP_NTZ := CURRENT_TIMESTAMP();
+    high_watermark TIMESTAMP_NTZ := DATEADD('minute', -1, CURRENT_TIMESTAMP());
+    job_watermark TIMESTAMP_NTZ;
+    check_watermark TIMESTAMP_NTZ;
+    observation_count NUMBER;
+    alert_count NUMBER;
+BEGIN
+    SELECT
+        COALESCE(MAX(IFF(source_name = 'JOB_HISTORY', watermark, NULL)), '1970-01-01'::TIMESTAMP_NTZ),
+        COALESCE(MAX(IFF(source_name = 'CHECK_RESULTS', watermark, NULL)), '1970-01-01'::TIMESTAMP_NTZ)
+    INTO :job_watermark, :check_watermark
+    FROM perf_analyzer_state;
+    CREATE OR REPLACE TEMPORARY TABLE perf_new_observations AS
+    SELECT entity_type, entity_id, metric, observed_value, source_row_id, observed_at
+    FROM (
+        SELECT
+            'JOB' as entity_type,
+            job_id as entity_id,
+            execution_id as source_row_id,
+            completed_at as observed_at,
+            execution_time_seconds as duration_seconds,
+            telemetry:rows_per_second::FLOAT as rows_per_second
+        FROM job_execution_history
+        WHERE status = 'SUCCESS'
+        AND completed_at > :job_watermark
+        AND completed_at <= :high_watermark
+        UNION ALL
+        SELECT
+            'CHECK',
+            check_id,
+            result_id,
+            execution_time,
+            details:scan_elapsed_ms::FLOAT / 1000,
+            records_checked / NULLIF(details:scan_elapsed_ms::FLOAT / 1000, 0)
+        FROM quality_check_results
+        WHERE status IN ('PASSED', 'WARNING', 'FAILED')
+        AND execution_time > :check_watermark
+        AND execution_time <= :high_watermark
+    )
+    UNPIVOT (observed_value FOR metric IN (duration_seconds, rows_per_second));
+    SELECT COUNT(*) INTO :observation_count FROM perf_new_observations;
+    INSERT INTO perf_alerts (entity_type, entity_id, metric, source_row_id, observed_at, observed_value, baseline_median, baseline_mad, robust_z, slowdown_factor)
+    SELECT
+        o.entity_type,
+        o.entity_id,
+        o.metric,
+        o.source_row_id,
+        o.observed_at,
+        o.observed_value,
+        b.median_value,
+        b.mad_value,
+        0.6745 * IFF(o.metric = 'ROWS_PER_SECOND', b.median_value - o.observed_value, o.observed_value - b.median_value)
+            / NULLIF(GREATEST(b.mad_value, 0.01 * b.median_value), 0) as robust_z,
+        IFF(o.metric = 'ROWS_PER_SECOND', b.median_value / NULLIF(o.observed_value, 0), o.observed_value / NULLIF(b.median_value, 0)) as slowdown_factor
+    FROM perf_new_observations o
+    JOIN perf_baselines b
+        ON b.entity_type = o.entity_type
+        AND b.entity_id = o.entity_id
+        AND b.metric = o.metric
+    WHERE b.sample_count >= :min_samples
+    AND robust_z > :z_threshold
+    AND slowdown_factor >= :min_slowdown;
+    alert_count := SQLROWCOUNT;
+    MERGE INTO perf_baselines b
+    USING (
+        SELECT entity_type, entity_id, metric, ARRAY_AGG(observed_value) WITHIN GROUP (ORDER BY observed_at) as new_samples
+        FROM perf_new_observations
+        GROUP BY entity_type, entity_id, metric
+    ) n
+    ON b.entity_type = n.entity_type AND b.entity_id = n.entity_id AND b.metric = n.metric
+    WHEN MATCHED THEN UPDATE SET
+        samples = ARRAY_SLICE(
+            ARRAY_CAT(b.samples, n.new_samples),
+            GREATEST(ARRAY_SIZE(b.samples) + ARRAY_SIZE(n.new_samples) - :window_size, 0),
+            ARRAY_SIZE(b.samples) + ARRAY_SIZE(n.new_samples)
+        ),
+        updated_at = :analysis_time
+    WHEN NOT MATCHED THEN INSERT (entity_type, entity_id, metric, samples, updated_at)
+    VALUES (
+        n.entity_type,
+        n.entity_id,
+        n.metric,
+        ARRAY_SLICE(n.new_samples, GREATEST(ARRAY_SIZE(n.new_samples) - :window_size, 0), ARRAY_SIZE(n.new_samples)),
+        :analysis_time
+    );
+    UPDATE perf_baselines b
+    SET median_value = s.median_value, mad_value = s.mad_value, sample_count = s.sample_count
+    FROM (
+        SELECT
+            entity_type,
+            entity_id,
+            metric,
+            ANY_VALUE(median_value) as median_value,
+            MEDIAN(ABS(sample_value - median_value)) as mad_value,
+            COUNT(*) as sample_count
+        FROM (
+            SELECT
+                p.entity_type,
+                p.entity_id,
+                p.metric,
+                f.value::FLOAT as sample_value,
+                MEDIAN(f.value::FLOAT) OVER (PARTITION BY p.entity_type, p.entity_id, p.metric) as median_value
+            FROM perf_baselines p,
+            LATERAL FLATTEN(input => p.samples) f
+            WHERE p.updated_at = :analysis_time
+        )
+        GROUP BY entity_type, entity_id, metric
+    ) s
+    WHERE b.entity_type = s.entity_type AND b.entity_id = s.entity_id AND b.metric = s.metric;
+    MERGE INTO perf_analyzer_state s
+    USING (
+        SELECT 'JOB_HISTORY' as source_name
+        UNION ALL
+        SELECT 'CHECK_RESULTS'
+    ) n
+    ON s.source_name = n.source_name
+    WHEN MATCHED THEN UPDATE SET watermark = :high_watermark, updated_at = :analysis_time
+    WHEN NOT MATCHED THEN INSERT (source_name, watermark, updated_at) VALUES (n.source_name, :high_watermark, :analysis_time);
+    RETURN 'Analyzed ' || :observation_count || ' new observations, raised ' || :alert_count || ' regression alerts';
+END;
+$$;
+
+CREATE OR REPLACE PROCEDURE start_regression_analyzer(
+    schedule_minutes NUMBER DEFAULT 15,
+    warehouse_name STRING DEFAULT NULL
+)
+RETURNS STRING
+LANGUAGE SQL
+AS
+$$
+BEGIN
+    EXECUTE IMMEDIATE '
+        CREATE OR REPLACE TASK app_schema.regression_analyzer
+        ' || IFF(:warehouse_name IS NULL, 'USER_TASK_MANAGED_INITIAL_WAREHOUSE_SIZE = ''XSMALL''', 'WAREHOUSE = ' || :warehouse_name) || '
+        SCHEDULE = ''' || :schedule_minutes || ' MINUTE''
+        AS
+        CALL app_schema.analyze_performance_regressions()';
+    ALTER TASK app_schema.regression_analyzer RESUME;
+    RETURN 'Regression analyzer started: every ' || :schedule_minutes || ' minutes';
+END;
+$$;
+
+CREATE OR REPLACE PROCEDURE stop_regression_analyzer()
+RETURNS STRING
+LANGUAGE SQL
+AS
+$$
+BEGIN
+    ALTER TASK IF EXISTS app_schema.regression_analyzer SUSPEND;
+    RETURN 'Regression analyzer suspended';
+END;
+$$;
+
 GRANT USAGE ON SCHEMA app_schema TO APPLICATION ROLE app_user;
 GRANT SELECT, INSERT, UPDATE, DELETE ON ALL TABLES IN SCHEMA app_schema TO APPLICATION ROLE app_user;
+GRANT SELECT ON ALL VIEWS IN SCHEMA app_schema TO APPLICATION ROLE app_user;
 GRANT USAGE ON ALL PROCEDURES IN SCHEMA app_schema TO APPLICATION ROLE app_user;
 
 SELECT 'DataFlow Pro setup complete!' AS status;
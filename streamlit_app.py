@@ -71,8 +71,9 @@ st.markdown("---")
 
 try:
     tables_profiled = session.sql("""
-        SELECT COUNT(DISTINCT table_name) as count 
-        FROM app_schema.data_profile_results
+        SELECT COUNT(*) as count 
+        FROM app_schema.profile_runs
+        WHERE is_latest
     """).collect()[0]['COUNT']
     
     recent_checks = session.sql("""
@@ -174,6 +175,70 @@ with col2:
     except Exception:
         st.warning("No job execution history available yet")
 
+st.markdown("---")
+st.markdown("### 🚨 Performance Regressions")
+
+try:
+    alerts = session.sql("""
+        SELECT 
+            a.alert_id,
+            a.entity_type,
+            COALESCE(j.job_name, c.check_name, a.entity_id) as entity_name,
+            a.metric,
+            a.observed_value,
+            a.baseline_median,
+            a.slowdown_factor,
+            a.robust_z,
+            a.observed_at
+        FROM app_schema.perf_alerts a
+        LEFT JOIN app_schema.transformation_jobs j ON a.entity_type = 'JOB' AND j.job_id = a.entity_id
+        LEFT JOIN app_schema.quality_check_configs c ON a.entity_type = 'CHECK' AND c.check_id = a.entity_id
+        WHERE NOT a.acknowledged
+        AND a.detected_at >= DATEADD('day', -7, CURRENT_TIMESTAMP())
+        ORDER BY a.observed_at DESC
+        LIMIT 50
+    """).to_pandas()
+    
+    if not alerts.empty:
+        st.error(f"{len(alerts)} unacknowledged slowdowns in the last 7 days")
+        st.dataframe(
+            alerts.drop(columns=['ALERT_ID']),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "ENTITY_TYPE": "Type",
+                "ENTITY_NAME": "Job / Check",
+                "METRIC": "Metric",
+                "OBSERVED_VALUE": st.column_config.NumberColumn("Observed", format="%.2f"),
+                "BASELINE_MEDIAN": st.column_config.NumberColumn("Baseline Median", format="%.2f"),
+                "SLOWDOWN_FACTOR": st.column_config.NumberColumn("Slowdown", format="%.1fx"),
+                "ROBUST_Z": st.column_config.NumberColumn("Robust Z", format="%.1f"),
+                "OBSERVED_AT": st.column_config.DatetimeColumn("Observed", format="MMM DD, YYYY HH:mm")
+            }
+        )
+        if st.button("✔️ Acknowledge All"):
+            alert_ids = ", ".join(f"'{alert_id}'" for alert_id in alerts['ALERT_ID'])
+            session.sql(f"UPDATE app_schema.perf_alerts SET acknowledged = TRUE WHERE alert_id IN ({alert_ids})").collect()
+            st.rerun()
+    else:
+        st.success("No performance regressions detected in the last 7 days")
+except Exception:
+    st.warning("No regression analysis available yet")
+
+analyzer_col1, analyzer_col2 = st.columns(2)
+with analyzer_col1:
+    if st.button("🔎 Analyze Now", use_container_width=True):
+        try:
+            st.success(session.call("app_schema.analyze_performance_regressions"))
+        except Exception as e:
+            st.error(f"Error: {str(e)}")
+with analyzer_col2:
+    if st.button("⏱️ Run Analyzer Every 15 Minutes", use_container_width=True):
+        try:
+            st.success(session.call("app_schema.start_regression_analyzer"))
+        except Exception as e:
+            st.error(f"Error: {str(e)}")
+
 st.markdown("---")
 st.markdown("### 📋 Recent Activity")
 
@@ -184,10 +249,10 @@ with tab1:
         latest_profiles = session.sql("""
             SELECT 
                 table_name,
-                COUNT(DISTINCT column_name) as columns_profiled,
-                MAX(profiled_at) as last_profiled
-            FROM app_schema.data_profile_results
-            GROUP BY table_name
+                column_count as columns_profiled,
+                completed_at as last_profiled
+            FROM app_schema.profile_runs
+            WHERE is_latest
             ORDER BY last_profiled DESC
             LIMIT 10
         """).to_pandas()
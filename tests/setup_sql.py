@@ -0,0 +1,172 @@
+"""Load the Python handlers and SQL statements in setup.sql so they can run locally."""
+
+import json
+import pathlib
+import re
+import sqlite3
+import textwrap
+import uuid
+
+SETUP_SQL = pathlib.Path(__file__).resolve().parent.parent / "setup.sql"
+
+
+def python_udf(function_name):
+    """Execute the Python body of a setup.sql function and return its namespace."""
+    sql = SETUP_SQL.read_text()
+    header = re.search(
+        r"CREATE OR REPLACE (?:AGGREGATE )?FUNCTION %s\([^$]*?LANGUAGE PYTHON[^$]*?\n\$\$\n" % re.escape(function_name),
+        sql,
+        re.DOTALL,
+    )
+    if header is None:
+        raise LookupError(f"No Python function named {function_name} in setup.sql")
+    body = sql[header.end():sql.index("\n$$;", header.end())]
+    namespace = {"__name__": f"setup_sql.{function_name}"}
+    exec(compile(body, f"setup.sql:{function_name}", "exec"), namespace)
+    return namespace
+
+
+def table_ddl(table_name):
+    """The CREATE TABLE statement for a setup.sql table, translated for SQLite."""
+    sql = SETUP_SQL.read_text()
+    start = sql.index(f"CREATE OR REPLACE TABLE {table_name} (")
+    return to_sqlite(sql[start:sql.index("\n);", start) + 3])
+
+
+def procedure_statement(procedure_name, starts_with, containing=None):
+    """The first statement of a setup.sql procedure that starts with `starts_with` and contains `containing`.
+
+    A statement runs from its first line to the next line ending in a semicolon.
+    """
+    sql = SETUP_SQL.read_text()
+    start = sql.index(f"CREATE OR REPLACE PROCEDURE {procedure_name}(")
+    lines = sql[start:sql.index("\n$$;", start)].splitlines()
+    for i, line in enumerate(lines):
+        if not line.strip().startswith(starts_with):
+            continue
+        end = next(j for j in range(i, len(lines)) if lines[j].rstrip().endswith(";"))
+        statement = textwrap.dedent("\n".join(lines[i:end + 1])).rstrip()[:-1]
+        if containing is None or containing in statement:
+            return statement
+    raise LookupError(f"No statement starting with {starts_with!r} in {procedure_name}")
+
+
+def register_sql_function(connection, function_name):
+    """Make a setup.sql SQL function callable from SQLite statements on `connection`."""
+    sql = SETUP_SQL.read_text()
+    header = re.search(
+        r"CREATE OR REPLACE FUNCTION %s\((.*?)\)\nRETURNS \w+\nAS\n\$\$\n" % re.escape(function_name),
+        sql,
+        re.DOTALL,
+    )
+    if header is None:
+        raise LookupError(f"No SQL function named {function_name} in setup.sql")
+    arguments = [argument.split()[0] for argument in header.group(1).split(",")]
+    body = sql[header.end():sql.index("\n$$;", header.end())].strip()
+    for argument in arguments:
+        body = re.sub(r"(?<![:\w])%s\b" % argument, ":" + argument, body)
+    evaluator = connect()
+    statement = "SELECT " + to_sqlite(body)
+    connection.create_function(
+        function_name.upper(),
+        len(arguments),
+        lambda *values: evaluator.execute(statement, dict(zip(arguments, values))).fetchone()[0],
+    )
+
+
+def to_sqlite(sql):
+    """Rewrite the Snowflake syntax these statements use into its SQLite equivalent."""
+    sql = sql.replace("CREATE OR REPLACE TABLE", "CREATE TABLE")
+    sql = sql.replace("DEFAULT UUID_STRING()", "")
+    sql = sql.replace("CURRENT_TIMESTAMP()", "CURRENT_TIMESTAMP")
+    sql = re.sub(r"DATEADD\((\w+), (-?\d+), CURRENT_TIMESTAMP\)", r"DATETIME(CURRENT_TIMESTAMP, '\2 \1')", sql)
+    sql = re.sub(r"::[A-Z_]+\b", "", sql)
+    sql = re.sub(r"\bIFF\(", "IIF(", sql)
+    sql = re.sub(r"\bILIKE\b", "LIKE", sql)
+    sql = re.sub(r"\s+INTO\s+:\w+(?:\s*,\s*:\w+)*", "", sql)
+    sql = re.sub(r"^(\s*UPDATE \w+) (\w+)$", r"\1 AS \2", sql, flags=re.MULTILINE)
+    return sql
+
+
+def _json_array(value):
+    return [] if value is None else json.loads(value)
+
+
+class _CountIf:
+    def __init__(self):
+        self.count = 0
+
+    def step(self, condition):
+        self.count += bool(condition)
+
+    def finalize(self):
+        return self.count
+
+
+class _AnyValue:
+    def __init__(self):
+        self.value = None
+
+    def step(self, value):
+        if self.value is None:
+            self.value = value
+
+    def finalize(self):
+        return self.value
+
+
+class _ArrayUniqueAgg:
+    def __init__(self):
+        self.values = []
+
+    def step(self, value):
+        if value is not None and value not in self.values:
+            self.values.append(value)
+
+    def finalize(self):
+        return json.dumps(self.values)
+
+
+class _MaxBy:
+    def __init__(self):
+        self.best = None
+
+    def step(self, value, key):
+        if key is not None and (self.best is None or key > self.best[0]):
+            self.best = (key, value)
+
+    def finalize(self):
+        return None if self.best is None else self.best[1]
+
+
+def _regexp_like(subject, pattern):
+    if subject is None or pattern is None:
+        return None
+    return re.fullmatch(pattern, str(subject)) is not None
+
+
+def _object_construct(*pairs):
+    return json.dumps({
+        key: value for key, value in zip(pairs[::2], pairs[1::2]) if value is not None
+    })
+
+
+def connect():
+    """An in-memory SQLite connection with the Snowflake functions these statements call."""
+    connection = sqlite3.connect(":memory:")
+    connection.create_aggregate("COUNT_IF", 1, _CountIf)
+    connection.create_aggregate("ANY_VALUE", 1, _AnyValue)
+    connection.create_aggregate("ARRAY_UNIQUE_AGG", 1, _ArrayUniqueAgg)
+    connection.create_aggregate("MAX_BY", 2, _MaxBy)
+    connection.create_function("ARRAY_CONSTRUCT", -1, lambda *values: json.dumps(list(values)))
+    connection.create_function("ARRAY_CONTAINS", 2, lambda value, array: value in _json_array(array))
+    connection.create_function("ARRAY_APPEND", 2, lambda array, value: json.dumps(_json_array(array) + [value]))
+    connection.create_function("ARRAY_SIZE", 1, lambda array: None if array is None else len(_json_array(array)))
+    connection.create_function("OBJECT_CONSTRUCT", -1, _object_construct)
+    connection.create_function("EQUAL_NULL", 2, lambda left, right: left == right)
+    connection.create_function("GREATEST", -1, lambda *values: None if None in values else max(values))
+    connection.create_function("LEAST", -1, lambda *values: None if None in values else min(values))
+    connection.create_function("CEIL", 1, lambda value: None if value is None else -(-value // 1))
+    connection.create_function("REGEXP_LIKE", 2, _regexp_like)
+    connection.create_function("UUID_STRING", 0, lambda: str(uuid.uuid4()))
+    return connection
@@ -0,0 +1,142 @@
+"""Simulated-clock harness for the batch_run_progress worker pools.
+
+profile_schema and run_all_quality_checks start max_concurrency workers.
+Each worker repeatedly picks the largest QUEUED row and claims it with a
+conditional UPDATE (status = 'QUEUED'), so a slot is refilled as soon as it
+frees up. The harness runs profile_schema_worker's pick and claim statements
+from setup.sql in SQLite over tables of varied size, on a simulated clock,
+and compares the makespan with serial execution and fixed AWAIT ALL waves.
+"""
+
+import heapq
+import random
+
+import pytest
+
+from setup_sql import connect, procedure_statement, table_ddl, to_sqlite
+
+PICK_NEXT = to_sqlite(procedure_statement("profile_schema_worker", "SELECT ANY_VALUE(object_name)"))
+CLAIM = to_sqlite(procedure_statement("profile_schema_worker", "UPDATE batch_run_progress"))
+
+
+def table_sizes(count, seed):
+    generator = random.Random(seed)
+    return [generator.lognormvariate(0, 1.5) for _ in range(count)]
+
+
+def serial_makespan(sizes):
+    return sum(sizes)
+
+
+def wave_makespan(sizes, concurrency):
+    ordered = sorted(sizes, reverse=True)
+    return sum(max(ordered[start:start + concurrency]) for start in range(0, len(ordered), concurrency))
+
+
+class ProgressTable:
+    """batch_run_progress rows for one batch."""
+
+    def __init__(self, sizes):
+        self.sizes = {f"table_{i}": size for i, size in enumerate(sizes)}
+        self.claims = {}
+        self.connection = connect()
+        self.connection.execute(table_ddl("batch_run_progress"))
+        self.connection.executemany(
+            """INSERT INTO batch_run_progress (batch_id, batch_type, object_name, estimated_bytes)
+            VALUES ('batch', 'PROFILE_SCHEMA', ?, ?)""",
+            self.sizes.items(),
+        )
+
+    def next_queued(self):
+        return self.connection.execute(PICK_NEXT, {"batch_id": "batch"}).fetchone()[0]
+
+    def claim(self, name, worker):
+        claimed = self.connection.execute(CLAIM, {"batch_id": "batch", "next_table": name}).rowcount
+        if claimed:
+            self.claims.setdefault(name, []).append(worker)
+        return claimed
+
+    def queued(self):
+        return self.connection.execute("SELECT COUNT(*) FROM batch_run_progress WHERE status = 'QUEUED'").fetchone()[0]
+
+
+def worker_pool_makespan(sizes, concurrency):
+    progress = ProgressTable(sizes)
+    free_at = [(0.0, worker) for worker in range(min(concurrency, len(sizes)))]
+    heapq.heapify(free_at)
+    finish = 0.0
+    while free_at:
+        now, worker = heapq.heappop(free_at)
+        name = progress.next_queued()
+        if name is None:
+            finish = max(finish, now)
+            continue
+        if progress.claim(name, worker):
+            heapq.heappush(free_at, (now + progress.sizes[name], worker))
+    return finish
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+@pytest.mark.parametrize("concurrency", [4, 8, 16])
+def test_worker_pool_beats_serial_and_waves(seed, concurrency):
+    sizes = table_sizes(200, seed)
+    pool = worker_pool_makespan(sizes, concurrency)
+    lower_bound = max(sum(sizes) / concurrency, max(sizes))
+    assert pool <= wave_makespan(sizes, concurrency)
+    assert pool < serial_makespan(sizes) / (concurrency * 0.75)
+    assert pool <= lower_bound * (4 / 3)
+
+
+def test_one_huge_table_does_not_hold_back_the_other_slots():
+    sizes = [100.0] + [1.0] * 70
+    pool = worker_pool_makespan(sizes, 8)
+    assert pool == pytest.approx(100.0)
+    assert wave_makespan(sizes, 8) == pytest.approx(108.0)
+
+
+def test_concurrent_claims_run_every_table_exactly_once():
+    generator = random.Random(11)
+    progress = ProgressTable(table_sizes(60, 5))
+    workers = {worker: None for worker in range(8)}
+    while progress.queued():
+        worker = generator.choice(list(workers))
+        if workers[worker] is None:
+            workers[worker] = progress.next_queued()
+        else:
+            progress.claim(workers[worker], worker)
+            workers[worker] = None
+    assert set(progress.claims) == set(progress.sizes)
+    assert all(len(claimants) == 1 for claimants in progress.claims.values())
+
+
+def test_lane_claims_never_exceed_max_per_warehouse():
+    pick_next = to_sqlite(procedure_statement("job_queue_worker", "SELECT ANY_VALUE(run_id)"))
+    claim = to_sqlite(procedure_statement("job_queue_worker", "UPDATE job_run_queue", "max_per_warehouse"))
+    connection = connect()
+    connection.execute(table_ddl("job_run_queue"))
+    connection.executemany(
+        "INSERT INTO job_run_queue (run_id, job_id, warehouse_name) VALUES (?, ?, ?)",
+        [(f"run_{i}", f"job_{i}", "ETL_WH" if i % 3 else "ADHOC_WH") for i in range(90)],
+    )
+    generator = random.Random(3)
+    lane = {"lane": "ETL_WH", "max_per_warehouse": 4}
+    workers = {f"drain_{i}": None for i in range(8)}
+    peak = 0
+    while connection.execute("SELECT COUNT(*) FROM job_run_queue WHERE warehouse_name = 'ETL_WH' AND status <> 'SUCCESS'").fetchone()[0]:
+        drain_id = generator.choice(list(workers))
+        if generator.random() < 0.1:
+            connection.execute(
+                "UPDATE job_run_queue SET status = 'SUCCESS' WHERE run_id = (SELECT MIN(run_id) FROM job_run_queue WHERE status = 'RUNNING')"
+            )
+        elif workers[drain_id] is None:
+            workers[drain_id] = connection.execute(pick_next, lane).fetchone()[0]
+        else:
+            connection.execute(claim, {**lane, "next_run": workers[drain_id], "drain_id": drain_id})
+            workers[drain_id] = None
+        running = connection.execute(
+            "SELECT COUNT(*) FROM job_run_queue WHERE warehouse_name = 'ETL_WH' AND status = 'RUNNING'"
+        ).fetchone()[0]
+        peak = max(peak, running)
+        assert running <= lane["max_per_warehouse"]
+    assert peak == lane["max_per_warehouse"]
+    assert connection.execute("SELECT COUNT(*) FROM job_run_queue WHERE warehouse_name = 'ADHOC_WH' AND status = 'QUEUED'").fetchone()[0] == 30
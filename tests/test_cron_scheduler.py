@@ -0,0 +1,148 @@
+"""cron_next_fire and a simulated-clock model of dispatch_scheduled_jobs.
+
+next_scheduled_run offsets each job's cron fire time by a stable per-job
+jitter of at most max_jitter_seconds and half the gap to the following fire.
+The dispatcher model replays one tick of dispatch_scheduled_jobs: due jobs in
+next_run_at order, a job whose previous run is still RUNNING is recorded as
+SKIPPED without taking a slot, and jobs over the concurrency limit keep their
+next_run_at so the next tick picks them up.
+"""
+
+import hashlib
+from datetime import datetime, timedelta
+
+import pytest
+
+from setup_sql import python_udf
+
+next_fire = python_udf("cron_next_fire")["next_fire"]
+
+
+def stable_hash(job_id):
+    return int.from_bytes(hashlib.blake2b(job_id.encode(), digest_size=8).digest(), "big")
+
+
+def next_scheduled_run(job_id, cron, after, max_jitter_seconds):
+    fire = next_fire(cron, after)
+    gap = (next_fire(cron, fire) - fire).total_seconds()
+    jitter_range = max(int(min(max_jitter_seconds, gap / 2)), 1)
+    return fire + timedelta(seconds=stable_hash(job_id) % jitter_range)
+
+
+def dispatch_tick(jobs, running, tick, max_concurrent_jobs, max_jitter_seconds):
+    open_slots = max(max_concurrent_jobs - len(running), 0)
+    launched, skipped, deferred = [], [], []
+    due = sorted((job for job in jobs.values() if job["next_run_at"] <= tick), key=lambda job: job["next_run_at"])
+    for job in due:
+        is_running = job["job_id"] in running
+        if not is_running and len(launched) >= open_slots:
+            deferred.append(job["job_id"])
+            continue
+        job["next_run_at"] = next_scheduled_run(job["job_id"], job["schedule"], tick, max_jitter_seconds)
+        (skipped if is_running else launched).append(job["job_id"])
+    return launched, skipped, deferred
+
+
+def job(job_id, schedule, next_run_at):
+    return {"job_id": job_id, "schedule": schedule, "next_run_at": next_run_at}
+
+
+@pytest.mark.parametrize(
+    "cron, after, expected",
+    [
+        ("*/15 * * * *", datetime(2024, 3, 4, 10, 7, 30), datetime(2024, 3, 4, 10, 15)),
+        ("0 * * * *", datetime(2024, 3, 4, 10, 0), datetime(2024, 3, 4, 11, 0)),
+        ("30 2 * * *", datetime(2024, 12, 31, 3, 0), datetime(2025, 1, 1, 2, 30)),
+        ("0 9 * * 1-5", datetime(2024, 3, 8, 9, 0), datetime(2024, 3, 11, 9, 0)),
+        ("0 0 29 2 *", datetime(2024, 3, 1), datetime(2028, 2, 29)),
+        ("0 0 13 * 5", datetime(2024, 9, 1), datetime(2024, 9, 6)),
+        ("0 0 * * 7", datetime(2024, 3, 4), datetime(2024, 3, 10)),
+    ],
+)
+def test_next_fire(cron, after, expected):
+    assert next_fire(cron, after) == expected
+
+
+@pytest.mark.parametrize("cron", ["0 0 31 2 *", "0 0 30 2 *", "0 0 31 4,6,9,11 *"])
+def test_impossible_dates_never_fire(cron):
+    assert next_fire(cron, datetime(2024, 1, 1)) is None
+
+
+@pytest.mark.parametrize("cron", ["", "* * * *", "61 * * * *", "a * * * *"])
+def test_malformed_schedules_never_fire(cron):
+    assert next_fire(cron, datetime(2024, 1, 1)) is None
+
+
+@pytest.mark.parametrize(
+    "cron, max_jitter_seconds",
+    [("*/5 * * * *", 300), ("0 * * * *", 300), ("0 2 * * *", 300), ("* * * * *", 300), ("0 * * * *", 0)],
+)
+def test_jitter_stays_within_bound_and_before_the_following_fire(cron, max_jitter_seconds):
+    after = datetime(2024, 3, 4, 10, 7)
+    fire = next_fire(cron, after)
+    following = next_fire(cron, fire)
+    bound = max(min(max_jitter_seconds, (following - fire).total_seconds() / 2), 1)
+    offsets = set()
+    for i in range(500):
+        scheduled = next_scheduled_run(f"job-{i}", cron, after, max_jitter_seconds)
+        assert fire <= scheduled < fire + timedelta(seconds=bound)
+        assert scheduled < following
+        offsets.add(scheduled - fire)
+    assert len(offsets) > 1 if bound > 1 else offsets == {timedelta(0)}
+
+
+def test_jitter_is_stable_per_job():
+    after = datetime(2024, 3, 4, 10, 7)
+    assert next_scheduled_run("nightly", "0 2 * * *", after, 300) == next_scheduled_run("nightly", "0 2 * * *", after, 300)
+
+
+def test_due_jobs_launch_in_next_run_order_and_overflow_is_deferred():
+    tick = datetime(2024, 3, 4, 10, 0, 30)
+    jobs = {
+        job_id: job(job_id, "*/5 * * * *", tick - timedelta(seconds=seconds))
+        for job_id, seconds in [("c", 10), ("a", 300), ("d", 5), ("b", 60)]
+    }
+    jobs["future"] = job("future", "*/5 * * * *", tick + timedelta(seconds=1))
+    launched, skipped, deferred = dispatch_tick(jobs, set(), tick, 2, 60)
+    assert launched == ["a", "b"]
+    assert deferred == ["c", "d"]
+    assert skipped == []
+    assert jobs["c"]["next_run_at"] <= tick and jobs["d"]["next_run_at"] <= tick
+    assert all(jobs[job_id]["next_run_at"] > tick for job_id in launched)
+
+    launched, _, deferred = dispatch_tick(jobs, {"a", "b"}, tick + timedelta(minutes=1), 4, 60)
+    assert launched == ["c", "d"]
+    assert deferred == ["future"]
+
+
+def test_running_job_is_skipped_without_taking_a_slot():
+    tick = datetime(2024, 3, 4, 10, 0, 30)
+    jobs = {
+        "slow": job("slow", "* * * * *", tick - timedelta(seconds=20)),
+        "fast": job("fast", "* * * * *", tick - timedelta(seconds=10)),
+    }
+    launched, skipped, deferred = dispatch_tick(jobs, {"slow"}, tick, 2, 0)
+    assert skipped == ["slow"]
+    assert launched == ["fast"]
+    assert deferred == []
+    assert jobs["slow"]["next_run_at"] == datetime(2024, 3, 4, 10, 1)
+
+
+def test_simulated_day_fires_each_job_once_per_schedule_slot():
+    jobs = {
+        "every_15": job("every_15", "*/15 * * * *", None),
+        "hourly": job("hourly", "0 * * * *", None),
+        "nightly": job("nightly", "30 2 * * *", None),
+    }
+    start = datetime(2024, 3, 4)
+    for entry in jobs.values():
+        entry["next_run_at"] = next_scheduled_run(entry["job_id"], entry["schedule"], start, 300)
+    fired = {job_id: 0 for job_id in jobs}
+    for minute in range(1, 24 * 60 + 1):
+        launched, _, deferred = dispatch_tick(jobs, set(), start + timedelta(minutes=minute), 4, 300)
+        assert deferred == []
+        for job_id in launched:
+            fired[job_id] += 1
+    assert fired["every_15"] in (95, 96)
+    assert fired["hourly"] in (23, 24)
+    assert fired["nightly"] == 1
@@ -0,0 +1,201 @@
+"""Merged incremental quality check state against a full rescan.
+
+run_quality_check_incremental keeps total, non-null and failed counts plus
+either an HLL sketch or an exact key set per check, and merges each delta
+scan into that state. These tests replay the same merge over batches of an
+append-only table, then run the procedure's own result INSERT from setup.sql
+over the merged state in SQLite and compare it with a full rescan. The HLL
+model uses 4096 registers, the precision behind Snowflake's HLL_ACCUMULATE
+and its 1.62% relative error; the delta scan and the MERGE are modelled.
+"""
+
+import hashlib
+import json
+import math
+import random
+
+import pytest
+
+from setup_sql import connect, procedure_statement, register_sql_function, table_ddl, to_sqlite
+
+RESULT_INSERT = to_sqlite(
+    procedure_statement("run_quality_check_incremental", "INSERT INTO quality_check_results", containing="records_failed")
+)
+
+REGISTER_BITS = 12
+REGISTERS = 1 << REGISTER_BITS
+
+
+def hll_accumulate(values):
+    registers = [0] * REGISTERS
+    for value in values:
+        if value is None:
+            continue
+        hashed = int.from_bytes(hashlib.blake2b(repr(value).encode(), digest_size=8).digest(), "big")
+        register = hashed >> (64 - REGISTER_BITS)
+        remainder = hashed & ((1 << (64 - REGISTER_BITS)) - 1)
+        rank = (64 - REGISTER_BITS) - remainder.bit_length() + 1
+        registers[register] = max(registers[register], rank)
+    return registers
+
+
+def hll_combine(*sketches):
+    return [max(registers) for registers in zip(*sketches)]
+
+
+def hll_estimate(registers):
+    alpha = 0.7213 / (1 + 1.079 / REGISTERS)
+    estimate = alpha * REGISTERS ** 2 / sum(2.0 ** -register for register in registers)
+    empty = registers.count(0)
+    if estimate <= 2.5 * REGISTERS and empty:
+        return REGISTERS * math.log(REGISTERS / empty)
+    return estimate
+
+
+def evaluate(state, check_type, exact_keys, failure_threshold=0):
+    """Store merged state and run the result INSERT at the end of run_quality_check_incremental."""
+    connection = connect()
+    register_sql_function(connection, "quality_check_status")
+    connection.create_function("HLL_IMPORT", 1, lambda hll_state: hll_state)
+    connection.create_function("HLL_ESTIMATE", 1, lambda hll_state: hll_estimate(json.loads(hll_state)))
+    connection.execute(table_ddl("quality_check_state"))
+    connection.execute(table_ddl("quality_check_results"))
+    connection.execute(
+        """INSERT INTO quality_check_state (
+            check_id, table_name, watermark_column, watermark_value,
+            total_count, non_null_count, failed_count, hll_state, key_set, last_delta_rows
+        ) VALUES ('check', 'DB.S.T', 'loaded_at', :watermark_value, :total_count, :non_null_count, :failed_count, :hll_state, :key_set, 0)""",
+        {
+            **state,
+            "hll_state": None if state["hll_state"] is None else json.dumps(state["hll_state"]),
+            "key_set": None if state["key_set"] is None else json.dumps(sorted(state["key_set"])),
+        },
+    )
+    connection.execute(RESULT_INSERT, {
+        "check_id": "check",
+        "is_key_check": check_type in ("DUPLICATE_CHECK", "UNIQUENESS_CHECK"),
+        "exact_keys": exact_keys,
+        "failure_threshold": failure_threshold,
+        "failure_label": "duplicate",
+        "scan_elapsed_ms": 0,
+        "scan_query_id": "query",
+    })
+    status, records_failed, details = connection.execute(
+        "SELECT status, records_failed, details FROM quality_check_results"
+    ).fetchone()
+    return {"status": status, "records_failed": records_failed, **json.loads(details)}
+
+
+def scan(rows, check_type, exact_keys):
+    """One delta scan: the EXECUTE IMMEDIATE aggregate over new rows."""
+    keys = [key for key, _ in rows]
+    is_key_check = check_type in ("DUPLICATE_CHECK", "UNIQUENESS_CHECK")
+    return {
+        "total_count": len(rows),
+        "non_null_count": len(rows) if check_type == "DUPLICATE_CHECK" else sum(key is not None for key in keys),
+        "failed_count": 0 if is_key_check else sum(key is None for key in keys),
+        "hll_state": hll_accumulate(keys) if is_key_check and not exact_keys else None,
+        "key_set": {key for key in keys if key is not None} if is_key_check and exact_keys else None,
+        "watermark_value": max(watermark for _, watermark in rows),
+    }
+
+
+def merge(state, delta):
+    """The MERGE INTO quality_check_state combining stored state with a delta."""
+    if state is None:
+        return delta
+    return {
+        "total_count": state["total_count"] + delta["total_count"],
+        "non_null_count": state["non_null_count"] + delta["non_null_count"],
+        "failed_count": state["failed_count"] + delta["failed_count"],
+        "hll_state": None if delta["hll_state"] is None else hll_combine(state["hll_state"], delta["hll_state"]),
+        "key_set": None if delta["key_set"] is None else state["key_set"] | delta["key_set"],
+        "watermark_value": delta["watermark_value"],
+    }
+
+
+def run_incrementally(rows, batch_count, check_type, exact_keys):
+    state = None
+    batch_size = math.ceil(len(rows) / batch_count)
+    for start in range(0, len(rows), batch_size):
+        last_watermark = -1 if state is None else state["watermark_value"]
+        delta = [row for row in rows[:start + batch_size] if row[1] > last_watermark]
+        state = merge(state, scan(delta, check_type, exact_keys))
+    return state
+
+
+def table(row_count, duplicate_rate=0.0, null_rate=0.0, seed=0):
+    generator = random.Random(seed)
+    rows, seen = [], []
+    for watermark in range(row_count):
+        if seen and generator.random() < duplicate_rate:
+            key = generator.choice(seen)
+        elif generator.random() < null_rate:
+            key = None
+        else:
+            key = f"key-{seed}-{watermark}"
+            seen.append(key)
+        rows.append((key, watermark))
+    return rows
+
+
+@pytest.mark.parametrize("check_type", ["NULL_CHECK", "DUPLICATE_CHECK", "UNIQUENESS_CHECK"])
+def test_exact_merged_state_matches_full_rescan(check_type):
+    rows = table(20_000, duplicate_rate=0.05, null_rate=0.02, seed=1)
+    merged = run_incrementally(rows, 7, check_type, exact_keys=True)
+    rescan = scan(rows, check_type, exact_keys=True)
+    assert merged["total_count"] == rescan["total_count"] == len(rows)
+    merged_result = evaluate(merged, check_type, True)
+    assert merged_result["records_failed"] == evaluate(rescan, check_type, True)["records_failed"] > 0
+    assert merged_result["exact"] and merged_result["status"] == "FAILED"
+
+
+@pytest.mark.parametrize("check_type", ["DUPLICATE_CHECK", "UNIQUENESS_CHECK"])
+def test_merged_hll_sketch_equals_full_rescan_sketch(check_type):
+    rows = table(30_000, duplicate_rate=0.05, null_rate=0.02, seed=2)
+    merged = run_incrementally(rows, 5, check_type, exact_keys=False)
+    rescan = scan(rows, check_type, exact_keys=False)
+    assert merged["hll_state"] == rescan["hll_state"]
+    assert merged["non_null_count"] == rescan["non_null_count"]
+    assert evaluate(merged, check_type, False) == evaluate(rescan, check_type, False)
+
+
+@pytest.mark.parametrize("seed", range(8))
+@pytest.mark.parametrize("row_count", [50_000, 200_000])
+def test_hll_error_on_clean_keys_does_not_fail_the_check(row_count, seed):
+    rows = table(row_count, seed=seed)
+    result = evaluate(run_incrementally(rows, 4, "DUPLICATE_CHECK", exact_keys=False), "DUPLICATE_CHECK", False)
+    assert result["status"] != "FAILED"
+    assert result["records_failed_low"] == 0
+    assert not result["exact"]
+    assert result["message"].startswith("Found approximately")
+
+
+@pytest.mark.parametrize("duplicate_rate", [0.02, 0.05])
+def test_duplicates_inside_the_error_bound_are_reported_not_passed(duplicate_rate):
+    rows = table(100_000, duplicate_rate=duplicate_rate, seed=4)
+    true_duplicates = len(rows) - len({key for key, _ in rows})
+    result = evaluate(run_incrementally(rows, 4, "DUPLICATE_CHECK", exact_keys=False), "DUPLICATE_CHECK", False)
+    assert result["status"] != "PASSED"
+    assert result["records_failed"] > 0
+    assert result["records_failed_low"] <= true_duplicates <= result["records_failed_high"]
+
+
+def test_duplicates_beyond_the_error_bound_fail():
+    rows = table(100_000, duplicate_rate=0.15, seed=3)
+    true_duplicates = len(rows) - len({key for key, _ in rows})
+    result = evaluate(run_incrementally(rows, 4, "DUPLICATE_CHECK", exact_keys=False), "DUPLICATE_CHECK", False)
+    assert result["status"] == "FAILED"
+    assert result["records_failed_low"] > 0
+    assert result["records_failed_low"] <= true_duplicates <= result["records_failed_high"]
+
+
+def test_failure_threshold_applies_to_the_lower_bound():
+    rows = table(100_000, duplicate_rate=0.15, seed=3)
+    state = run_incrementally(rows, 4, "DUPLICATE_CHECK", exact_keys=False)
+    result = evaluate(state, "DUPLICATE_CHECK", False)
+    low_percent = result["records_failed_low"] * 100 / len(rows)
+    high_percent = result["records_failed_high"] * 100 / len(rows)
+    assert evaluate(state, "DUPLICATE_CHECK", False, failure_threshold=low_percent - 0.5)["status"] == "FAILED"
+    assert evaluate(state, "DUPLICATE_CHECK", False, failure_threshold=low_percent + 0.5)["status"] == "WARNING"
+    assert evaluate(state, "DUPLICATE_CHECK", False, failure_threshold=high_percent + 0.5)["status"] == "PASSED"
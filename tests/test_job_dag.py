@@ -0,0 +1,187 @@
+"""run_job_dag's own statements from setup.sql, run in SQLite.
+
+The harness follows the procedure's control flow and runs each of its
+statements in turn: the dependency INSERT (a job depends on every active job
+whose target_table is its source_table, case-insensitively, or that it lists
+in depends_on), the wave-levelling UPDATE, the cycle and upstream-failure
+skips, the status copy from job_execution_history and the critical-path
+UPDATE. execute_transformation_job is replaced by a stub that records each
+job's status and duration in job_execution_history.
+"""
+
+import json
+
+import pytest
+
+from setup_sql import connect, procedure_statement, table_ddl, to_sqlite
+
+
+def statement(starts_with, containing=None):
+    return to_sqlite(procedure_statement("run_job_dag", starts_with, containing))
+
+
+DEPENDENCY_INSERT = statement("INSERT INTO dag_run_jobs")
+WAVE_UPDATE = statement("UPDATE dag_run_jobs d", "SET wave")
+CYCLE_SKIP = statement("UPDATE dag_run_jobs", "AND wave IS NULL")
+CYCLE_HISTORY = statement("INSERT INTO job_execution_history", "Dependency cycle")
+BLOCKED_SKIP = statement("UPDATE dag_run_jobs d", "u.status = 'FAILED'")
+BLOCKED_HISTORY = statement("INSERT INTO job_execution_history", "Upstream job failed")
+EXECUTION_IDS = statement("UPDATE dag_run_jobs", "SET execution_id")
+STATUS_COPY = statement("UPDATE dag_run_jobs d", "FROM job_execution_history h")
+PATH_UPDATE = statement("UPDATE dag_run_jobs d", "path_seconds =")
+RUN_COUNTS = statement("SELECT COUNT_IF(status = 'SUCCESS')")
+RUN_SUMMARY = statement("UPDATE dag_runs r")
+
+
+def run_dag(jobs, durations, failing=()):
+    connection = connect()
+    for table in ("transformation_jobs", "job_execution_history", "dag_runs", "dag_run_jobs"):
+        connection.execute(table_ddl(table))
+    connection.executemany(
+        """INSERT INTO transformation_jobs (job_id, job_name, source_table, target_table, transformation_type, is_active, depends_on)
+        VALUES (?, ?, ?, ?, 'DEDUPLICATE', ?, ?)""",
+        [
+            (
+                job_id, job_id, job["source_table"], job["target_table"], job.get("is_active", True),
+                json.dumps(job["depends_on"]) if "depends_on" in job else None,
+            )
+            for job_id, job in jobs.items()
+        ],
+    )
+    run = {"dag_run_id": "dag-run"}
+    connection.execute("INSERT INTO dag_runs (dag_run_id, status) VALUES (:dag_run_id, 'RUNNING')", run)
+    job_count = connection.execute(DEPENDENCY_INSERT, run).rowcount
+    wave = 0
+    while connection.execute(WAVE_UPDATE, {**run, "wave": wave}).rowcount:
+        wave += 1
+    connection.execute(CYCLE_SKIP, run)
+    connection.execute(CYCLE_HISTORY, run)
+    for w in range(wave):
+        connection.execute(BLOCKED_SKIP, {**run, "w": w})
+        connection.execute(BLOCKED_HISTORY, {**run, "w": w})
+        connection.execute(EXECUTION_IDS, {**run, "w": w})
+        ready = connection.execute(
+            "SELECT job_id, execution_id FROM dag_run_jobs WHERE dag_run_id = :dag_run_id AND wave = :w AND status IS NULL",
+            {**run, "w": w},
+        ).fetchall()
+        connection.executemany(
+            "INSERT INTO job_execution_history (execution_id, job_id, status, execution_time_seconds) VALUES (?, ?, ?, ?)",
+            [(execution_id, job_id, "FAILED" if job_id in failing else "SUCCESS", durations[job_id]) for job_id, execution_id in ready],
+        )
+        connection.execute(STATUS_COPY, {**run, "w": w})
+        connection.execute(PATH_UPDATE, {**run, "w": w})
+    succeeded, failed, skipped, blocked = connection.execute(RUN_COUNTS, run).fetchone()
+    connection.execute(RUN_SUMMARY, {
+        **run, "job_count": job_count, "wave_count": wave,
+        "succeeded": succeeded, "failed": failed, "skipped": skipped, "blocked": blocked,
+    })
+    dag_jobs = connection.execute("SELECT job_id, wave, status FROM dag_run_jobs").fetchall()
+    upstream = connection.execute("SELECT job_id, upstream_job_ids FROM dag_run_jobs").fetchall()
+    status, critical_path, critical_path_seconds, wave_count = connection.execute(
+        "SELECT status, critical_path, critical_path_seconds, wave_count FROM dag_runs"
+    ).fetchone()
+    return {
+        "upstream": {job_id: set(json.loads(upstream_ids)) for job_id, upstream_ids in upstream},
+        "waves": {job_id: job_wave for job_id, job_wave, _ in dag_jobs if job_wave is not None},
+        "status": {job_id: job_status for job_id, _, job_status in dag_jobs},
+        "run_status": status,
+        "wave_count": wave_count,
+        "critical_path": json.loads(critical_path),
+        "critical_path_seconds": critical_path_seconds,
+        "skipped_history": connection.execute("SELECT COUNT(*) FROM job_execution_history WHERE status = 'SKIPPED'").fetchone()[0],
+    }
+
+
+def chain(*names):
+    return {
+        name: {"source_table": f"DB.RAW.{name}_IN", "target_table": f"DB.RAW.{names[i + 1]}_IN" if i + 1 < len(names) else f"DB.MART.{name}"}
+        for i, name in enumerate(names)
+    }
+
+
+def test_underscore_in_table_name_is_not_a_wildcard():
+    jobs = {
+        "load_orders": {"source_table": "DB.RAW.FEED", "target_table": "DB.STAGE.ORDERSXRAW"},
+        "clean_orders": {"source_table": "db.stage.orders_raw", "target_table": "DB.MART.ORDERS"},
+    }
+    result = run_dag(jobs, dict.fromkeys(jobs, 1))
+    assert result["upstream"] == {"load_orders": set(), "clean_orders": set()}
+    assert result["waves"] == {"load_orders": 0, "clean_orders": 0}
+
+
+def test_table_match_ignores_case():
+    jobs = {
+        "load_orders": {"source_table": "DB.RAW.FEED", "target_table": "DB.STAGE.ORDERS_RAW"},
+        "clean_orders": {"source_table": "db.stage.orders_raw", "target_table": "DB.MART.ORDERS"},
+    }
+    result = run_dag(jobs, dict.fromkeys(jobs, 1))
+    assert result["upstream"]["clean_orders"] == {"load_orders"}
+    assert result["waves"] == {"load_orders": 0, "clean_orders": 1}
+
+
+def test_inactive_jobs_are_neither_run_nor_upstream():
+    jobs = {
+        "load_orders": {"source_table": "DB.RAW.FEED", "target_table": "DB.STAGE.ORDERS"},
+        "clean_orders": {"source_table": "DB.STAGE.ORDERS", "target_table": "DB.MART.ORDERS", "depends_on": ["retired"]},
+        "retired": {"source_table": "DB.RAW.OLD_FEED", "target_table": "DB.STAGE.ORDERS", "is_active": False},
+    }
+    result = run_dag(jobs, dict.fromkeys(jobs, 1))
+    assert result["upstream"] == {"load_orders": set(), "clean_orders": {"load_orders"}}
+    assert result["status"] == {"load_orders": "SUCCESS", "clean_orders": "SUCCESS"}
+
+
+def test_diamond_runs_in_three_waves():
+    jobs = {
+        "extract": {"source_table": "DB.RAW.FEED", "target_table": "DB.STAGE.EVENTS"},
+        "sessions": {"source_table": "DB.STAGE.EVENTS", "target_table": "DB.MART.SESSIONS"},
+        "users": {"source_table": "DB.STAGE.EVENTS", "target_table": "DB.MART.USERS"},
+        "report": {"source_table": "DB.MART.SESSIONS", "target_table": "DB.MART.REPORT", "depends_on": ["users"]},
+    }
+    result = run_dag(jobs, {"extract": 10, "sessions": 30, "users": 5, "report": 2})
+    assert result["waves"] == {"extract": 0, "sessions": 1, "users": 1, "report": 2}
+    assert set(result["status"].values()) == {"SUCCESS"}
+    assert result["critical_path"] == ["extract", "sessions", "report"]
+    assert result["critical_path_seconds"] == 42
+    assert result["run_status"] == "SUCCESS" and result["wave_count"] == 3
+
+
+def test_failure_skips_downstream_but_not_siblings():
+    jobs = {
+        "extract": {"source_table": "DB.RAW.FEED", "target_table": "DB.STAGE.EVENTS"},
+        "sessions": {"source_table": "DB.STAGE.EVENTS", "target_table": "DB.MART.SESSIONS"},
+        "users": {"source_table": "DB.STAGE.EVENTS", "target_table": "DB.MART.USERS"},
+        "report": {"source_table": "DB.MART.SESSIONS", "target_table": "DB.MART.REPORT"},
+        "export": {"source_table": "DB.MART.REPORT", "target_table": "DB.OUT.REPORT"},
+    }
+    result = run_dag(jobs, dict.fromkeys(jobs, 1), failing={"sessions"})
+    assert result["status"] == {
+        "extract": "SUCCESS",
+        "sessions": "FAILED",
+        "users": "SUCCESS",
+        "report": "SKIPPED",
+        "export": "SKIPPED",
+    }
+    assert result["skipped_history"] == 2
+    assert result["run_status"] == "FAILED"
+
+
+def test_cycle_is_skipped_and_independent_jobs_still_run():
+    jobs = {
+        "a": {"source_table": "DB.S.B", "target_table": "DB.S.A"},
+        "b": {"source_table": "DB.S.A", "target_table": "DB.S.B"},
+        "c": {"source_table": "DB.RAW.FEED", "target_table": "DB.S.C"},
+    }
+    result = run_dag(jobs, dict.fromkeys(jobs, 1))
+    assert result["status"] == {"a": "SKIPPED", "b": "SKIPPED", "c": "SUCCESS"}
+    assert result["waves"] == {"c": 0}
+    assert result["skipped_history"] == 2
+    assert result["run_status"] == "FAILED"
+
+
+@pytest.mark.parametrize("length", [1, 4, 12])
+def test_chain_has_one_job_per_wave_and_full_critical_path(length):
+    names = [f"step{i}" for i in range(length)]
+    result = run_dag(chain(*names), {name: i + 1 for i, name in enumerate(names)})
+    assert result["waves"] == {name: i for i, name in enumerate(names)}
+    assert result["critical_path"] == names
+    assert result["critical_path_seconds"] == length * (length + 1) // 2
@@ -0,0 +1,142 @@
+"""Check predicates and pass/fail arithmetic of run_quality_checks.
+
+run_quality_checks takes each check's aggregate from quality_check_expr and
+its status from quality_check_status. These tests run both functions from
+setup.sql over a SQLite fixture table and compare the counts with the rows
+counted directly. Row uniqueness (UNIQUENESS_CHECK without a column) hashes
+the whole row with HASH(*), which SQLite has no equivalent for, so only its
+expression is checked.
+"""
+
+import random
+
+import pytest
+
+from setup_sql import connect, python_udf, register_sql_function, to_sqlite
+
+check_expr = python_udf("quality_check_expr")["check_expr"]
+
+ROW_COUNT = 2_000
+
+
+def fixture_rows(seed=5):
+    generator = random.Random(seed)
+    rows = []
+    for row_id in range(ROW_COUNT):
+        email = None if generator.random() < 0.05 else f"user{generator.randrange(1500)}@example.com"
+        amount = None if generator.random() < 0.03 else round(generator.uniform(-20, 130), 2)
+        code = generator.choice([f"ABC-{generator.randrange(10000):04d}", "abc-1234", "ABC-12", None])
+        rows.append((row_id, email, amount, code))
+    return rows
+
+
+@pytest.fixture(scope="module")
+def rows():
+    return fixture_rows()
+
+
+@pytest.fixture(scope="module")
+def connection(rows):
+    connection = connect()
+    register_sql_function(connection, "quality_check_status")
+    connection.execute("CREATE TABLE orders (id INTEGER, email TEXT, amount REAL, code TEXT)")
+    connection.executemany("INSERT INTO orders VALUES (?, ?, ?, ?)", rows)
+    return connection
+
+
+def records_failed(connection, check_type, column_name, check_params=None):
+    check = check_expr(check_type, column_name, check_params)
+    assert "error" not in check
+    return connection.execute(f"SELECT {to_sqlite(check['failed_expr'])} FROM orders").fetchone()[0]
+
+
+def column(rows, name):
+    return [row[("id", "email", "amount", "code").index(name)] for row in rows]
+
+
+def test_null_check_counts_null_values(connection, rows):
+    assert records_failed(connection, "NULL_CHECK", "email") == column(rows, "email").count(None) > 0
+
+
+def test_duplicate_check_counts_repeats_and_nulls(connection, rows):
+    emails = column(rows, "email")
+    expected = len(emails) - len({email for email in emails if email is not None})
+    assert records_failed(connection, "DUPLICATE_CHECK", "email") == expected
+
+
+def test_uniqueness_check_ignores_nulls(connection, rows):
+    emails = [email for email in column(rows, "email") if email is not None]
+    assert records_failed(connection, "UNIQUENESS_CHECK", "email") == len(emails) - len(set(emails))
+
+
+def test_row_uniqueness_hashes_the_whole_row():
+    assert check_expr("UNIQUENESS_CHECK", None, None) == {
+        "failed_expr": "COUNT(*) - COUNT(DISTINCT HASH(*))",
+        "failure_label": "non-unique row",
+    }
+
+
+@pytest.mark.parametrize(
+    "check_params, low, high",
+    [
+        ({"min_value": 0, "max_value": 100}, 0, 100),
+        ({"min_value": "0"}, 0, None),
+        ({"max_value": 99.5}, None, 99.5),
+    ],
+)
+def test_range_check_counts_values_outside_either_bound(connection, rows, check_params, low, high):
+    expected = sum(
+        amount is not None and ((low is not None and amount < low) or (high is not None and amount > high))
+        for amount in column(rows, "amount")
+    )
+    assert records_failed(connection, "RANGE_CHECK", "amount", check_params) == expected > 0
+
+
+def test_pattern_check_requires_a_full_match(connection, rows):
+    expected = sum(code in ("abc-1234", "ABC-12") for code in column(rows, "code"))
+    assert records_failed(connection, "PATTERN_CHECK", "code", {"pattern": "[A-Z]{3}-[0-9]{4}"}) == expected > 0
+
+
+def test_pattern_literal_escapes_quotes_and_backslashes():
+    check = check_expr("PATTERN_CHECK", "name", {"pattern": "O'Brien\\d"})
+    assert check["pattern_literal"] == "'O\\'Brien\\\\d'"
+    assert check["failed_expr"] == "COUNT_IF(NOT REGEXP_LIKE(\"name\"::STRING, 'O\\'Brien\\\\d'))"
+
+
+@pytest.mark.parametrize(
+    "check_type, column_name, check_params, error",
+    [
+        ("RANGE_CHECK", "amount", {}, "RANGE_CHECK requires min_value or max_value"),
+        ("RANGE_CHECK", "amount", {"min_value": "ten"}, "RANGE_CHECK min_value must be a number"),
+        ("RANGE_CHECK", "amount", {"max_value": "inf"}, "RANGE_CHECK max_value must be a number"),
+        ("PATTERN_CHECK", "code", {}, "PATTERN_CHECK requires a pattern"),
+        ("NULL_CHECK", None, None, "NULL_CHECK requires a column"),
+        ("FRESHNESS_CHECK", "loaded_at", None, "Unsupported check type: FRESHNESS_CHECK"),
+    ],
+)
+def test_invalid_checks_report_an_error(check_type, column_name, check_params, error):
+    assert check_expr(check_type, column_name, check_params) == {"error": error}
+
+
+@pytest.mark.parametrize(
+    "failed, checked, threshold, status",
+    [
+        (0, 100, 0, "PASSED"),
+        (1, 100, 0, "FAILED"),
+        (5, 100, 5, "PASSED"),
+        (6, 100, 5, "FAILED"),
+        (0, 0, 0, "PASSED"),
+    ],
+)
+def test_status_fails_only_above_the_threshold(connection, failed, checked, threshold, status):
+    assert connection.execute("SELECT QUALITY_CHECK_STATUS(?, ?, ?)", (failed, checked, threshold)).fetchone()[0] == status
+
+
+@pytest.mark.parametrize("threshold, status", [(0, "FAILED"), (10, "PASSED")])
+def test_null_check_status_over_the_fixture(connection, rows, threshold, status):
+    check = check_expr("NULL_CHECK", "email", None)
+    result = connection.execute(
+        f"SELECT QUALITY_CHECK_STATUS({to_sqlite(check['failed_expr'])}, COUNT(*), ?) FROM orders", (threshold,)
+    ).fetchone()[0]
+    assert 0 < column(rows, "email").count(None) * 100 / len(rows) < 10
+    assert result == status
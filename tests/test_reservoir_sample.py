@@ -0,0 +1,99 @@
+import random
+import tracemalloc
+
+import pytest
+
+from setup_sql import python_udf
+
+ReservoirSample = python_udf("reservoir_sample")["ReservoirSample"]
+ReservoirMerge = python_udf("reservoir_merge")["ReservoirMerge"]
+
+POPULATION = list(range(20))
+SAMPLE_SIZE = 5
+TRIALS = 4000
+# Chi-square critical value for 19 degrees of freedom at p = 0.001.
+CHI_SQUARE_LIMIT = 43.82
+
+
+def sample_partition(values, sample_size):
+    reservoir = ReservoirSample()
+    for value in values:
+        reservoir.accumulate(value, sample_size)
+    return reservoir
+
+
+def chi_square(counts, expected):
+    return sum((counts[value] - expected) ** 2 / expected for value in POPULATION)
+
+
+def split(values, *sizes):
+    partitions, start = [], 0
+    for size in sizes:
+        partitions.append(values[start:start + size])
+        start += size
+    partitions.append(values[start:])
+    return partitions
+
+
+@pytest.fixture(autouse=True)
+def seeded_random():
+    random.seed(20240611)
+
+
+def test_accumulate_is_uniform():
+    counts = dict.fromkeys(POPULATION, 0)
+    for _ in range(TRIALS):
+        for value in sample_partition(POPULATION, SAMPLE_SIZE).finish():
+            counts[value] += 1
+    assert chi_square(counts, TRIALS * SAMPLE_SIZE / len(POPULATION)) < CHI_SQUARE_LIMIT
+
+
+@pytest.mark.parametrize("sizes", [(10,), (3,), (1, 2, 15), (0, 7)])
+def test_merge_of_uneven_partitions_is_uniform(sizes):
+    counts = dict.fromkeys(POPULATION, 0)
+    for _ in range(TRIALS):
+        reservoir = ReservoirSample()
+        for partition in split(POPULATION, *sizes):
+            reservoir.merge(sample_partition(partition, SAMPLE_SIZE).aggregate_state)
+        sample = reservoir.finish()
+        assert len(sample) == SAMPLE_SIZE
+        assert len(set(sample)) == SAMPLE_SIZE
+        for value in sample:
+            counts[value] += 1
+    assert chi_square(counts, TRIALS * SAMPLE_SIZE / len(POPULATION)) < CHI_SQUARE_LIMIT
+
+
+def test_reservoir_merge_of_stored_samples_is_uniform():
+    counts = dict.fromkeys(POPULATION, 0)
+    for _ in range(TRIALS):
+        merge = ReservoirMerge()
+        for partition in split(POPULATION, 4, 11):
+            seen, sample_size, sample = sample_partition(partition, SAMPLE_SIZE).aggregate_state
+            merge.accumulate(sample, seen, sample_size)
+        for value in merge.finish():
+            counts[value] += 1
+    assert chi_square(counts, TRIALS * SAMPLE_SIZE / len(POPULATION)) < CHI_SQUARE_LIMIT
+
+
+def test_nulls_are_skipped_and_small_inputs_kept_whole():
+    reservoir = sample_partition([None, 1, None, 2], SAMPLE_SIZE)
+    assert sorted(reservoir.finish()) == [1, 2]
+    assert reservoir.aggregate_state[0] == 2
+
+
+def peak_memory(row_count, sample_size):
+    tracemalloc.start()
+    reservoir = ReservoirSample()
+    for i in range(row_count):
+        reservoir.accumulate(f"value-{i:010d}", sample_size)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(reservoir.finish()) == sample_size
+    return peak
+
+
+def test_peak_memory_is_bounded_by_sample_size():
+    small = peak_memory(2_000, 100)
+    large = peak_memory(200_000, 100)
+    assert large < small * 1.5
+    assert large < 64 * 1024